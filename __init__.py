@@ -19,11 +19,22 @@ __version__ = '1.0.0'
 __author__ = 'Equipe HUB Financeiro'
 __email__ = 'contato@hubfinanceiro.com'
 
-# Configuração do Celery
-from .celery import app as celery_app
-
 __all__ = ('celery_app',)
 
+
+def __getattr__(name):
+    """
+    O app Celery é carregado no primeiro acesso a celery_app: importar o pacote
+    (settings, scripts, alembic) não cria o app. Os pontos de entrada que
+    enfileiram tarefas (wsgi.py, asgi.py, manage.py) o importam explicitamente,
+    e o worker o encontra por 'celery -A hub_financeiro'.
+    """
+    if name == 'celery_app':
+        from .celery import app
+
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # Banner de inicialização
 def print_banner():
     """Exibe banner do sistema na inicialização"""
@@ -69,23 +80,9 @@ def check_critical_dependencies():
         print("\nExecute: pip install -r requirements.txt")
         sys.exit(1)
 
-# Configurações de inicialização
-import os
-if os.environ.get('DJANGO_SETTINGS_MODULE'):
-    try:
-        import django
-        from django.conf import settings
-        
-        # Verificar se Django está configurado
-        if not settings.configured:
-            django.setup()
-            
-        # Executar verificações apenas em desenvolvimento
-        if settings.DEBUG:
-            check_critical_dependencies()
-            
-    except Exception as e:
-        print(f"⚠️ Aviso na inicialização: {e}")
+# Nenhum efeito colateral na importação: django.setup() fica a cargo de cada
+# ponto de entrada (manage.py, wsgi.py, asgi.py, worker Celery, bot) e
+# check_critical_dependencies() é chamada por CoreConfig.ready() quando DEBUG.
 
 # Metadata do sistema
 SYSTEM_INFO = {
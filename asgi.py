@@ -14,6 +14,9 @@ from channels.security.websocket import AllowedHostsOriginValidator
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hub_financeiro.settings')
 django.setup()
 
+# App Celery atual do processo: as tarefas enfileiradas pelas views (@shared_task) usam este app
+from hub_financeiro import celery_app  # noqa: E402,F401
+
 # Importar routing após setup do Django
 from platforms.web.api.websocket import websocket_urlpatterns
 
@@ -5,15 +5,15 @@ Processamento de tarefas assíncronas para análises financeiras
 
 import os
 from celery import Celery
-from django.conf import settings
 from celery.schedules import crontab
+from kombu import Queue
 
 # Configurar Django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hub_financeiro.settings')
 
 app = Celery('hub_financeiro')
 
-# Usar configurações do Django
+# Usar configurações do Django (lidas só na finalização do app; o fuso vem de CELERY_TIMEZONE)
 app.config_from_object('django.conf:settings', namespace='CELERY')
 
 # Descobrir tarefas automaticamente
@@ -75,10 +75,10 @@ app.conf.beat_schedule = {
         'schedule': crontab(hour=2, minute=0),
     },
     
-    # Limpeza de dados antigos semanalmente
+    # Partições, rollups e retenção diariamente às 3h (operações de metadados)
     'cleanup-old-data': {
         'task': 'core.services.maintenance_service.cleanup_old_data',
-        'schedule': crontab(hour=3, minute=0, day_of_week=1),
+        'schedule': crontab(hour=3, minute=0),
     },
     
     # Notificações de dividendos
@@ -87,6 +87,12 @@ app.conf.beat_schedule = {
         'schedule': crontab(hour=10, minute=0),
     },
     
+    # Candidatos de recomendação por perfil, diariamente às 4h
+    'refresh-recommendation-candidates': {
+        'task': 'core.services.recommendation_service.refresh_recommendation_candidates',
+        'schedule': crontab(hour=4, minute=0),
+    },
+    
     # Análise de performance de carteira diária às 18h
     'portfolio-performance': {
         'task': 'core.services.portfolio_service.calculate_daily_performance',
@@ -100,15 +106,49 @@ app.conf.update(
     task_serializer='json',
     accept_content=['json'],
     result_serializer='json',
-    timezone=settings.TIME_ZONE,
     enable_utc=True,
     
+    # Filas dedicadas: trabalho intradiário tem prioridade sobre lotes noturnos
+    # Com queue_order_strategy='priority' o worker esvazia as filas na ordem listada
+    task_queues=[
+        Queue('intraday'),
+        Queue('trading'),
+        Queue('market_data'),
+        Queue('notifications'),
+        Queue('celery'),
+        Queue('ai_processing'),
+        Queue('batch'),
+    ],
+    task_default_priority=5,
+    broker_transport_options={
+        'priority_steps': list(range(10)),
+        'sep': ':',
+        'queue_order_strategy': 'priority',
+    },
+    # Grafo de importação do worker: apenas os módulos que definem tarefas
+    imports=(
+        'core.utils.fanout',
+        'core.services.ai_service',
+        'core.services.backup_service',
+        'core.services.dividend_service',
+        'core.services.forex_service',
+        'core.services.fundamental_analysis_service',
+        'core.services.maintenance_service',
+        'core.services.market_alerts_service',
+        'core.services.notification_service',
+        'core.services.portfolio_service',
+        'core.services.recommendation_service',
+        'core.services.risk_profile_service',
+    ),
+    
     # Configurações de roteamento de tarefas
     task_routes={
         'core.services.market_data_service.*': {'queue': 'market_data'},
         'core.services.trading_signals_service.*': {'queue': 'trading'},
         'core.services.ai_service.*': {'queue': 'ai_processing'},
         'core.services.notification_service.*': {'queue': 'notifications'},
+        'core.services.backup_service.*': {'queue': 'batch'},
+        'core.services.maintenance_service.*': {'queue': 'batch'},
     },
     
     # Configurações de worker
@@ -138,6 +178,35 @@ def health_check():
     health_service = HealthService()
     return health_service.run_health_check()
 
+# Métricas das tarefas para o Prometheus, carregadas só nos processos do worker
+from celery.signals import worker_init, worker_process_shutdown, worker_ready
+
+@worker_init.connect
+def setup_task_metrics(**kwargs):
+    """Prepara o diretório multiprocesso e conecta a medição das tarefas antes do fork dos filhos"""
+    from core.utils.metrics import connect_celery_signals, reset_multiprocess_dir
+
+    reset_multiprocess_dir()
+    connect_celery_signals()
+
+@worker_process_shutdown.connect
+def discard_process_metrics(pid=None, **kwargs):
+    """Remove os arquivos de métricas do processo filho encerrado"""
+    from core.utils.metrics import mark_process_dead
+
+    mark_process_dead(pid or os.getpid())
+
+@worker_ready.connect
+def start_metrics_server(**kwargs):
+    """Expõe as métricas agregadas dos processos do worker quando CELERY_METRICS_PORT está definido"""
+    port = os.environ.get('CELERY_METRICS_PORT')
+    if port:
+        from prometheus_client import start_http_server
+
+        from core.utils.metrics import metrics_registry
+
+        start_http_server(int(port), registry=metrics_registry())
+
 # Configuração de logging para Celery
 app.conf.update(
     worker_log_format='[%(asctime)s: %(levelname)s/%(processName)s] %(message)s',
@@ -0,0 +1,21 @@
+"""
+Configuração do app core do HUB Financeiro
+Verificação de dependências e registro dos receptores de sinais na inicialização do Django
+"""
+
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class CoreConfig(AppConfig):
+    name = 'core'
+
+    def ready(self):
+        # Em desenvolvimento, falha cedo se faltar alguma dependência crítica
+        if settings.DEBUG:
+            from hub_financeiro import check_critical_dependencies
+
+            check_critical_dependencies()
+
+        # Só a conexão dos receptores: segurança, alertas e recomendações são importados quando um sinal dispara
+        from core import signals  # noqa: F401
@@ -61,6 +61,8 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'platforms.web.middleware.SecurityMiddleware',
+    'platforms.web.middleware.MetricsMiddleware',
+    'platforms.web.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'hub_financeiro.urls'
@@ -152,7 +154,9 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # REST Framework Configuration
 REST_FRAMEWORK = {
+    # JWT verificado sem acesso ao banco; Token e sessão mantidos para clientes existentes
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        'core.utils.security.CachedJWTAuthentication',
         'rest_framework.authentication.TokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
@@ -172,6 +176,20 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Tokens JWT (assinados e verificados localmente)
+SIMPLE_JWT = {
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=config('JWT_ACCESS_MINUTES', default=15, cast=int)),
+    'REFRESH_TOKEN_LIFETIME': timedelta(days=config('JWT_REFRESH_DAYS', default=30, cast=int)),
+    'SIGNING_KEY': config('JWT_SIGNING_KEY', default=SECRET_KEY),
+    'UPDATE_LAST_LOGIN': False,
+}
+# Refresh token de dispositivo com desbloqueio biométrico
+BIOMETRIC_REFRESH_LIFETIME = timedelta(days=config('BIOMETRIC_REFRESH_DAYS', default=90, cast=int))
+
+# Snapshots de usuário/permissões: TTL no Redis e no cache local de cada processo
+AUTH_SNAPSHOT_TTL = config('AUTH_SNAPSHOT_TTL', default=900, cast=int)
+AUTH_LOCAL_CACHE_SECONDS = config('AUTH_LOCAL_CACHE_SECONDS', default=5, cast=int)
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -262,6 +280,13 @@ LOGGING = {
     },
 }
 
+# Monitoramento e profiling
+# Token exigido pelo endpoint /metrics; vazio, o endpoint responde 403
+METRICS_AUTH_TOKEN = config('METRICS_AUTH_TOKEN', default='')
+# Requisições de staff com o header X-Profile (cprofile ou pyinstrument) são perfiladas
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=False, cast=bool)
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=1.0, cast=float)
+
 # Security Settings
 if not DEBUG:
     SECURE_BROWSER_XSS_FILTER = True
@@ -294,6 +319,30 @@ MARKET_DATA_UPDATE_INTERVAL = 300  # 5 minutos
 DIVIDEND_UPDATE_INTERVAL = 3600    # 1 hora
 NEWS_UPDATE_INTERVAL = 900         # 15 minutos
 
+# Snapshots de dados analíticos em memória
+ANALYTICS_DATA_DIR = Path(config('ANALYTICS_DATA_DIR', default=str(BASE_DIR / 'shared' / 'analytics')))
+FUNDAMENTAL_MATRIX_PATH = ANALYTICS_DATA_DIR / 'fundamental_matrix.npz'
+FOREX_HISTORY_PATH = ANALYTICS_DATA_DIR / 'forex_rates.npz'
+
+# Câmbio: apenas pares contra a moeda pivô são consultados no provedor
+FOREX_PIVOT_CURRENCY = config('FOREX_PIVOT_CURRENCY', default='USD')
+FOREX_CURRENCIES = config('FOREX_CURRENCIES', default='USD,BRL,EUR,GBP,JPY,CHF,CAD,AUD,CNY,ARS', cast=lambda v: [s.strip() for s in v.split(',')])
+FOREX_CHECK_PAIRS = [('EUR', 'BRL')]
+# Moeda em que os snapshots de carteira são consolidados
+PORTFOLIO_CURRENCY = config('PORTFOLIO_CURRENCY', default='BRL')
+
+# Retenção (em meses) das tabelas particionadas; sobrepõe core.utils.partitions
+TIME_SERIES_RETENTION_MONTHS = {
+    'intraday_bars': config('INTRADAY_BARS_RETENTION_MONTHS', default=3, cast=int),
+    'trading_signals': config('TRADING_SIGNALS_RETENTION_MONTHS', default=12, cast=int),
+    'news_articles': config('NEWS_RETENTION_MONTHS', default=6, cast=int),
+}
+
+# Backups incrementais (blocos deduplicados + manifesto por snapshot)
+BACKUP_DIR = Path(config('BACKUP_DIR', default=str(BASE_DIR / 'backups')))
+BACKUP_RETENTION_DAYS = config('BACKUP_RETENTION_DAYS', default=30, cast=int)
+BACKUP_JOBS = config('BACKUP_JOBS', default=1, cast=int)
+
 # Trading Configuration
 MAX_DAILY_TRADES = config('MAX_DAILY_TRADES', default=10, cast=int)
 RISK_MANAGEMENT_ENABLED = config('RISK_MANAGEMENT_ENABLED', default=True, cast=bool)
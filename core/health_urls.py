@@ -0,0 +1,12 @@
+"""
+URLs de health check do HUB Financeiro
+"""
+
+from django.urls import path
+
+from core.views import health_view, liveness_view
+
+urlpatterns = [
+    path('', health_view, name='health'),
+    path('live/', liveness_view, name='health_live'),
+]
@@ -0,0 +1,73 @@
+"""
+Serviço de IA para HUB Financeiro
+Geração diária de insights personalizados sobre a carteira
+"""
+
+import logging
+from typing import List
+
+from celery import shared_task
+
+from core.utils.fanout import dispatch
+
+logger = logging.getLogger(__name__)
+
+
+def build_insights(snapshots: List[dict]) -> List[str]:
+    """Insights a partir dos dois snapshots mais recentes da carteira"""
+    if not snapshots:
+        return []
+
+    latest = snapshots[0]
+    insights = []
+    invested = float(latest['invested'])
+    if invested:
+        result = float(latest['profit']) / invested
+        insights.append(f"Rentabilidade acumulada da carteira: {result:+.2%}")
+
+    if len(snapshots) > 1 and float(snapshots[1]['market_value']):
+        change = float(latest['market_value']) / float(snapshots[1]['market_value']) - 1
+        insights.append(f"Variação desde o último fechamento: {change:+.2%}")
+
+    return insights
+
+
+def generate_insights_chunk(user_ids: List[int]) -> dict:
+    """Gera os insights diários de um lote de usuários"""
+    from django.utils import timezone
+
+    from core.models import AIInsight, PortfolioSnapshot
+
+    snapshots = {}
+    rows = (
+        PortfolioSnapshot.objects.filter(user_id__in=user_ids)
+        .order_by('user_id', '-date')
+        .values('user_id', 'invested', 'market_value', 'profit')
+    )
+    for row in rows:
+        history = snapshots.setdefault(row['user_id'], [])
+        if len(history) < 2:
+            history.append(row)
+
+    today = timezone.now().date()
+    # Um lote reentregue não duplica os insights do dia; a trava do lote no fan-out
+    # garante um único worker por usuário, então a consulta prévia basta
+    existing = set(
+        AIInsight.objects.filter(user_id__in=user_ids, date=today).values_list('user_id', 'content')
+    )
+    insights = [
+        AIInsight(user_id=user_id, date=today, content=text)
+        for user_id, history in snapshots.items()
+        for text in build_insights(history)
+        if (user_id, text) not in existing
+    ]
+    AIInsight.objects.bulk_create(insights)
+    return {'users': len(snapshots), 'insights': len(insights)}
+
+
+@shared_task
+def generate_daily_insights():
+    """Distribui a geração diária de insights em lotes por usuário"""
+    from core.services.portfolio_service import active_investor_ids
+
+    return dispatch('daily_insights', active_investor_ids(), generate_insights_chunk, lane='batch')
@@ -0,0 +1,647 @@
+"""
+Serviço de Day Trade para HUB Financeiro
+Agregação de ticks em barras OHLCV, VWAP e perfil de volume em buffers circulares
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from zoneinfo import ZoneInfo
+
+from django.core.cache import cache
+
+from core.utils.lazy_imports import lazy_import
+from core.utils.metrics import instrumented
+
+np = lazy_import('numpy')
+
+logger = logging.getLogger(__name__)
+
+# Períodos das barras em segundos e quantas barras fechadas cada buffer guarda
+TIMEFRAMES = {'1s': 1, '1m': 60, '5m': 300, '15m': 900}
+BAR_CAPACITY = {'1s': 900, '1m': 600, '5m': 288, '15m': 96}
+
+# Barras gravadas no banco (tabela intraday_bars) a cada fechamento
+PERSIST_TIMEFRAME = '1m'
+# Barras publicadas no cache para processos que não recebem o fluxo de negócios
+PUBLISHED_TIMEFRAMES = ('1m', '5m', '15m')
+PUBLISHED_BARS = 120
+
+# Perfil de volume: faixas fixas em torno do primeiro preço da sessão
+PROFILE_BINS = 400
+PROFILE_BIN_PCT = 0.001         # cada faixa cobre 0,1% do preço de abertura
+VALUE_AREA = 0.70
+
+MAX_PENDING_BARS = 200_000
+PERSIST_PAGE_SIZE = 1000        # barras por INSERT multi-linha
+SNAPSHOT_INTERVAL = 300         # segundos entre snapshots dos buffers em disco
+FLUSH_INTERVAL = 5              # segundos entre gravações e publicações do processo do feed
+
+_FIELDS = ('start', 'open', 'high', 'low', 'close', 'volume', 'turnover', 'trades')
+_BARS_KEY = 'daytrading:bars:{symbol}'
+_SUMMARY_KEY = 'daytrading:summary:{symbol}'
+_PROFILE_KEY = 'daytrading:profile:{symbol}'
+_SYMBOLS_KEY = 'daytrading:symbols'
+PUBLISH_TTL = 60 * 60 * 12
+
+
+class BarRing:
+    """
+    Barras de um período em arrays pré-alocados (memória fixa). A barra em
+    formação fica em escalares Python e só é gravada no array ao fechar.
+    """
+
+    def __init__(self, step: int, capacity: int):
+        self.step = step
+        self.capacity = capacity
+        self.start = np.zeros(capacity, dtype=np.int64)
+        self.open = np.zeros(capacity)
+        self.high = np.zeros(capacity)
+        self.low = np.zeros(capacity)
+        self.close = np.zeros(capacity)
+        self.volume = np.zeros(capacity)
+        self.turnover = np.zeros(capacity)
+        self.trades = np.zeros(capacity, dtype=np.int64)
+        self.head = 0           # próxima posição de escrita
+        self.count = 0          # barras fechadas armazenadas
+        self.late_ticks = 0     # ticks anteriores à barra aberta, descartados
+
+        self.bar_start: Optional[int] = None
+        self._o = self._h = self._l = self._c = 0.0
+        self._v = self._pv = 0.0
+        self._n = 0
+
+    def update(self, ts: float, price: float, qty: float) -> bool:
+        """Aplica um negócio; retorna True se a barra anterior fechou"""
+        bucket = int(ts) // self.step * self.step
+        closed = False
+        if bucket != self.bar_start:
+            if self.bar_start is not None and bucket < self.bar_start:
+                self.late_ticks += 1
+                return False
+            closed = self._close()
+            self.bar_start = bucket
+            self._o = self._h = self._l = price
+            self._v = self._pv = 0.0
+            self._n = 0
+
+        if price > self._h:
+            self._h = price
+        elif price < self._l:
+            self._l = price
+        self._c = price
+        self._v += qty
+        self._pv += price * qty
+        self._n += 1
+        return closed
+
+    def update_many(self, ts, prices, qtys) -> int:
+        """Versão vetorizada para lotes ordenados por tempo; retorna barras fechadas"""
+        buckets = ts.astype(np.int64) // self.step * self.step
+        if self.bar_start is not None:
+            keep = buckets >= self.bar_start
+            self.late_ticks += int(len(buckets) - keep.sum())
+            buckets, prices, qtys = buckets[keep], prices[keep], qtys[keep]
+        if not len(buckets):
+            return 0
+
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+        ends = np.concatenate((starts[1:], [len(buckets)]))
+        seg_start = buckets[starts]
+        seg_open = prices[starts]
+        seg_close = prices[ends - 1]
+        seg_high = np.maximum.reduceat(prices, starts)
+        seg_low = np.minimum.reduceat(prices, starts)
+        seg_volume = np.add.reduceat(qtys, starts)
+        seg_turnover = np.add.reduceat(prices * qtys, starts)
+        seg_trades = ends - starts
+
+        closed = 0
+        first = 0
+        if seg_start[0] == self.bar_start:
+            # Primeiro segmento continua a barra aberta
+            self._h = max(self._h, float(seg_high[0]))
+            self._l = min(self._l, float(seg_low[0]))
+            self._c = float(seg_close[0])
+            self._v += float(seg_volume[0])
+            self._pv += float(seg_turnover[0])
+            self._n += int(seg_trades[0])
+            first = 1
+        if first < len(starts):
+            closed += int(self._close())
+            # Segmentos intermediários fecham direto no buffer; o último fica aberto
+            last = len(starts) - 1
+            if last > first:
+                self._append(
+                    seg_start[first:last], seg_open[first:last], seg_high[first:last],
+                    seg_low[first:last], seg_close[first:last], seg_volume[first:last],
+                    seg_turnover[first:last], seg_trades[first:last],
+                )
+                closed += last - first
+            self.bar_start = int(seg_start[last])
+            self._o, self._h, self._l, self._c = (
+                float(seg_open[last]), float(seg_high[last]), float(seg_low[last]), float(seg_close[last]),
+            )
+            self._v, self._pv, self._n = float(seg_volume[last]), float(seg_turnover[last]), int(seg_trades[last])
+        return closed
+
+    def _close(self) -> bool:
+        if self.bar_start is None:
+            return False
+        i = self.head
+        self.start[i] = self.bar_start
+        self.open[i], self.high[i], self.low[i], self.close[i] = self._o, self._h, self._l, self._c
+        self.volume[i], self.turnover[i], self.trades[i] = self._v, self._pv, self._n
+        self.head = (i + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        return True
+
+    def _append(self, *columns):
+        """Grava várias barras fechadas de uma vez, descartando as que não cabem"""
+        size = min(len(columns[0]), self.capacity)
+        positions = (self.head + np.arange(size)) % self.capacity
+        for name, values in zip(_FIELDS, columns):
+            getattr(self, name)[positions] = values[-size:]
+        self.head = int((self.head + size) % self.capacity)
+        self.count = min(self.count + size, self.capacity)
+
+    def last_closed(self) -> tuple:
+        i = (self.head - 1) % self.capacity
+        return tuple(getattr(self, name)[i].item() for name in _FIELDS)
+
+    def open_bar(self) -> Optional[tuple]:
+        if self.bar_start is None:
+            return None
+        return (self.bar_start, self._o, self._h, self._l, self._c, self._v, self._pv, self._n)
+
+    def to_arrays(self, limit: Optional[int] = None, include_open: bool = True) -> Dict[str, object]:
+        """Barras em ordem cronológica (cópias), com a barra em formação ao final"""
+        size = self.count if limit is None else min(self.count, limit)
+        if include_open and self.bar_start is not None and limit is not None and size == limit:
+            size -= 1
+        positions = (self.head - size + np.arange(size)) % self.capacity
+        columns = {name: getattr(self, name)[positions] for name in _FIELDS}
+
+        current = self.open_bar() if include_open else None
+        if current is not None:
+            columns = {
+                name: np.append(values, current[k]) for k, (name, values) in enumerate(columns.items())
+            }
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            columns['vwap'] = np.where(columns['volume'] > 0, columns['turnover'] / columns['volume'], np.nan)
+        return columns
+
+    def state(self) -> Dict[str, object]:
+        arrays = {name: getattr(self, name) for name in _FIELDS}
+        arrays['meta'] = np.array([self.head, self.count], dtype=np.int64)
+        return arrays
+
+    def restore(self, arrays: Dict[str, object]):
+        for name in _FIELDS:
+            values = arrays[name]
+            getattr(self, name)[:len(values)] = values[:self.capacity]
+        self.head, self.count = (int(v) for v in arrays['meta'])
+
+
+class VolumeProfile:
+    """Volume negociado por faixa de preço na sessão, em array de tamanho fixo"""
+
+    def __init__(self, bins: int = PROFILE_BINS, bin_pct: float = PROFILE_BIN_PCT):
+        self.volume = np.zeros(bins)
+        self.bin_pct = bin_pct
+        self.base: Optional[float] = None
+        self.width: Optional[float] = None
+
+    def reset(self):
+        self.volume[:] = 0
+        self.base = self.width = None
+
+    def _anchor(self, price: float):
+        self.width = price * self.bin_pct
+        self.base = price - self.width * len(self.volume) / 2
+
+    def add(self, price: float, qty: float):
+        if self.base is None:
+            self._anchor(price)
+        # Preços fora da faixa coberta acumulam nas extremidades
+        index = min(max(int((price - self.base) / self.width), 0), len(self.volume) - 1)
+        self.volume[index] += qty
+
+    def add_many(self, prices, qtys):
+        if self.base is None:
+            self._anchor(float(prices[0]))
+        indexes = np.clip(((prices - self.base) / self.width).astype(np.int64), 0, len(self.volume) - 1)
+        self.volume += np.bincount(indexes, weights=qtys, minlength=len(self.volume))
+
+    def summary(self) -> Optional[dict]:
+        """Preço de maior volume (POC) e área de valor com 70% do volume"""
+        total = self.volume.sum()
+        if self.base is None or total <= 0:
+            return None
+        centers = self.base + (np.arange(len(self.volume)) + 0.5) * self.width
+        ranked = np.argsort(self.volume)[::-1]
+        covered = ranked[:int(np.searchsorted(np.cumsum(self.volume[ranked]), VALUE_AREA * total)) + 1]
+        active = np.flatnonzero(self.volume)
+        return {
+            'poc': float(centers[ranked[0]]),
+            'value_area_low': float(centers[covered.min()] - self.width / 2),
+            'value_area_high': float(centers[covered.max()] + self.width / 2),
+            'bin_width': float(self.width),
+            'prices': centers[active].round(4).tolist(),
+            'volumes': self.volume[active].tolist(),
+        }
+
+
+class SymbolBars:
+    """Buffers de todos os períodos, perfil de volume e VWAP da sessão de um ativo"""
+
+    def __init__(self, symbol: str, tz: ZoneInfo):
+        self.symbol = symbol
+        self.tz = tz
+        self.rings = {tf: BarRing(step, BAR_CAPACITY[tf]) for tf, step in TIMEFRAMES.items()}
+        self.profile = VolumeProfile()
+        self.session_end: Optional[float] = None
+        self.session_open = 0.0
+        self.session_high = 0.0
+        self.session_low = 0.0
+        self.session_volume = 0.0
+        self.session_turnover = 0.0
+        self.last_price = 0.0
+        self.last_ts = 0.0
+        self.ticks = 0
+
+    def _start_session(self, ts: float, price: float):
+        local = datetime.fromtimestamp(ts, self.tz)
+        midnight = datetime(local.year, local.month, local.day, tzinfo=self.tz) + timedelta(days=1)
+        self.session_end = midnight.timestamp()
+        self.session_open = self.session_high = self.session_low = price
+        self.session_volume = self.session_turnover = 0.0
+        self.profile.reset()
+
+    def on_tick(self, ts: float, price: float, qty: float) -> List[str]:
+        if self.session_end is None or ts >= self.session_end:
+            self._start_session(ts, price)
+
+        closed = [tf for tf, ring in self.rings.items() if ring.update(ts, price, qty)]
+        self.profile.add(price, qty)
+        if price > self.session_high:
+            self.session_high = price
+        elif price < self.session_low:
+            self.session_low = price
+        self.session_volume += qty
+        self.session_turnover += price * qty
+        self.last_price = price
+        self.last_ts = ts
+        self.ticks += 1
+        return closed
+
+    def on_ticks(self, ts, prices, qtys) -> Dict[str, int]:
+        closed = dict.fromkeys(self.rings, 0)
+        while len(ts):
+            if self.session_end is None or ts[0] >= self.session_end:
+                self._start_session(float(ts[0]), float(prices[0]))
+            # Lote dividido na virada de sessão
+            cut = int(np.searchsorted(ts, self.session_end))
+            part_ts, part_prices, part_qtys = ts[:cut], prices[:cut], qtys[:cut]
+            ts, prices, qtys = ts[cut:], prices[cut:], qtys[cut:]
+
+            for tf, ring in self.rings.items():
+                closed[tf] += ring.update_many(part_ts, part_prices, part_qtys)
+            self.profile.add_many(part_prices, part_qtys)
+            self.session_high = max(self.session_high, float(part_prices.max()))
+            self.session_low = min(self.session_low, float(part_prices.min()))
+            self.session_volume += float(part_qtys.sum())
+            self.session_turnover += float((part_prices * part_qtys).sum())
+            self.last_price = float(part_prices[-1])
+            self.last_ts = float(part_ts[-1])
+            self.ticks += len(part_ts)
+        return closed
+
+    def summary(self) -> dict:
+        vwap = self.session_turnover / self.session_volume if self.session_volume else None
+        change = (self.last_price / self.session_open - 1) * 100 if self.session_open else 0.0
+        return {
+            'symbol': self.symbol,
+            'last': float(self.last_price),
+            'open': float(self.session_open),
+            'high': float(self.session_high),
+            'low': float(self.session_low),
+            'change_pct': round(float(change), 4),
+            'volume': float(self.session_volume),
+            'vwap': round(float(vwap), 4) if vwap else None,
+            'vwap_distance_pct': round(float(self.last_price / vwap - 1) * 100, 4) if vwap else None,
+            'ticks': self.ticks,
+            'updated_at': float(self.last_ts),
+        }
+
+
+class TickAggregator:
+    """Agregador de negócios por ativo, consultado diretamente pelas telas de day trade"""
+
+    def __init__(self, tz: str = 'UTC', persist_timeframe: str = PERSIST_TIMEFRAME):
+        self.tz = ZoneInfo(tz)
+        self.persist_timeframe = persist_timeframe
+        self._symbols: Dict[str, SymbolBars] = {}
+        self._lock = threading.Lock()
+        # Barras fechadas aguardando gravação no banco
+        self._pending = deque(maxlen=MAX_PENDING_BARS)
+        self._dirty = set()
+
+    def _get(self, symbol: str) -> SymbolBars:
+        bars = self._symbols.get(symbol)
+        if bars is None:
+            bars = self._symbols[symbol] = SymbolBars(symbol, self.tz)
+        return bars
+
+    def on_tick(self, symbol: str, ts: float, price: float, qty: float) -> List[str]:
+        """Aplica um negócio; retorna os períodos cujas barras fecharam"""
+        with self._lock:
+            bars = self._get(symbol)
+            closed = bars.on_tick(ts, price, qty)
+            if self.persist_timeframe in closed:
+                self._pending.append((symbol, *bars.rings[self.persist_timeframe].last_closed()))
+                self._dirty.add(symbol)
+        return closed
+
+    def on_ticks(self, symbol: str, ts, prices, qtys) -> Dict[str, int]:
+        """Aplica um lote de negócios ordenado por tempo"""
+        ts = np.asarray(ts, dtype=np.float64)
+        prices = np.asarray(prices, dtype=np.float64)
+        qtys = np.asarray(qtys, dtype=np.float64)
+        with self._lock:
+            bars = self._get(symbol)
+            closed = bars.on_ticks(ts, prices, qtys)
+            count = closed.get(self.persist_timeframe, 0)
+            if count:
+                ring = bars.rings[self.persist_timeframe]
+                recent = ring.to_arrays(limit=count, include_open=False)
+                rows = zip(*(recent[name].tolist() for name in _FIELDS))
+                self._pending.extend((symbol, *row) for row in rows)
+                self._dirty.add(symbol)
+        return closed
+
+    def symbols(self) -> List[str]:
+        return sorted(self._symbols)
+
+    def bars(self, symbol: str, timeframe: str, limit: Optional[int] = None,
+             include_open: bool = True) -> Optional[dict]:
+        with self._lock:
+            bars = self._symbols.get(symbol)
+            if bars is None:
+                return None
+            return bars.rings[timeframe].to_arrays(limit=limit, include_open=include_open)
+
+    def profile(self, symbol: str) -> Optional[dict]:
+        with self._lock:
+            bars = self._symbols.get(symbol)
+            return bars.profile.summary() if bars else None
+
+    def summary(self, symbol: str) -> Optional[dict]:
+        with self._lock:
+            bars = self._symbols.get(symbol)
+            return bars.summary() if bars else None
+
+    def drain_pending(self) -> List[tuple]:
+        with self._lock:
+            rows = list(self._pending)
+            self._pending.clear()
+        return rows
+
+    def requeue_pending(self, rows: List[tuple]):
+        """Devolve à frente da fila as barras cuja gravação falhou"""
+        with self._lock:
+            self._pending.extendleft(reversed(rows))
+
+    def drain_dirty(self) -> List[str]:
+        with self._lock:
+            dirty = sorted(self._dirty)
+            self._dirty.clear()
+        return dirty
+
+    def save(self, path: str):
+        """Snapshot colunar de todos os buffers em .npz, com escrita atômica"""
+        arrays = {}
+        with self._lock:
+            for symbol, bars in self._symbols.items():
+                for tf, ring in bars.rings.items():
+                    if tf == '1s':
+                        continue
+                    for name, values in ring.state().items():
+                        arrays[f'{symbol}/{tf}/{name}'] = values.copy()
+
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.npz')
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                np.savez(handle, **arrays)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def load(self, path: str) -> int:
+        """Restaura as barras fechadas de um snapshot; retorna os ativos carregados"""
+        grouped = {}
+        with np.load(path) as data:
+            for key in data.files:
+                symbol, tf, name = key.split('/')
+                grouped.setdefault((symbol, tf), {})[name] = data[key]
+        with self._lock:
+            for (symbol, tf), arrays in grouped.items():
+                if tf in TIMEFRAMES:
+                    self._get(symbol).rings[tf].restore(arrays)
+        return len({symbol for symbol, _ in grouped})
+
+
+def _jsonable(columns: dict) -> dict:
+    return {
+        name: [None if v != v else round(v, 6) if isinstance(v, float) else v for v in values.tolist()]
+        for name, values in columns.items()
+    }
+
+
+class DayTradingService:
+    """
+    Barras intradiárias em memória. O processo que recebe o fluxo de negócios
+    alimenta o agregador; os demais leem as barras publicadas no cache.
+    Só as consultas são instrumentadas: on_trade roda a cada negócio.
+
+    O processo do feed é scripts/intraday_feed.py, que chama consume(): start()
+    na inicialização, on_trade() por negócio e flush() a cada FLUSH_INTERVAL.
+    """
+
+    def __init__(self):
+        self._aggregator: Optional[TickAggregator] = None
+        self._last_snapshot = 0.0
+
+    @property
+    def aggregator(self) -> TickAggregator:
+        if self._aggregator is None:
+            from django.conf import settings
+            self._aggregator = TickAggregator(tz=settings.TIME_ZONE)
+        return self._aggregator
+
+    @property
+    def snapshot_path(self) -> str:
+        from django.conf import settings
+        return str(settings.ANALYTICS_DATA_DIR / 'intraday_bars.npz')
+
+    def on_trade(self, symbol: str, ts: float, price: float, qty: float) -> List[str]:
+        """Negócio recebido do feed: atualiza as barras e avalia alertas de preço"""
+        from core.services.market_alerts_service import process_price_tick
+
+        closed = self.aggregator.on_tick(symbol, ts, price, qty)
+        process_price_tick(symbol, price)
+        return closed
+
+    def restore(self) -> int:
+        try:
+            return self.aggregator.load(self.snapshot_path)
+        except FileNotFoundError:
+            return 0
+
+    def start(self) -> dict:
+        """
+        Inicialização do processo do feed: restaura as barras do snapshot e
+        carrega o índice de alertas que on_trade avalia neste processo.
+        """
+        from core.services.market_alerts_service import rebuild_alert_index
+
+        return {'symbols_restored': self.restore(), 'alerts': rebuild_alert_index()}
+
+    @instrumented('DayTradingService', 'flush')
+    def flush(self) -> dict:
+        """
+        Chamado periodicamente pelo processo do feed: grava as barras fechadas,
+        publica os ativos alterados no cache e salva o snapshot dos buffers.
+        """
+        from core.services.market_alerts_service import refresh_alert_index
+
+        # Alertas criados ou alterados em outros processos desde o último flush
+        refresh_alert_index()
+
+        aggregator = self.aggregator
+        rows = aggregator.drain_pending()
+        if rows:
+            try:
+                persist_bars(rows)
+            except Exception as e:
+                # Voltam para a fila e são regravadas no próximo flush; a publicação segue
+                aggregator.requeue_pending(rows)
+                logger.error(f"Falha ao gravar {len(rows)} barras intradiárias: {e}")
+                rows = []
+
+        dirty = aggregator.drain_dirty()
+        if dirty:
+            payload = {}
+            for symbol in dirty:
+                payload[_SUMMARY_KEY.format(symbol=symbol)] = aggregator.summary(symbol)
+                payload[_PROFILE_KEY.format(symbol=symbol)] = aggregator.profile(symbol)
+                payload[_BARS_KEY.format(symbol=symbol)] = {
+                    tf: _jsonable(aggregator.bars(symbol, tf, limit=PUBLISHED_BARS))
+                    for tf in PUBLISHED_TIMEFRAMES
+                }
+            payload[_SYMBOLS_KEY] = aggregator.symbols()
+            cache.set_many(payload, PUBLISH_TTL)
+
+        now = time.monotonic()
+        if now - self._last_snapshot >= SNAPSHOT_INTERVAL:
+            aggregator.save(self.snapshot_path)
+            self._last_snapshot = now
+
+        return {'bars_persisted': len(rows), 'symbols_published': len(dirty)}
+
+    def consume(self, trades: Iterable[tuple], flush_interval: float = FLUSH_INTERVAL) -> dict:
+        """
+        Laço do processo do feed: aplica cada negócio (symbol, ts, price, qty)
+        e grava/publica as barras a cada flush_interval segundos. Um flush final
+        roda quando o fluxo termina ou o processo é interrompido.
+        """
+        stats = self.start()
+        trades_applied = 0
+        last_flush = time.monotonic()
+        try:
+            for symbol, ts, price, qty in trades:
+                self.on_trade(symbol, float(ts), float(price), float(qty))
+                trades_applied += 1
+                if time.monotonic() - last_flush >= flush_interval:
+                    self.flush()
+                    last_flush = time.monotonic()
+        finally:
+            self.flush()
+        return {**stats, 'trades': trades_applied}
+
+    @instrumented('DayTradingService', 'live_bars')
+    def live_bars(self, symbol: str, timeframe: str = '1m', limit: int = 100) -> Optional[dict]:
+        if timeframe not in TIMEFRAMES:
+            raise ValueError(f"Período inválido: {timeframe}")
+        # values[-0:] devolveria todas as barras publicadas
+        limit = max(int(limit), 1)
+        local = self.aggregator.bars(symbol, timeframe, limit=limit)
+        if local is not None:
+            return _jsonable(local)
+        if timeframe not in PUBLISHED_TIMEFRAMES:
+            return None
+        published = cache.get(_BARS_KEY.format(symbol=symbol))
+        if not published:
+            return None
+        return {name: values[-limit:] for name, values in published[timeframe].items()}
+
+    @instrumented('DayTradingService', 'volume_profile')
+    def volume_profile(self, symbol: str) -> Optional[dict]:
+        profile = self.aggregator.profile(symbol)
+        if profile is None:
+            profile = cache.get(_PROFILE_KEY.format(symbol=symbol))
+        return profile
+
+    @instrumented('DayTradingService', 'screen')
+    def screen(self, order_by: str = 'change_pct', descending: bool = True, limit: int = 50) -> List[dict]:
+        """Resumo da sessão de todos os ativos, ordenado pelo campo pedido"""
+        aggregator = self.aggregator
+        symbols = aggregator.symbols()
+        if symbols:
+            summaries = [aggregator.summary(symbol) for symbol in symbols]
+        else:
+            published = cache.get(_SYMBOLS_KEY) or []
+            summaries = list(cache.get_many([_SUMMARY_KEY.format(symbol=s) for s in published]).values())
+
+        summaries = [s for s in summaries if s and s.get(order_by) is not None]
+        summaries.sort(key=lambda s: s[order_by], reverse=descending)
+        return summaries[:limit]
+
+
+def persist_bars(rows: List[tuple]):
+    """
+    Grava barras fechadas na tabela particionada intraday_bars. Barras já
+    gravadas (reenvio após falha, snapshot restaurado) são sobrescritas pelo
+    índice único ux_intraday_bars_symbol_timestamp (migração 012).
+    """
+    from django.db import connection
+
+    values = [
+        (symbol, datetime.fromtimestamp(start, ZoneInfo('UTC')), o, h, l, c, int(volume))
+        for symbol, start, o, h, l, c, volume, _turnover, _trades in rows
+    ]
+    with connection.cursor() as cursor:
+        for begin in range(0, len(values), PERSIST_PAGE_SIZE):
+            page = values[begin:begin + PERSIST_PAGE_SIZE]
+            cursor.execute(
+                'INSERT INTO intraday_bars (symbol, "timestamp", open, high, low, close, volume) VALUES '
+                + ', '.join(['(%s, %s, %s, %s, %s, %s, %s)'] * len(page))
+                + ' ON CONFLICT (symbol, "timestamp") DO UPDATE SET open = EXCLUDED.open, '
+                'high = EXCLUDED.high, low = EXCLUDED.low, close = EXCLUDED.close, volume = EXCLUDED.volume',
+                [value for row in page for value in row],
+            )
+
+
+daytrading_service = DayTradingService()
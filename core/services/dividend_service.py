@@ -0,0 +1,49 @@
+"""
+Serviço de Dividendos para HUB Financeiro
+Análise diária de proventos futuros e renda projetada dos investidores
+"""
+
+import logging
+
+from celery import shared_task
+from django.core.cache import cache
+
+from core.services.dividend_tracker_service import dividend_tracker
+from core.utils.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+PROJECTION_CACHE_KEY = 'dividends:projection:{user_id}'
+PROJECTION_CACHE_TIMEOUT = 60 * 60 * 26  # Até a próxima execução diária
+DEFAULT_PROJECTION_MONTHS = 12
+
+
+def get_cached_projection(user_id):
+    """Projeção calculada na última execução diária, se houver"""
+    projection = cache.get(PROJECTION_CACHE_KEY.format(user_id=user_id))
+    record_cache_lookup('dividend_projection', projection is not None)
+    return projection
+
+
+def invalidate_projection(user_id):
+    """Descarta a projeção do usuário; a próxima consulta recalcula a partir da carteira"""
+    cache.delete(PROJECTION_CACHE_KEY.format(user_id=user_id))
+
+
+@shared_task
+def analyze_upcoming_dividends(days_ahead=7):
+    """Recalcula o calendário e a renda projetada de todos os investidores"""
+    dividend_tracker.build_calendar()
+
+    projections = dividend_tracker.project_all_users(months=DEFAULT_PROJECTION_MONTHS)
+    cache.set_many(
+        {PROJECTION_CACHE_KEY.format(user_id=user_id): data for user_id, data in projections.items()},
+        timeout=PROJECTION_CACHE_TIMEOUT,
+    )
+
+    upcoming = dividend_tracker.upcoming_events(days=days_ahead)
+    logger.info(
+        f"Dividendos analisados: {len(projections)} investidores, "
+        f"{len(upcoming)} pagamentos nos próximos {days_ahead} dias"
+    )
+    return {'users': len(projections), 'upcoming_events': len(upcoming)}
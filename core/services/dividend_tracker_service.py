@@ -0,0 +1,174 @@
+"""
+Serviço de Acompanhamento de Dividendos para HUB Financeiro
+Calendário compartilhado de proventos e projeção de renda por investidor
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+from core.utils.dividend_calculator import (
+    DividendCalendar,
+    merge_events,
+    project_events,
+    project_income,
+    simulate_drip,
+)
+from core.utils.lazy_imports import lazy_import
+from core.utils.metrics import instrument_service
+
+np = lazy_import('numpy')
+
+logger = logging.getLogger(__name__)
+
+# Histórico usado para estimar a periodicidade dos pagamentos
+HISTORY_DAYS = 730
+# Horizonte máximo de projeção, em meses
+MAX_PROJECTION_MONTHS = 36
+# Validade do calendário em memória, em segundos
+CALENDAR_TTL = 3600
+
+
+def load_fixture_schedule(path=None) -> List[dict]:
+    """Lê os proventos de shared/fixtures/dividend_schedule.json"""
+    path = Path(path or settings.BASE_DIR / 'shared' / 'fixtures' / 'dividend_schedule.json')
+    try:
+        with open(path, encoding='utf-8') as handle:
+            content = handle.read().strip()
+    except FileNotFoundError:
+        return []
+    return json.loads(content) if content else []
+
+
+def load_dividend_history(since: date) -> List[dict]:
+    """Proventos anunciados com data-com a partir de since"""
+    from core.models import DividendEvent
+
+    return list(
+        DividendEvent.objects.filter(ex_date__gte=since)
+        .values('symbol', 'ex_date', 'pay_date', 'amount')
+    )
+
+
+@instrument_service
+class DividendTrackerService:
+    """Mantém o calendário de proventos e calcula projeções em lote"""
+
+    def __init__(self):
+        self._calendar: Optional[DividendCalendar] = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def build_calendar(self, today: Optional[date] = None) -> DividendCalendar:
+        """Monta o calendário com eventos anunciados e projetados"""
+        today = today or date.today()
+        # Um provento presente na fixture e no banco conta uma vez só
+        history = merge_events(load_fixture_schedule(), load_dividend_history(today - timedelta(days=HISTORY_DAYS)))
+        until = today + timedelta(days=31 * MAX_PROJECTION_MONTHS)
+
+        calendar = DividendCalendar(history + project_events(history, until=until, today=today))
+        with self._lock:
+            self._calendar = calendar
+            self._built_at = time.monotonic()
+
+        logger.info(f"Calendário de dividendos montado: {len(calendar)} eventos")
+        return calendar
+
+    def calendar(self) -> DividendCalendar:
+        """Calendário atual, reconstruído quando expirado"""
+        with self._lock:
+            calendar = self._calendar
+            fresh = time.monotonic() - self._built_at < CALENDAR_TTL
+        if calendar is None or not fresh:
+            calendar = self.build_calendar()
+        return calendar
+
+    def upcoming_events(self, days: int = 30, symbols=None) -> List[dict]:
+        """Pagamentos previstos nos próximos dias"""
+        today = date.today()
+        return self.calendar().events(today, today + timedelta(days=days), symbols=symbols)
+
+    def project_user_income(self, holdings: Dict[str, float], months: int = 12) -> dict:
+        """Renda mensal projetada para as posições de um investidor"""
+        months = min(months, MAX_PROJECTION_MONTHS)
+        symbols = list(holdings)
+        income = project_income(
+            self.calendar(),
+            owners=np.zeros(len(symbols), dtype=np.int64),
+            symbols=symbols,
+            quantities=np.array([holdings[s] for s in symbols]),
+            start=date.today().replace(day=1),
+            months=months,
+            owner_count=1,
+        )[0]
+        return _income_summary(income)
+
+    def project_all_users(self, months: int = 12) -> Dict[int, dict]:
+        """Renda projetada para todos os investidores em uma única junção"""
+        from core.models import Investment
+
+        rows = Investment.objects.filter(quantity__gt=0).values_list('user_id', 'symbol', 'quantity')
+        user_ids, symbols, quantities = [], [], []
+        for user_id, symbol, quantity in rows.iterator(chunk_size=10000):
+            user_ids.append(user_id)
+            symbols.append(symbol)
+            quantities.append(float(quantity))
+
+        if not user_ids:
+            return {}
+
+        # Identificadores de usuário compactados em posições contíguas
+        unique_users, owners = np.unique(np.array(user_ids), return_inverse=True)
+        income = project_income(
+            self.calendar(),
+            owners=owners,
+            symbols=symbols,
+            quantities=np.array(quantities),
+            start=date.today().replace(day=1),
+            months=min(months, MAX_PROJECTION_MONTHS),
+            owner_count=len(unique_users),
+        )
+        return {int(user_id): _income_summary(income[row]) for row, user_id in enumerate(unique_users)}
+
+    def simulate_reinvestment(self, shares: float, price: float, dividend_per_share: float,
+                              periods: int, price_growth_rates=(0.0,), periods_per_year: int = 4,
+                              tax_rate: float = 0.0) -> List[dict]:
+        """Cenários de DRIP com diferentes taxas anuais de valorização"""
+        rates = np.asarray(price_growth_rates, dtype=np.float64).reshape(-1, 1)
+        steps = np.arange(1, periods + 1)
+        prices = price * (1 + rates) ** (steps / periods_per_year)
+        dividends = np.broadcast_to(dividend_per_share * prices / price, prices.shape)
+
+        result = simulate_drip(np.full(len(rates), shares), prices, dividends, tax_rate=tax_rate)
+        return [
+            {
+                'price_growth_rate': float(rate),
+                'final_shares': round(float(result['shares'][i, -1]), 6),
+                'final_value': round(float(result['value'][i, -1]), 2),
+                'total_income': round(float(result['total_income'][i]), 2),
+            }
+            for i, rate in enumerate(rates[:, 0])
+        ]
+
+
+def _income_summary(income: np.ndarray) -> dict:
+    start = np.datetime64(date.today().replace(day=1), 'M')
+    return {
+        'total': round(float(income.sum()), 2),
+        'monthly': [
+            {'month': str(start + offset), 'amount': round(float(amount), 2)}
+            for offset, amount in enumerate(income)
+        ],
+    }
+
+
+# Instância compartilhada pelo processo
+dividend_tracker = DividendTrackerService()
@@ -0,0 +1,349 @@
+"""
+Serviço de Câmbio para HUB Financeiro
+Matriz de taxas cruzadas derivada de pares base e série histórica para consultas as-of
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import requests
+from celery import shared_task
+from django.conf import settings
+
+from core.utils.lazy_imports import lazy_import
+from core.utils.metrics import instrument_service
+
+np = lazy_import('numpy')
+
+logger = logging.getLogger(__name__)
+
+ALPHA_VANTAGE_URL = 'https://www.alphavantage.co/query'
+
+# Divergência máxima aceita entre cotação direta e taxa cruzada derivada
+CROSS_RATE_TOLERANCE = 0.005
+
+_INITIAL_CAPACITY = 1024
+
+
+def _timestamp(value=None) -> np.datetime64:
+    if value is None:
+        value = datetime.now(timezone.utc)
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(value, 's')
+
+
+class ForexRateHistory:
+    """
+    Série histórica compacta de taxas contra a moeda pivô.
+
+    Cada linha guarda, para um instante, quantas unidades de cada moeda
+    valem uma unidade da pivô. Taxas cruzadas são derivadas na leitura.
+    """
+
+    def __init__(self, currencies: Sequence[str], pivot: str = 'USD', capacity: int = _INITIAL_CAPACITY):
+        if pivot not in currencies:
+            currencies = [pivot] + list(currencies)
+        self.pivot = pivot
+        self.currencies: List[str] = list(currencies)
+        self.index: Dict[str, int] = {code: i for i, code in enumerate(self.currencies)}
+        self._times = np.empty(capacity, dtype='datetime64[s]')
+        self._rates = np.full((capacity, len(self.currencies)), np.nan)
+        self._size = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return self._size
+
+    def add_currencies(self, codes: Iterable[str]) -> List[str]:
+        """Inclui moedas novas como colunas sem histórico (NaN até a primeira cotação)"""
+        with self._lock:
+            added = [code for code in dict.fromkeys(codes) if code not in self.index]
+            if added:
+                for code in added:
+                    self.index[code] = len(self.currencies)
+                    self.currencies.append(code)
+                extra = np.full((self._rates.shape[0], len(added)), np.nan)
+                self._rates = np.hstack([self._rates, extra])
+            return added
+
+    def _grow(self):
+        capacity = self._times.shape[0] * 2
+        times = np.empty(capacity, dtype='datetime64[s]')
+        times[:self._size] = self._times[:self._size]
+        rates = np.full((capacity, len(self.currencies)), np.nan)
+        rates[:self._size] = self._rates[:self._size]
+        self._times, self._rates = times, rates
+
+    def append(self, pivot_rates: Dict[str, float], at=None):
+        """Registra as taxas pivô→moeda observadas em um instante"""
+        moment = _timestamp(at)
+        row = np.full(len(self.currencies), np.nan)
+        row[self.index[self.pivot]] = 1.0
+        for code, rate in pivot_rates.items():
+            column = self.index.get(code)
+            if column is not None and rate:
+                row[column] = float(rate)
+
+        with self._lock:
+            if self._size:
+                # Moedas sem cotação nova mantêm o último valor conhecido
+                missing = np.isnan(row)
+                row[missing] = self._rates[self._size - 1, missing]
+                if moment < self._times[self._size - 1]:
+                    raise ValueError('Taxas devem ser registradas em ordem cronológica')
+            if self._size == self._times.shape[0]:
+                self._grow()
+            self._times[self._size] = moment
+            self._rates[self._size] = row
+            self._size += 1
+
+    def pivot_rates(self, at=None) -> Optional[np.ndarray]:
+        """Vetor de taxas pivô→moeda vigente no instante informado"""
+        with self._lock:
+            if not self._size:
+                return None
+            if at is None:
+                return self._rates[self._size - 1].copy()
+            position = np.searchsorted(self._times[:self._size], _timestamp(at), side='right') - 1
+            if position < 0:
+                return None
+            return self._rates[position].copy()
+
+    def matrix(self, at=None) -> Optional[np.ndarray]:
+        """Matriz moeda×moeda: matrix[i, j] = unidades de j por unidade de i"""
+        rates = self.pivot_rates(at)
+        if rates is None:
+            return None
+        return rates[None, :] / rates[:, None]
+
+    def rate(self, source: str, target: str, at=None) -> Optional[float]:
+        """Taxa cruzada source→target por triangulação via pivô"""
+        if source == target:
+            return 1.0
+        rates = self.pivot_rates(at)
+        if rates is None or source not in self.index or target not in self.index:
+            return None
+        value = rates[self.index[target]] / rates[self.index[source]]
+        return None if np.isnan(value) else float(value)
+
+    def convert(self, amount: float, source: str, target: str, at=None) -> Optional[float]:
+        rate = self.rate(source, target, at)
+        return None if rate is None else amount * rate
+
+    def convert_many(self, amounts: Iterable[float], sources: Sequence[str], target: str,
+                     times: Optional[Sequence] = None) -> np.ndarray:
+        """Converte vários valores para a moeda alvo, opcionalmente na data de cada um"""
+        amounts = np.asarray(list(amounts), dtype=np.float64)
+        columns = np.array([self.index.get(code, -1) for code in sources], dtype=np.int64)
+        target_column = self.index[target]
+
+        with self._lock:
+            if not self._size:
+                return np.full(amounts.shape, np.nan)
+            if times is None:
+                rows = np.full(amounts.shape, self._size - 1, dtype=np.int64)
+            else:
+                stamps = np.array([_timestamp(t) for t in times], dtype='datetime64[s]')
+                rows = np.searchsorted(self._times[:self._size], stamps, side='right') - 1
+            valid = (rows >= 0) & (columns >= 0)
+            safe_rows = np.where(valid, rows, 0)
+            safe_columns = np.where(valid, columns, 0)
+            factors = self._rates[safe_rows, target_column] / self._rates[safe_rows, safe_columns]
+
+        return np.where(valid, amounts * factors, np.nan)
+
+    def save(self, path: str):
+        """Grava a série em disco (formato .npz)"""
+        with self._lock:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temporary = f'{path}.tmp.npz'
+            np.savez_compressed(
+                temporary,
+                times=self._times[:self._size],
+                # float64: taxas como JPY/BRL perdem casas decimais relevantes em float32
+                rates=self._rates[:self._size],
+                currencies=np.array(self.currencies, dtype=str),
+                pivot=np.array(self.pivot, dtype=str),
+            )
+            os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'ForexRateHistory':
+        """Carrega um snapshot gravado por save(); ValueError se exigir pickle"""
+        with np.load(path, allow_pickle=False) as data:
+            times = data['times']
+            history = cls(data['currencies'].tolist(), pivot=str(data['pivot']),
+                          capacity=max(len(times) * 2, _INITIAL_CAPACITY))
+            history._times[:len(times)] = times
+            history._rates[:len(times)] = data['rates'].astype(np.float64)
+            history._size = len(times)
+        return history
+
+
+def check_cross_rates(history: ForexRateHistory, direct_quotes: Dict[tuple, float],
+                      tolerance: float = CROSS_RATE_TOLERANCE) -> List[dict]:
+    """Compara cotações diretas com as taxas cruzadas derivadas"""
+    inconsistencies = []
+    for (source, target), quoted in direct_quotes.items():
+        derived = history.rate(source, target)
+        if derived is None or not quoted:
+            continue
+        deviation = abs(derived / quoted - 1)
+        if deviation > tolerance:
+            inconsistencies.append({
+                'pair': f'{source}/{target}',
+                'quoted': quoted,
+                'derived': round(derived, 6),
+                'deviation': round(deviation, 6),
+            })
+    return inconsistencies
+
+
+def fetch_rate(session, source: str, target: str) -> Optional[float]:
+    """Cotação direta source→target no provedor"""
+    response = session.get(ALPHA_VANTAGE_URL, params={
+        'function': 'CURRENCY_EXCHANGE_RATE',
+        'from_currency': source,
+        'to_currency': target,
+        'apikey': settings.ALPHA_VANTAGE_API_KEY,
+    }, timeout=10)
+    response.raise_for_status()
+    quote = response.json().get('Realtime Currency Exchange Rate', {})
+    rate = quote.get('5. Exchange Rate')
+    return float(rate) if rate else None
+
+
+@instrument_service
+class ForexService:
+    """Acesso compartilhado à série de câmbio pelos processos web e worker"""
+
+    def __init__(self, path: Optional[str] = None):
+        self._path = path
+        self._history: Optional[ForexRateHistory] = None
+        self._loaded_mtime: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        if self._path is None:
+            self._path = str(settings.FOREX_HISTORY_PATH)
+        return self._path
+
+    def history(self) -> ForexRateHistory:
+        """Série atual, recarregada quando o snapshot em disco muda"""
+        with self._lock:
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                mtime = None
+
+            if mtime is not None and mtime != self._loaded_mtime:
+                try:
+                    self._history = ForexRateHistory.load(self.path)
+                    # Moedas incluídas em FOREX_CURRENCIES depois do snapshot
+                    self._history.add_currencies(settings.FOREX_CURRENCIES)
+                except ValueError as e:
+                    # Snapshot antigo, gravado com arrays de objetos; a próxima cotação o substitui
+                    logger.warning(f"Snapshot de câmbio ignorado: {e}")
+                self._loaded_mtime = mtime
+            if self._history is None:
+                self._history = ForexRateHistory(settings.FOREX_CURRENCIES, pivot=settings.FOREX_PIVOT_CURRENCY)
+
+            return self._history
+
+    def record(self, pivot_rates: Dict[str, float], at=None):
+        """Acrescenta uma observação e grava o snapshot"""
+        history = self.history()
+        history.append(pivot_rates, at=at)
+        with self._lock:
+            history.save(self.path)
+            self._loaded_mtime = os.path.getmtime(self.path)
+
+    def convert(self, amount: float, source: str, target: str, at=None) -> Optional[float]:
+        return self.history().convert(amount, source, target, at=at)
+
+    def rates_table(self, at=None) -> Optional[dict]:
+        """Matriz de taxas cruzadas serializável"""
+        history = self.history()
+        matrix = history.matrix(at)
+        if matrix is None:
+            return None
+        return {
+            'currencies': history.currencies,
+            'rates': [[None if np.isnan(v) else round(float(v), 6) for v in row] for row in matrix],
+        }
+
+    def portfolio_value(self, positions: Iterable[dict], target: str) -> float:
+        """
+        Valor total de posições em várias moedas na moeda alvo.
+
+        Posições sem moeda estão na moeda alvo; as de moedas sem cotação
+        ficam de fora do total e são registradas no log.
+        """
+        total = 0.0
+        foreign = []
+        for position in positions:
+            currency = position.get('currency') or target
+            if currency == target:
+                total += float(position['value'])
+            else:
+                foreign.append((float(position['value']), currency))
+        if not foreign:
+            return total
+
+        amounts, currencies = zip(*foreign)
+        converted = self.history().convert_many(amounts, currencies, target)
+        missing = np.isnan(converted)
+        if missing.any():
+            logger.warning(f"Sem cotação para {sorted(set(np.array(currencies)[missing]))} em {target}")
+        return total + float(np.nansum(converted))
+
+
+# Instância compartilhada pelo processo
+forex_service = ForexService()
+
+
+@shared_task
+def update_forex_rates():
+    """Busca apenas os pares contra a moeda pivô e registra a nova observação"""
+    pivot = settings.FOREX_PIVOT_CURRENCY
+    rates = {}
+    with requests.Session() as session:
+        for currency in settings.FOREX_CURRENCIES:
+            if currency == pivot:
+                continue
+            try:
+                rate = fetch_rate(session, pivot, currency)
+            except (requests.RequestException, ValueError) as e:
+                logger.warning(f"Falha ao cotar {pivot}/{currency}: {e}")
+                continue
+            if rate:
+                rates[currency] = rate
+
+        if not rates:
+            logger.error("Nenhuma cotação de câmbio obtida")
+            return {'updated': 0}
+
+        forex_service.record(rates)
+
+        # Amostra de pares cotados diretamente para validar a triangulação
+        direct_quotes = {}
+        for source, target in settings.FOREX_CHECK_PAIRS:
+            try:
+                direct_quotes[(source, target)] = fetch_rate(session, source, target)
+            except (requests.RequestException, ValueError) as e:
+                logger.warning(f"Falha ao cotar {source}/{target}: {e}")
+
+    for issue in check_cross_rates(forex_service.history(), direct_quotes):
+        logger.warning(f"Taxa cruzada inconsistente: {issue}")
+
+    logger.info(f"Câmbio atualizado: {len(rates)} pares base, {len(settings.FOREX_CURRENCIES) ** 2} taxas derivadas")
+    return {'updated': len(rates)}
@@ -0,0 +1,70 @@
+"""
+Serviço de Análise Fundamentalista para HUB Financeiro
+Atualização diária da matriz de indicadores a partir de fixtures e dados coletados
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import List
+
+from celery import shared_task
+from django.conf import settings
+
+from core.services.fundamentalist_analyzer_service import fundamentalist_analyzer
+
+logger = logging.getLogger(__name__)
+
+
+def load_fixture_metrics(path=None) -> List[dict]:
+    """Lê os indicadores base de shared/fixtures/fundamental_metrics.json"""
+    path = Path(path or settings.BASE_DIR / 'shared' / 'fixtures' / 'fundamental_metrics.json')
+    try:
+        with open(path, encoding='utf-8') as handle:
+            content = handle.read().strip()
+    except FileNotFoundError:
+        logger.warning(f"Fixture de indicadores não encontrada: {path}")
+        return []
+
+    if not content:
+        return []
+
+    data = json.loads(content)
+    # Aceita lista de registros ou dicionário indexado pelo ticker
+    if isinstance(data, dict):
+        return [dict(metrics, symbol=symbol) for symbol, metrics in data.items()]
+    return data
+
+
+def load_scraped_metrics(since=None) -> List[dict]:
+    """Indicadores coletados pelo scraper desde a última execução"""
+    from core.models import FundamentalSnapshot
+
+    queryset = FundamentalSnapshot.objects.all()
+    if since is not None:
+        queryset = queryset.filter(updated_at__gt=since)
+    return list(queryset.values('symbol', 'sector', 'pe', 'pvp', 'dy', 'roe',
+                                'net_margin', 'debt_equity', 'net_debt_ebitda'))
+
+
+@shared_task
+def run_daily_analysis():
+    """Atualiza a matriz fundamentalista com fixtures e dados coletados no dia"""
+    from django.core.cache import cache
+    from django.utils import timezone
+
+    started_at = timezone.now()
+    last_run = cache.get('fundamental_analysis:last_run')
+
+    records = []
+    # Fixtures só entram na carga completa; dados coletados são incrementais
+    if last_run is None or not Path(fundamentalist_analyzer.path).exists():
+        records.extend(load_fixture_metrics())
+        last_run = None
+    records.extend(load_scraped_metrics(since=last_run))
+
+    updated = fundamentalist_analyzer.update(records)
+    cache.set('fundamental_analysis:last_run', started_at, timeout=None)
+
+    logger.info(f"Análise fundamentalista diária: {updated} ativos atualizados")
+    return {'updated': updated, 'total': len(fundamentalist_analyzer.matrix())}
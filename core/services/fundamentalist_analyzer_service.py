@@ -0,0 +1,367 @@
+"""
+Analisador Fundamentalista para HUB Financeiro
+Matriz densa ativo×indicador para screening vetorizado do mercado
+"""
+
+from __future__ import annotations
+
+import logging
+import operator
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core.utils.lazy_imports import lazy_import
+from core.utils.metrics import instrument_service
+
+np = lazy_import('numpy')
+
+logger = logging.getLogger(__name__)
+
+# Indicadores mantidos na matriz (percentuais em pontos, ex.: DY 6.5 = 6,5%)
+METRICS = (
+    'pe',               # Preço / Lucro
+    'pvp',              # Preço / Valor Patrimonial
+    'dy',               # Dividend Yield (%)
+    'roe',              # Retorno sobre Patrimônio (%)
+    'net_margin',       # Margem Líquida (%)
+    'debt_equity',      # Dívida Bruta / Patrimônio
+    'net_debt_ebitda',  # Dívida Líquida / EBITDA
+)
+
+METRIC_INDEX = {name: position for position, name in enumerate(METRICS)}
+
+# Operadores aceitos nos filtros de screening (vetorizados sobre arrays NumPy)
+OPERATORS = {
+    'gt': operator.gt,
+    'gte': operator.ge,
+    'lt': operator.lt,
+    'lte': operator.le,
+    'eq': operator.eq,
+}
+
+_INITIAL_CAPACITY = 512
+
+
+class MetricMatrix:
+    """
+    Matriz de indicadores fundamentalistas de todo o mercado.
+
+    Linhas são ativos e colunas são os indicadores de METRICS; valores
+    ausentes ficam como NaN e nunca passam em filtros. Os percentis por
+    setor são recalculados sob demanda após atualizações.
+    """
+
+    def __init__(self, capacity: int = _INITIAL_CAPACITY):
+        self._values = np.full((capacity, len(METRICS)), np.nan)
+        self._percentiles = np.full((capacity, len(METRICS)), np.nan)
+        self._sector_codes = np.full(capacity, -1, dtype=np.int32)
+        self._symbols: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._sectors: List[str] = []
+        self._sector_ids: Dict[str, int] = {}
+        self._dirty_sectors = set()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._symbols)
+
+    def __contains__(self, symbol):
+        return symbol in self._rows
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._symbols)
+
+    def _grow(self, needed: int):
+        capacity = self._values.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        extra = capacity - self._values.shape[0]
+        self._values = np.vstack([self._values, np.full((extra, len(METRICS)), np.nan)])
+        self._percentiles = np.vstack([self._percentiles, np.full((extra, len(METRICS)), np.nan)])
+        self._sector_codes = np.concatenate([self._sector_codes, np.full(extra, -1, dtype=np.int32)])
+
+    def _sector_code(self, sector: Optional[str]) -> int:
+        if not sector:
+            return -1
+        if sector not in self._sector_ids:
+            self._sector_ids[sector] = len(self._sectors)
+            self._sectors.append(sector)
+        return self._sector_ids[sector]
+
+    def upsert(self, symbol: str, metrics: Dict[str, Optional[float]], sector: Optional[str] = None):
+        """Insere ou atualiza os indicadores de um ativo"""
+        with self._lock:
+            row = self._rows.get(symbol)
+            if row is None:
+                row = len(self._symbols)
+                self._grow(row + 1)
+                self._symbols.append(symbol)
+                self._rows[symbol] = row
+
+            if sector is not None:
+                previous = self._sector_codes[row]
+                code = self._sector_code(sector)
+                if previous != code:
+                    self._dirty_sectors.add(int(previous))
+                    self._sector_codes[row] = code
+
+            for name, value in metrics.items():
+                column = METRIC_INDEX.get(name)
+                if column is None:
+                    continue
+                self._values[row, column] = np.nan if value is None else float(value)
+
+            self._dirty_sectors.add(int(self._sector_codes[row]))
+
+    def bulk_upsert(self, records: Iterable[dict]):
+        """Atualiza vários ativos; cada registro traz 'symbol', 'sector' e indicadores"""
+        count = 0
+        with self._lock:
+            for record in records:
+                symbol = record.get('symbol')
+                if not symbol:
+                    continue
+                self.upsert(symbol, record, sector=record.get('sector'))
+                count += 1
+            self.refresh_percentiles()
+        return count
+
+    def refresh_percentiles(self):
+        """Recalcula os percentis apenas dos setores alterados"""
+        with self._lock:
+            if not self._dirty_sectors:
+                return
+            size = len(self._symbols)
+            codes = self._sector_codes[:size]
+            for code in self._dirty_sectors:
+                rows = np.flatnonzero(codes == code)
+                if rows.size:
+                    self._percentiles[rows] = _percentile_ranks(self._values[rows])
+            self._dirty_sectors.clear()
+
+    def get(self, symbol: str) -> Optional[dict]:
+        """Indicadores e percentis setoriais de um ativo"""
+        with self._lock:
+            row = self._rows.get(symbol)
+            if row is None:
+                return None
+            self.refresh_percentiles()
+            return self._row_dict(row)
+
+    def _row_dict(self, row: int) -> dict:
+        code = self._sector_codes[row]
+        result = {
+            'symbol': self._symbols[row],
+            'sector': self._sectors[code] if code >= 0 else None,
+        }
+        for name, column in METRIC_INDEX.items():
+            value = self._values[row, column]
+            percentile = self._percentiles[row, column]
+            result[name] = None if np.isnan(value) else float(value)
+            result[f'{name}_sector_pct'] = None if np.isnan(percentile) else round(float(percentile), 4)
+        return result
+
+    def screen(
+        self,
+        filters: Sequence[Tuple[str, str, float]] = (),
+        order_by: Optional[str] = None,
+        descending: bool = True,
+        sector: Optional[str] = None,
+        limit: Optional[int] = 50,
+    ) -> List[dict]:
+        """
+        Executa um screening vetorizado sobre todo o mercado.
+
+        Exemplo: filters=[('dy', 'gt', 6), ('pvp', 'lt', 1)], order_by='roe'
+        """
+        with self._lock:
+            self.refresh_percentiles()
+            size = len(self._symbols)
+            values = self._values[:size]
+            mask = np.ones(size, dtype=bool)
+
+            if sector is not None:
+                code = self._sector_ids.get(sector)
+                if code is None:
+                    return []
+                mask &= self._sector_codes[:size] == code
+
+            for metric, comparison, threshold in filters:
+                column = _metric_column(metric)
+                compare = OPERATORS.get(comparison)
+                if compare is None:
+                    raise ValueError(f"Operador inválido: {comparison}")
+                # Comparações com NaN resultam em False
+                with np.errstate(invalid='ignore'):
+                    mask &= compare(values[:, column], threshold)
+
+            rows = np.flatnonzero(mask)
+
+            if order_by is not None and rows.size:
+                ranking = values[rows, _metric_column(order_by)]
+                # NaN sempre ao final, independentemente da direção
+                keys = np.where(np.isnan(ranking), np.inf, -ranking if descending else ranking)
+                if limit is not None and limit < rows.size:
+                    top = np.argpartition(keys, limit)[:limit]
+                    rows = rows[top[np.argsort(keys[top], kind='stable')]]
+                else:
+                    rows = rows[np.argsort(keys, kind='stable')]
+
+            if limit is not None:
+                rows = rows[:limit]
+
+            return [self._row_dict(int(row)) for row in rows]
+
+    def save(self, path: str):
+        """Grava um snapshot da matriz em disco (formato .npz)"""
+        with self._lock:
+            self.refresh_percentiles()
+            size = len(self._symbols)
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temporary = f'{path}.tmp.npz'
+            np.savez_compressed(
+                temporary,
+                values=self._values[:size],
+                percentiles=self._percentiles[:size],
+                sector_codes=self._sector_codes[:size],
+                # Texto em arrays unicode de largura fixa: o snapshot carrega sem pickle
+                symbols=np.array(self._symbols, dtype=str),
+                sectors=np.array(self._sectors, dtype=str),
+                metrics=np.array(METRICS, dtype=str),
+            )
+            os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'MetricMatrix':
+        """Carrega um snapshot gravado por save(); ValueError se exigir pickle"""
+        with np.load(path, allow_pickle=False) as data:
+            stored_metrics = data['metrics'].tolist()
+            symbols = data['symbols'].tolist()
+            matrix = cls(capacity=max(len(symbols), _INITIAL_CAPACITY))
+            size = len(symbols)
+
+            # Colunas alinhadas por nome, tolerando snapshots de versões anteriores
+            for position, name in enumerate(stored_metrics):
+                column = METRIC_INDEX.get(name)
+                if column is not None:
+                    matrix._values[:size, column] = data['values'][:, position]
+                    matrix._percentiles[:size, column] = data['percentiles'][:, position]
+
+            matrix._sector_codes[:size] = data['sector_codes']
+            matrix._symbols = symbols
+            matrix._rows = {symbol: row for row, symbol in enumerate(symbols)}
+            matrix._sectors = data['sectors'].tolist()
+            matrix._sector_ids = {sector: code for code, sector in enumerate(matrix._sectors)}
+            if set(stored_metrics) != set(METRICS):
+                matrix._dirty_sectors = set(int(code) for code in np.unique(matrix._sector_codes[:size]))
+        return matrix
+
+
+def _metric_column(metric: str) -> int:
+    column = METRIC_INDEX.get(metric)
+    if column is None:
+        raise ValueError(f"Indicador desconhecido: {metric}")
+    return column
+
+
+def _percentile_ranks(values: np.ndarray) -> np.ndarray:
+    """Percentil (0-1) de cada valor dentro da sua coluna, ignorando NaN"""
+    ranks = np.full(values.shape, np.nan)
+    for column in range(values.shape[1]):
+        series = values[:, column]
+        valid = np.flatnonzero(~np.isnan(series))
+        if valid.size == 0:
+            continue
+        if valid.size == 1:
+            ranks[valid, column] = 1.0
+            continue
+        order = np.argsort(series[valid], kind='stable')
+        positions = np.empty(valid.size)
+        positions[order] = np.arange(valid.size)
+        ranks[valid, column] = positions / (valid.size - 1)
+    return ranks
+
+
+def parse_filters(params: Dict[str, str]) -> List[Tuple[str, str, float]]:
+    """
+    Converte parâmetros no formato '<indicador>__<operador>=<valor>'.
+
+    Exemplo: {'dy__gt': '6', 'pvp__lt': '1'}
+    """
+    filters = []
+    for key, raw in params.items():
+        if '__' not in key:
+            continue
+        metric, comparison = key.split('__', 1)
+        if metric not in METRIC_INDEX or comparison not in OPERATORS:
+            continue
+        try:
+            filters.append((metric, comparison, float(raw)))
+        except (TypeError, ValueError):
+            raise ValueError(f"Valor inválido para {key}: {raw}")
+    return filters
+
+
+@instrument_service
+class FundamentalistAnalyzerService:
+    """Acesso compartilhado à matriz fundamentalista pelos processos web e worker"""
+
+    def __init__(self, path: Optional[str] = None):
+        self._path = path
+        self._matrix: Optional[MetricMatrix] = None
+        self._loaded_mtime: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        if self._path is None:
+            from django.conf import settings
+            self._path = str(settings.FUNDAMENTAL_MATRIX_PATH)
+        return self._path
+
+    def matrix(self) -> MetricMatrix:
+        """Matriz atual, recarregada quando o snapshot em disco muda"""
+        with self._lock:
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                mtime = None
+
+            if mtime is not None and mtime != self._loaded_mtime:
+                try:
+                    self._matrix = MetricMatrix.load(self.path)
+                    logger.info(f"Matriz fundamentalista carregada: {len(self._matrix)} ativos")
+                except ValueError as e:
+                    # Snapshot antigo, gravado com arrays de objetos; o próximo update() o substitui
+                    logger.warning(f"Snapshot da matriz fundamentalista ignorado: {e}")
+                    self._matrix = self._matrix or MetricMatrix()
+                self._loaded_mtime = mtime
+            elif self._matrix is None:
+                self._matrix = MetricMatrix()
+
+            return self._matrix
+
+    def screen(self, **kwargs) -> List[dict]:
+        return self.matrix().screen(**kwargs)
+
+    def get_asset(self, symbol: str) -> Optional[dict]:
+        return self.matrix().get(symbol)
+
+    def update(self, records: Iterable[dict]) -> int:
+        """Aplica registros novos à matriz e grava o snapshot"""
+        matrix = self.matrix()
+        count = matrix.bulk_upsert(records)
+        with self._lock:
+            matrix.save(self.path)
+            self._loaded_mtime = os.path.getmtime(self.path)
+        return count
+
+
+# Instância compartilhada pelo processo
+fundamentalist_analyzer = FundamentalistAnalyzerService()
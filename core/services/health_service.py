@@ -0,0 +1,76 @@
+"""
+Serviço de Saúde para HUB Financeiro
+Verificação dos serviços críticos (banco, cache, broker e snapshots analíticos)
+"""
+
+import logging
+import os
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Idade máxima aceitável de cada snapshot analítico, em segundos
+SNAPSHOT_MAX_AGE = {
+    'FUNDAMENTAL_MATRIX_PATH': 60 * 60 * 30,
+    'FOREX_HISTORY_PATH': 60 * 60 * 2,
+}
+
+
+class HealthService:
+    """Executa as verificações de saúde e mede a latência de cada uma"""
+
+    def check_database(self):
+        from django.db import connection
+
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+    def check_cache(self):
+        from django.core.cache import cache
+
+        cache.set('health:ping', 'pong', timeout=10)
+        if cache.get('health:ping') != 'pong':
+            raise RuntimeError('Cache não retornou o valor gravado')
+
+    def check_broker(self):
+        from celery import current_app
+
+        with current_app.connection_for_write() as connection:
+            connection.ensure_connection(max_retries=1)
+
+    def check_snapshots(self):
+        stale = []
+        for setting, max_age in SNAPSHOT_MAX_AGE.items():
+            path = getattr(settings, setting, None)
+            if path is None or not os.path.exists(path):
+                continue
+            if time.time() - os.path.getmtime(path) > max_age:
+                stale.append(os.path.basename(str(path)))
+        if stale:
+            raise RuntimeError(f"Snapshots desatualizados: {', '.join(stale)}")
+
+    def run_health_check(self, include_broker=True):
+        """Resultado de todas as verificações; status 'ok' somente se todas passarem"""
+        checks = {
+            'database': self.check_database,
+            'cache': self.check_cache,
+            'snapshots': self.check_snapshots,
+        }
+        if include_broker:
+            checks['broker'] = self.check_broker
+
+        results = {}
+        for name, check in checks.items():
+            started = time.perf_counter()
+            try:
+                check()
+                results[name] = {'status': 'ok'}
+            except Exception as e:
+                logger.warning(f"Verificação de saúde falhou ({name}): {e}")
+                results[name] = {'status': 'error', 'error': str(e)}
+            results[name]['latency_ms'] = round((time.perf_counter() - started) * 1000, 2)
+
+        healthy = all(result['status'] == 'ok' for result in results.values())
+        return {'status': 'ok' if healthy else 'error', 'checks': results}
@@ -0,0 +1,117 @@
+"""
+Serviço de Perfil de Investidor para HUB Financeiro
+Perfis de risco e seus vetores de preferência no espaço de características dos ativos
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Optional
+
+from django.conf import settings
+
+from core.utils.lazy_imports import lazy_import
+from core.utils.metrics import instrument_service
+
+np = lazy_import('numpy')
+
+logger = logging.getLogger(__name__)
+
+# Características numéricas dos ativos, na ordem usada pelos vetores
+FEATURES = (
+    'annual_return',  # Retorno anualizado
+    'volatility',     # Volatilidade anualizada
+    'dy',             # Dividend Yield
+    'value',          # Desconto patrimonial (inverso do P/VP)
+    'quality',        # ROE
+    'leverage',       # Dívida / Patrimônio
+)
+
+# Pesos padrão quando shared/fixtures/investor_profiles.json não define o perfil
+DEFAULT_PROFILES = {
+    'conservador': {
+        'weights': {'annual_return': 0.2, 'volatility': -1.0, 'dy': 0.8, 'value': 0.3, 'quality': 0.5, 'leverage': -0.8},
+        'max_volatility': 0.25,
+    },
+    'moderado': {
+        'weights': {'annual_return': 0.6, 'volatility': -0.5, 'dy': 0.5, 'value': 0.4, 'quality': 0.6, 'leverage': -0.4},
+        'max_volatility': 0.40,
+    },
+    'arrojado': {
+        'weights': {'annual_return': 1.0, 'volatility': -0.1, 'dy': 0.1, 'value': 0.3, 'quality': 0.5, 'leverage': -0.1},
+        'max_volatility': None,
+    },
+}
+
+# Penalidade aplicada a setores em que o investidor já está concentrado
+SECTOR_CONCENTRATION_PENALTY = 1.5
+
+
+def load_profiles(path=None) -> Dict[str, dict]:
+    """Perfis padrão sobrescritos pelos definidos na fixture"""
+    profiles = {name: dict(data) for name, data in DEFAULT_PROFILES.items()}
+    path = Path(path or settings.BASE_DIR / 'shared' / 'fixtures' / 'investor_profiles.json')
+    try:
+        with open(path, encoding='utf-8') as handle:
+            content = handle.read().strip()
+    except FileNotFoundError:
+        return profiles
+
+    if content:
+        for record in json.loads(content):
+            # Aceita registros simples ou no formato de fixture do Django
+            data = record.get('fields', record)
+            name = data.get('name') or data.get('code')
+            if name and data.get('weights'):
+                profiles[name] = {**profiles.get(name, {}), **data}
+    return profiles
+
+
+def profile_vector(profile: dict, sectors=()) -> np.ndarray:
+    """Vetor de preferências do perfil (características + setores)"""
+    weights = profile.get('weights', {})
+    numeric = np.array([float(weights.get(name, 0.0)) for name in FEATURES])
+    sector_weights = profile.get('sector_weights', {})
+    sector_part = np.array([float(sector_weights.get(sector, 0.0)) for sector in sectors])
+    return np.concatenate([numeric, sector_part])
+
+
+def user_vector(profile: dict, sectors, sector_exposure: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """Vetor do perfil ajustado pela concentração setorial da carteira do usuário"""
+    vector = profile_vector(profile, sectors)
+    if sector_exposure:
+        offset = len(FEATURES)
+        for position, sector in enumerate(sectors):
+            share = sector_exposure.get(sector, 0.0)
+            vector[offset + position] -= SECTOR_CONCENTRATION_PENALTY * share
+    return vector
+
+
+@instrument_service
+class InvestorProfileService:
+    """Consulta de perfis de investidor"""
+
+    def __init__(self):
+        self._profiles: Optional[Dict[str, dict]] = None
+
+    @property
+    def profiles(self) -> Dict[str, dict]:
+        if self._profiles is None:
+            self._profiles = load_profiles()
+        return self._profiles
+
+    def get_profile_name(self, name: Optional[str]) -> str:
+        """Nome do perfil, com 'moderado' para nomes ausentes ou desconhecidos"""
+        return name if name in self.profiles else 'moderado'
+
+    def get_profile(self, name: Optional[str]) -> dict:
+        return self.profiles[self.get_profile_name(name)]
+
+    def get_user_profile_name(self, user) -> str:
+        return self.get_profile_name(getattr(user, 'investor_profile', None))
+
+
+# Instância compartilhada pelo processo
+investor_profile_service = InvestorProfileService()
@@ -0,0 +1,136 @@
+"""
+Serviço de Manutenção para HUB Financeiro
+Rollups diários de barras intradiárias e sinais e retenção por partição
+"""
+
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from celery import shared_task
+from django.db import connection
+
+from core.utils.partitions import PARTITIONED_TABLES, ensure_partitions, expire_partitions
+
+logger = logging.getLogger(__name__)
+
+# Dias dos rollups no fuso do pregão da B3, não no fuso da sessão do banco (UTC)
+MARKET_TIMEZONE = 'America/Sao_Paulo'
+
+# Barras de 1 minuto agregadas em OHLCV diário por ativo
+_ROLLUP_BARS_SQL = """
+INSERT INTO intraday_bars_daily (symbol, date, open, high, low, close, volume, bars)
+SELECT
+    symbol,
+    ("timestamp" AT TIME ZONE %(tz)s)::date AS day,
+    (array_agg(open ORDER BY "timestamp"))[1],
+    max(high),
+    min(low),
+    (array_agg(close ORDER BY "timestamp" DESC))[1],
+    sum(volume),
+    count(*)
+FROM intraday_bars
+WHERE "timestamp" >= %(start)s AND "timestamp" < %(end)s
+GROUP BY symbol, day
+ON CONFLICT (symbol, date) DO UPDATE SET
+    open = EXCLUDED.open,
+    high = EXCLUDED.high,
+    low = EXCLUDED.low,
+    close = EXCLUDED.close,
+    volume = EXCLUDED.volume,
+    bars = EXCLUDED.bars
+"""
+
+# Sinais agregados por ativo, dia e tipo
+_ROLLUP_SIGNALS_SQL = """
+INSERT INTO trading_signals_daily (symbol, date, signal_type, signals, avg_confidence)
+SELECT symbol, (created_at AT TIME ZONE %(tz)s)::date AS day, signal_type, count(*), avg(confidence)
+FROM trading_signals
+WHERE created_at >= %(start)s AND created_at < %(end)s
+GROUP BY symbol, day, signal_type
+ON CONFLICT (symbol, date, signal_type) DO UPDATE SET
+    signals = EXCLUDED.signals,
+    avg_confidence = EXCLUDED.avg_confidence
+"""
+
+# Tabela de origem, coluna de tempo, tabela de rollup e SQL de agregação
+ROLLUPS = {
+    'intraday_bars': ('timestamp', 'intraday_bars_daily', _ROLLUP_BARS_SQL),
+    'trading_signals': ('created_at', 'trading_signals_daily', _ROLLUP_SIGNALS_SQL),
+}
+
+
+def _rollup_start(source: str, column: str, target: str) -> Optional[date]:
+    """
+    Primeiro dia a agregar: o último dia já presente no rollup (refeito, pois
+    pode ter sido agregado incompleto) ou o dia mais antigo da origem.
+    """
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT max(date) FROM {quote(target)}")
+        last = cursor.fetchone()[0]
+        if last is not None:
+            return last
+        cursor.execute(f"SELECT (min({quote(column)}) AT TIME ZONE %s)::date FROM {quote(source)}",
+                       [MARKET_TIMEZONE])
+        return cursor.fetchone()[0]
+
+
+def rollup(source: str, until: Optional[date] = None) -> int:
+    """Agrega a origem em rollups diários até o dia anterior a 'until'; retorna os dias processados"""
+    column, target, sql = ROLLUPS[source]
+    until = until or date.today()
+    start = _rollup_start(source, column, target)
+    if start is None or start >= until:
+        return 0
+
+    tz = ZoneInfo(MARKET_TIMEZONE)
+    days = 0
+    day = start
+    with connection.cursor() as cursor:
+        # Um dia por comando mantém cada agregação dentro de uma única partição
+        while day < until:
+            following = day + timedelta(days=1)
+            cursor.execute(sql, {
+                'tz': MARKET_TIMEZONE,
+                'start': datetime.combine(day, time.min, tz),
+                'end': datetime.combine(following, time.min, tz),
+            })
+            day = following
+            days += 1
+    logger.info(f"Rollup de {source}: {days} dias a partir de {start}")
+    return days
+
+
+@shared_task
+def cleanup_old_data():
+    """
+    Manutenção diária das séries temporais: cria partições futuras, atualiza
+    os rollups e expira partições antigas com DROP/DETACH em vez de DELETE.
+    """
+    summary = {}
+    for table in PARTITIONED_TABLES:
+        summary[table] = result = {'created': [], 'rolled_up_days': 0, 'expired': []}
+        # Cada etapa falha sozinha: um erro ao criar partições não impede rollup e expiração
+        try:
+            result['created'] = ensure_partitions(table)
+        except Exception as e:
+            logger.error(f"Erro ao criar partições de {table}: {e}")
+            result.setdefault('errors', {})['created'] = str(e)
+
+        if table in ROLLUPS:
+            try:
+                result['rolled_up_days'] = rollup(table)
+            except Exception as e:
+                logger.error(f"Erro no rollup de {table}: {e}")
+                result.setdefault('errors', {})['rolled_up_days'] = str(e)
+                # Expirar sem o rollup perderia dias ainda não agregados
+                continue
+
+        try:
+            result['expired'] = expire_partitions(table)
+        except Exception as e:
+            logger.error(f"Erro ao expirar partições de {table}: {e}")
+            result.setdefault('errors', {})['expired'] = str(e)
+    return summary
@@ -0,0 +1,479 @@
+"""
+Serviço de Alertas de Mercado para HUB Financeiro
+Avaliação orientada a eventos com índice de níveis de preço por ativo
+"""
+
+import logging
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from celery import shared_task
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+# Tipos de alerta suportados
+ALERT_ABOVE = 'above'              # preço cruza para cima de um nível
+ALERT_BELOW = 'below'              # preço cruza para baixo de um nível
+ALERT_PERCENT_UP = 'percent_up'    # alta de X% sobre o preço de referência
+ALERT_PERCENT_DOWN = 'percent_down'  # queda de X% sobre o preço de referência
+ALERT_RANGE_ENTER = 'range_enter'  # preço entra na faixa [low, high]
+ALERT_RANGE_EXIT = 'range_exit'    # preço sai da faixa [low, high]
+
+ALERT_TYPES = (
+    ALERT_ABOVE, ALERT_BELOW, ALERT_PERCENT_UP, ALERT_PERCENT_DOWN,
+    ALERT_RANGE_ENTER, ALERT_RANGE_EXIT,
+)
+
+_UP = 'up'
+_DOWN = 'down'
+
+# Log de alterações dos alertas: cada alteração confirmada incrementa a versão e
+# grava o id do alerta sob essa versão. O processo que consome os ticks aplica
+# as alterações desde a sua versão e só reconstrói o índice se o log tiver lacunas
+INDEX_VERSION_KEY = 'alerts:index_version'
+CHANGE_KEY = 'alerts:change:{version}'
+CHANGE_TTL = 60 * 60 * 24
+MAX_REPLAY = 10_000
+
+
+@dataclass
+class MarketAlert:
+    """Alerta de preço cadastrado por um usuário"""
+    alert_id: int
+    user_id: int
+    symbol: str
+    alert_type: str
+    value: float = 0.0
+    high: Optional[float] = None
+    reference_price: Optional[float] = None
+    repeat: bool = False
+
+
+@dataclass
+class _Level:
+    """Nível de preço indexado e a condição que valida o disparo"""
+    direction: str
+    threshold: float
+    guard_low: Optional[float] = None
+    guard_high: Optional[float] = None
+
+    def accepts(self, price: float) -> bool:
+        if self.guard_low is not None and price < self.guard_low:
+            return False
+        if self.guard_high is not None and price > self.guard_high:
+            return False
+        return True
+
+
+def _levels_for(alert: MarketAlert) -> List[_Level]:
+    """Converte um alerta em níveis absolutos de cruzamento"""
+    kind = alert.alert_type
+
+    if kind == ALERT_ABOVE:
+        return [_Level(_UP, alert.value)]
+    if kind == ALERT_BELOW:
+        return [_Level(_DOWN, alert.value)]
+
+    if kind in (ALERT_PERCENT_UP, ALERT_PERCENT_DOWN):
+        if not alert.reference_price:
+            raise ValueError(f"Alerta {alert.alert_id} sem preço de referência")
+        factor = alert.value / 100
+        if kind == ALERT_PERCENT_UP:
+            return [_Level(_UP, alert.reference_price * (1 + factor))]
+        return [_Level(_DOWN, alert.reference_price * (1 - factor))]
+
+    if kind in (ALERT_RANGE_ENTER, ALERT_RANGE_EXIT):
+        low, high = alert.value, alert.high
+        if high is None or high < low:
+            raise ValueError(f"Faixa inválida no alerta {alert.alert_id}")
+        if kind == ALERT_RANGE_ENTER:
+            # Entrada por baixo (cruza low) ou por cima (cruza high),
+            # disparando apenas se o preço final estiver dentro da faixa
+            return [
+                _Level(_UP, low, guard_high=high),
+                _Level(_DOWN, high, guard_low=low),
+            ]
+        return [_Level(_UP, high), _Level(_DOWN, low)]
+
+    raise ValueError(f"Tipo de alerta desconhecido: {kind}")
+
+
+class _SymbolBook:
+    """Níveis ordenados de um ativo, separados por direção de cruzamento"""
+
+    __slots__ = ('up_prices', 'up_keys', 'down_prices', 'down_keys', 'last_price')
+
+    def __init__(self):
+        self.up_prices: List[float] = []
+        self.up_keys: List[tuple] = []
+        self.down_prices: List[float] = []
+        self.down_keys: List[tuple] = []
+        self.last_price: Optional[float] = None
+
+    def _arrays(self, direction):
+        if direction == _UP:
+            return self.up_prices, self.up_keys
+        return self.down_prices, self.down_keys
+
+    def add(self, direction: str, price: float, key: tuple):
+        prices, keys = self._arrays(direction)
+        position = bisect_right(prices, price)
+        prices.insert(position, price)
+        keys.insert(position, key)
+
+    def remove(self, direction: str, price: float, key: tuple) -> bool:
+        prices, keys = self._arrays(direction)
+        position = bisect_left(prices, price)
+        end = bisect_right(prices, price)
+        while position < end:
+            if keys[position] == key:
+                del prices[position]
+                del keys[position]
+                return True
+            position += 1
+        return False
+
+    def crossed(self, old: float, new: float) -> List[tuple]:
+        """Chaves dos níveis cruzados no movimento old -> new"""
+        if new > old:
+            # Níveis em (old, new]
+            start = bisect_right(self.up_prices, old)
+            end = bisect_right(self.up_prices, new)
+            return self.up_keys[start:end]
+        if new < old:
+            # Níveis em [new, old)
+            start = bisect_left(self.down_prices, new)
+            end = bisect_left(self.down_prices, old)
+            return self.down_keys[start:end]
+        return []
+
+    def __len__(self):
+        return len(self.up_prices) + len(self.down_prices)
+
+
+class AlertIndex:
+    """
+    Índice em memória de alertas de preço.
+
+    Cada tick avalia somente os níveis cruzados desde o último preço
+    conhecido do ativo, em O(log n + k) via busca binária.
+    """
+
+    def __init__(self):
+        self._books: Dict[str, _SymbolBook] = {}
+        self._alerts: Dict[int, MarketAlert] = {}
+        self._levels: Dict[int, List[_Level]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._alerts)
+
+    def __contains__(self, alert_id):
+        return alert_id in self._alerts
+
+    def rebuild(self, alerts: Iterable[MarketAlert], prices: Optional[Dict[str, float]] = None):
+        """
+        Reconstrói o índice inteiro a partir de uma lista de alertas.
+
+        prices define o último preço dos ativos ainda sem tick recebido, para
+        que o primeiro tick após a carga já possa disparar alertas.
+        """
+        books: Dict[str, _SymbolBook] = {}
+        registry: Dict[int, MarketAlert] = {}
+        levels_by_alert: Dict[int, List[_Level]] = {}
+        staged: Dict[str, Dict[str, list]] = {}
+
+        for alert in alerts:
+            try:
+                levels = _levels_for(alert)
+            except ValueError as e:
+                logger.warning(f"Alerta ignorado na reconstrução: {e}")
+                continue
+            registry[alert.alert_id] = alert
+            levels_by_alert[alert.alert_id] = levels
+            symbol_levels = staged.setdefault(alert.symbol, {_UP: [], _DOWN: []})
+            for number, level in enumerate(levels):
+                symbol_levels[level.direction].append((level.threshold, (alert.alert_id, number)))
+
+        # Ordenação única por ativo em vez de inserções sucessivas
+        for symbol, by_direction in staged.items():
+            book = _SymbolBook()
+            for direction, entries in by_direction.items():
+                entries.sort()
+                levels_prices, levels_keys = book._arrays(direction)
+                levels_prices.extend(price for price, _ in entries)
+                levels_keys.extend(key for _, key in entries)
+            books[symbol] = book
+
+        with self._lock:
+            previous = self._books
+            # O último preço sobrevive à reconstrução, inclusive de ativos que ficaram sem alertas
+            for symbol, old_book in previous.items():
+                if old_book.last_price is not None:
+                    books.setdefault(symbol, _SymbolBook()).last_price = old_book.last_price
+            self._books = books
+            self._alerts = registry
+            self._levels = levels_by_alert
+            if prices:
+                for symbol, price in prices.items():
+                    book = self._books.setdefault(symbol, _SymbolBook())
+                    if book.last_price is None:
+                        book.last_price = price
+
+        logger.info(f"Índice de alertas reconstruído: {len(registry)} alertas em {len(books)} ativos")
+
+    def seed_price(self, symbol: str, price: float):
+        """Define o último preço conhecido sem disparar alertas"""
+        with self._lock:
+            self._books.setdefault(symbol, _SymbolBook()).last_price = price
+
+    def add(self, alert: MarketAlert):
+        """Adiciona ou substitui um alerta de forma incremental"""
+        levels = _levels_for(alert)
+        with self._lock:
+            self._discard(alert.alert_id)
+            book = self._books.setdefault(alert.symbol, _SymbolBook())
+            for number, level in enumerate(levels):
+                book.add(level.direction, level.threshold, (alert.alert_id, number))
+            self._alerts[alert.alert_id] = alert
+            self._levels[alert.alert_id] = levels
+
+    def remove(self, alert_id: int) -> bool:
+        """Remove um alerta do índice"""
+        with self._lock:
+            return self._discard(alert_id)
+
+    def _discard(self, alert_id: int) -> bool:
+        alert = self._alerts.pop(alert_id, None)
+        if alert is None:
+            return False
+        levels = self._levels.pop(alert_id, [])
+        book = self._books.get(alert.symbol)
+        if book is not None:
+            for number, level in enumerate(levels):
+                book.remove(level.direction, level.threshold, (alert_id, number))
+        return True
+
+    def on_tick(self, symbol: str, price: float) -> List[MarketAlert]:
+        """Processa um tick e retorna os alertas disparados"""
+        with self._lock:
+            # Ativos sem alertas também guardam o último preço: um alerta
+            # cadastrado depois já é avaliado no tick seguinte
+            book = self._books.get(symbol)
+            if book is None:
+                book = self._books[symbol] = _SymbolBook()
+
+            previous = book.last_price
+            book.last_price = price
+            if previous is None or not len(book):
+                return []
+
+            triggered: List[MarketAlert] = []
+            seen = set()
+            for alert_id, number in book.crossed(previous, price):
+                if alert_id in seen:
+                    continue
+                level = self._levels[alert_id][number]
+                if not level.accepts(price):
+                    continue
+                seen.add(alert_id)
+                triggered.append(self._alerts[alert_id])
+
+            # Alertas de disparo único saem do índice
+            for alert in triggered:
+                if not alert.repeat:
+                    self._discard(alert.alert_id)
+
+            return triggered
+
+    def stats(self) -> Dict[str, int]:
+        """Estatísticas do índice"""
+        with self._lock:
+            return {
+                'alerts': len(self._alerts),
+                'symbols': len(self._books),
+                'levels': sum(len(book) for book in self._books.values()),
+            }
+
+
+# Índice compartilhado pelo processo
+alert_index = AlertIndex()
+
+
+def _alert_from_model(instance) -> MarketAlert:
+    """Converte o registro do banco no alerta indexável"""
+    return MarketAlert(
+        alert_id=instance.id,
+        user_id=instance.user_id,
+        symbol=instance.symbol,
+        alert_type=instance.alert_type,
+        value=float(instance.value),
+        high=float(instance.high_value) if instance.high_value is not None else None,
+        reference_price=float(instance.reference_price) if instance.reference_price is not None else None,
+        repeat=instance.repeat,
+    )
+
+
+def load_active_alerts() -> List[MarketAlert]:
+    """Carrega alertas ativos do banco de dados"""
+    from core.models import PriceAlert
+
+    queryset = PriceAlert.objects.filter(is_active=True).only(
+        'id', 'user_id', 'symbol', 'alert_type', 'value',
+        'high_value', 'reference_price', 'repeat',
+    )
+    return [_alert_from_model(row) for row in queryset.iterator(chunk_size=5000)]
+
+
+def load_alerts(alert_ids: Iterable[int]) -> Dict[int, MarketAlert]:
+    """Alertas ativos entre os ids informados, no estado atual do banco"""
+    from core.models import PriceAlert
+
+    queryset = PriceAlert.objects.filter(id__in=list(alert_ids), is_active=True).only(
+        'id', 'user_id', 'symbol', 'alert_type', 'value',
+        'high_value', 'reference_price', 'repeat',
+    )
+    return {row.id: _alert_from_model(row) for row in queryset}
+
+
+def load_last_closes(symbols: Iterable[str]) -> Dict[str, float]:
+    """Último fechamento de cada ativo, usado como preço inicial do índice"""
+    from core.models import HistoricalPrice
+
+    rows = (
+        HistoricalPrice.objects.filter(symbol__in=list(symbols))
+        .order_by('symbol', '-date')
+        .distinct('symbol')
+        .values_list('symbol', 'close')
+    )
+    return {symbol: float(close) for symbol, close in rows}
+
+
+def _publish_change(alert_id: int):
+    cache.add(INDEX_VERSION_KEY, 0, timeout=None)
+    version = cache.incr(INDEX_VERSION_KEY)
+    cache.set(CHANGE_KEY.format(version=version), alert_id, CHANGE_TTL)
+
+
+def sync_alert(instance):
+    """Publica a criação ou edição de um alerta para o processo que avalia os ticks"""
+    alert_id = instance.id
+    transaction.on_commit(lambda: _publish_change(alert_id))
+
+
+def drop_alert(instance):
+    """Publica a exclusão de um alerta para o processo que avalia os ticks"""
+    alert_id = instance.id
+    transaction.on_commit(lambda: _publish_change(alert_id))
+
+
+
+def process_price_tick(symbol: str, price: float) -> List[MarketAlert]:
+    """Avalia um tick de preço e enfileira notificações dos alertas disparados"""
+    triggered = alert_index.on_tick(symbol, price)
+    if triggered:
+        notify_triggered_alerts.delay([
+            {
+                'alert_id': alert.alert_id,
+                'user_id': alert.user_id,
+                'symbol': alert.symbol,
+                'alert_type': alert.alert_type,
+                'price': price,
+                'repeat': alert.repeat,
+            }
+            for alert in triggered
+        ])
+    return triggered
+
+
+_index_version: Optional[int] = None
+_missing_version: Optional[int] = None
+
+
+def rebuild_alert_index() -> Dict[str, int]:
+    """
+    Reconstrói o índice do processo atual a partir do banco, com os últimos
+    fechamentos como preço inicial. Chamado na inicialização do processo que
+    consome os ticks, não por um worker Celery (o índice é local ao processo).
+    """
+    global _index_version, _missing_version
+    # A versão é lida antes da carga: alterações durante a leitura são reaplicadas depois
+    version = cache.get(INDEX_VERSION_KEY, 0)
+    alerts = load_active_alerts()
+    alert_index.rebuild(alerts, prices=load_last_closes({alert.symbol for alert in alerts}))
+    _index_version = version
+    _missing_version = None
+    return alert_index.stats()
+
+
+def apply_alert_changes(alert_ids: Iterable[int]) -> int:
+    """Reindexa os alertas alterados conforme o estado atual do banco; retorna quantos"""
+    alert_ids = set(alert_ids)
+    current = load_alerts(alert_ids)
+    for alert_id in alert_ids:
+        alert = current.get(alert_id)
+        if alert is None:
+            alert_index.remove(alert_id)
+            continue
+        try:
+            alert_index.add(alert)
+        except ValueError as e:
+            alert_index.remove(alert_id)
+            logger.warning(f"Alerta {alert_id} não indexado: {e}")
+    return len(alert_ids)
+
+
+def refresh_alert_index() -> bool:
+    """
+    Aplica as alterações de alertas publicadas desde a última leitura. A
+    reconstrução completa só ocorre quando o log não cobre o intervalo: versão
+    reiniciada, salto maior que MAX_REPLAY ou entrada perdida.
+    """
+    global _index_version, _missing_version
+    version = cache.get(INDEX_VERSION_KEY, 0)
+    if version == _index_version:
+        return False
+    if _index_version is None or version < _index_version or version - _index_version > MAX_REPLAY:
+        rebuild_alert_index()
+        return True
+
+    versions = range(_index_version + 1, version + 1)
+    entries = cache.get_many([CHANGE_KEY.format(version=v) for v in versions])
+    changed = []
+    applied = _index_version
+    for v in versions:
+        key = CHANGE_KEY.format(version=v)
+        if key not in entries:
+            # Versão incrementada e entrada ainda não gravada: espera um ciclo
+            if v == _missing_version:
+                rebuild_alert_index()
+                return True
+            _missing_version = v
+            break
+        changed.append(entries[key])
+        applied = v
+
+    if changed:
+        apply_alert_changes(changed)
+    _index_version = applied
+    return bool(changed)
+
+
+@shared_task
+def notify_triggered_alerts(events):
+    """Desativa alertas de disparo único e notifica os usuários"""
+    from core.models import PriceAlert
+    from core.services.notification_service import send_price_alert
+
+    one_shot = [event['alert_id'] for event in events if not event['repeat']]
+    if one_shot:
+        PriceAlert.objects.filter(id__in=one_shot).update(is_active=False)
+
+    for event in events:
+        send_price_alert(event)
+
+    return len(events)
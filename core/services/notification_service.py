@@ -0,0 +1,104 @@
+"""
+Serviço de Notificações para HUB Financeiro
+Criação e envio de notificações de alertas e proventos
+"""
+
+import logging
+from datetime import date, timedelta
+from typing import Dict, List
+
+from celery import shared_task
+
+from core.utils.fanout import dispatch
+
+logger = logging.getLogger(__name__)
+
+DIVIDEND_NOTICE_DAYS = 3
+# O calendário é indexado pela data de pagamento, que ocorre até ~60 dias após a data-com
+MAX_PAYMENT_LAG_DAYS = 60
+
+
+def notify_user(user_id: int, title: str, message: str, category: str = 'general'):
+    """Registra uma notificação para o usuário"""
+    from core.models import Notification
+
+    return Notification.objects.create(user_id=user_id, title=title, message=message, category=category)
+
+
+def send_price_alert(event: dict):
+    """Notifica o disparo de um alerta de preço"""
+    notify_user(
+        event['user_id'],
+        title=f"Alerta de preço: {event['symbol']}",
+        message=f"{event['symbol']} atingiu R$ {event['price']:.2f}",
+        category='price_alert',
+    )
+
+
+def build_dividend_notices(positions: Dict[int, List[dict]], upcoming: Dict[str, List[dict]]) -> List[dict]:
+    """Um aviso por (usuário, ativo), com a quantidade somada e todos os proventos próximos do ativo"""
+    notices = []
+    for user_id, rows in positions.items():
+        quantities = {}
+        for position in rows:
+            quantities[position['symbol']] = quantities.get(position['symbol'], 0.0) + float(position['quantity'])
+
+        for symbol, quantity in quantities.items():
+            events = upcoming.get(symbol)
+            if not events:
+                continue
+            parts = [
+                f"Data-com em {event['ex_date']:%d/%m}: R$ {quantity * event['amount']:.2f} "
+                f"previstos para {event['pay_date']:%d/%m}"
+                for event in events
+            ]
+            if len(parts) > 1:
+                total = sum(quantity * event['amount'] for event in events)
+                parts.insert(0, f"{len(events)} proventos, R$ {total:.2f} no total")
+            notices.append({'user_id': user_id, 'title': f"Proventos de {symbol}", 'message': '; '.join(parts)})
+    return notices
+
+
+def dividend_notifications_chunk(user_ids: List[int]) -> dict:
+    """Avisa um lote de usuários sobre proventos com data-com próxima"""
+    from core.models import Notification
+    from core.services.dividend_tracker_service import dividend_tracker
+    from core.services.portfolio_service import load_positions
+
+    positions = load_positions(user_ids)
+    symbols = {p['symbol'] for rows in positions.values() for p in rows}
+    today = date.today()
+
+    # Agrupa os eventos por ativo uma vez para todo o lote
+    upcoming = {}
+    notice_until = today + timedelta(days=DIVIDEND_NOTICE_DAYS)
+    window_end = notice_until + timedelta(days=MAX_PAYMENT_LAG_DAYS)
+    for event in dividend_tracker.calendar().events(today, window_end, symbols=symbols):
+        if not event['projected'] and today <= event['ex_date'] <= notice_until:
+            upcoming.setdefault(event['symbol'], []).append(event)
+
+    notices = build_dividend_notices(positions, upcoming)
+
+    # O aviso inclui datas e valores dos eventos: um lote reentregue (ou o dia seguinte
+    # da janela) encontra o mesmo texto e não o duplica. A trava do lote no fan-out
+    # garante um único worker por usuário, então a consulta prévia basta
+    existing = set(
+        Notification.objects.filter(
+            user_id__in=user_ids, category='dividend', title__in={n['title'] for n in notices},
+        ).values_list('user_id', 'title', 'message')
+    )
+    notifications = [
+        Notification(category='dividend', **notice)
+        for notice in notices
+        if (notice['user_id'], notice['title'], notice['message']) not in existing
+    ]
+    Notification.objects.bulk_create(notifications)
+    return {'users': len(positions), 'notifications': len(notifications)}
+
+
+@shared_task
+def send_dividend_notifications():
+    """Distribui os avisos de proventos em lotes por usuário"""
+    from core.services.portfolio_service import active_investor_ids
+
+    return dispatch('dividend_notifications', active_investor_ids(), dividend_notifications_chunk, lane='batch')
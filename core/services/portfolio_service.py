@@ -0,0 +1,112 @@
+"""
+Serviço de Carteira para HUB Financeiro
+Consolidação de posições e cálculo diário de performance por investidor
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List
+
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core.services.forex_service import forex_service
+from core.utils.fanout import dispatch
+
+logger = logging.getLogger(__name__)
+
+PRICE_CACHE_KEY = 'market:price:{symbol}'
+
+
+def active_investor_ids() -> List[int]:
+    """Usuários ativos com ao menos uma posição em carteira"""
+    from core.models import Investment
+
+    return list(
+        Investment.objects.filter(quantity__gt=0, user__is_active=True)
+        .values_list('user_id', flat=True).distinct().order_by('user_id')
+    )
+
+
+def latest_prices(symbols: Iterable[str]) -> Dict[str, float]:
+    """Último preço de cada ativo, do cache de mercado ou do histórico"""
+    from core.models import HistoricalPrice
+
+    symbols = set(symbols)
+    cached = cache.get_many([PRICE_CACHE_KEY.format(symbol=s) for s in symbols])
+    prices = {key.rsplit(':', 1)[1]: float(value) for key, value in cached.items()}
+
+    missing = symbols - prices.keys()
+    if missing:
+        rows = (
+            HistoricalPrice.objects.filter(symbol__in=missing)
+            .order_by('symbol', '-date').distinct('symbol')
+            .values_list('symbol', 'close')
+        )
+        prices.update({symbol: float(close) for symbol, close in rows})
+    return prices
+
+
+def load_positions(user_ids: Iterable[int]) -> Dict[int, List[dict]]:
+    """Posições de vários usuários em uma única consulta"""
+    from core.models import Investment
+
+    positions = defaultdict(list)
+    rows = Investment.objects.filter(user_id__in=list(user_ids), quantity__gt=0).values(
+        'user_id', 'symbol', 'quantity', 'average_price', 'currency',
+    )
+    for row in rows:
+        positions[row['user_id']].append(row)
+    return positions
+
+
+def calculate_performance_chunk(user_ids: List[int]) -> dict:
+    """Grava o snapshot diário de performance de um lote de usuários"""
+    from core.models import PortfolioSnapshot
+
+    positions = load_positions(user_ids)
+    prices = latest_prices({p['symbol'] for rows in positions.values() for p in rows})
+    today = date.today()
+
+    # Posições em moeda estrangeira convertidas pela taxa vigente na moeda da carteira
+    base = settings.PORTFOLIO_CURRENCY
+    snapshots = []
+    for user_id, rows in positions.items():
+        invested = forex_service.portfolio_value((
+            {'value': float(p['quantity']) * float(p['average_price']), 'currency': p['currency']}
+            for p in rows
+        ), base)
+        market_value = forex_service.portfolio_value((
+            {'value': float(p['quantity']) * prices.get(p['symbol'], float(p['average_price'])),
+             'currency': p['currency']}
+            for p in rows
+        ), base)
+        snapshots.append(PortfolioSnapshot(
+            user_id=user_id,
+            date=today,
+            invested=invested,
+            market_value=market_value,
+            profit=market_value - invested,
+        ))
+
+    # Reexecuções no mesmo dia substituem o snapshot existente (um worker por lote, via trava do fan-out)
+    with transaction.atomic():
+        existing = dict(
+            PortfolioSnapshot.objects.filter(user_id__in=user_ids, date=today).values_list('user_id', 'pk')
+        )
+        for snapshot in snapshots:
+            snapshot.pk = existing.get(snapshot.user_id)
+        PortfolioSnapshot.objects.bulk_update(
+            [s for s in snapshots if s.pk is not None], ['invested', 'market_value', 'profit'],
+        )
+        PortfolioSnapshot.objects.bulk_create([s for s in snapshots if s.pk is None])
+    return {'users': len(snapshots)}
+
+
+@shared_task
+def calculate_daily_performance():
+    """Distribui o cálculo diário de performance em lotes por usuário"""
+    return dispatch('portfolio_performance', active_investor_ids(), calculate_performance_chunk, lane='batch')
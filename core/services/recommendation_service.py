@@ -0,0 +1,320 @@
+"""
+Serviço de Recomendações para HUB Financeiro
+Vetores de características pré-calculados, índice de vizinhos mais próximos e candidatos por perfil
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from celery import shared_task
+from django.core.cache import cache
+
+from core.services.fundamentalist_analyzer_service import fundamentalist_analyzer
+from core.services.investor_profile_service import (
+    FEATURES,
+    investor_profile_service,
+    profile_vector,
+    user_vector,
+)
+from core.utils.lazy_imports import lazy_import, optional_lazy_import
+from core.utils.metrics import instrument_service, record_cache_lookup
+
+np = lazy_import('numpy')
+# Dependência opcional para universos grandes
+hnswlib = optional_lazy_import('hnswlib')
+
+logger = logging.getLogger(__name__)
+
+# Acima deste número de ativos usa-se o índice aproximado, se disponível
+ANN_THRESHOLD = 20000
+# Candidatos guardados por perfil na atualização noturna
+CANDIDATES_PER_PROFILE = 200
+DEFAULT_RECOMMENDATIONS = 10
+RETURN_WINDOW_DAYS = 365
+TRADING_DAYS = 252
+
+CANDIDATES_CACHE_KEY = 'recommendations:candidates:{profile}'
+# Cópia sem expiração servida enquanto a atualização roda no worker
+STALE_CANDIDATES_CACHE_KEY = 'recommendations:candidates:{profile}:stale'
+REFRESH_LOCK_KEY = 'recommendations:candidates:refreshing'
+USER_CACHE_KEY = 'recommendations:user:{user_id}:{profile}'
+CANDIDATES_TIMEOUT = 60 * 60 * 26
+REFRESH_LOCK_TIMEOUT = 60 * 30
+USER_TIMEOUT = 60 * 60
+
+
+class AssetFeatures:
+    """Matriz ativo×característica padronizada (z-score) com one-hot de setor"""
+
+    def __init__(self, symbols: Sequence[str], raw: np.ndarray, sectors: Sequence[Optional[str]]):
+        self.symbols = list(symbols)
+        self.raw = raw
+        self.sector_names = sorted({s for s in sectors if s})
+        sector_index = {name: i for i, name in enumerate(self.sector_names)}
+        self.sectors = list(sectors)
+
+        mean = np.nanmean(raw, axis=0) if len(raw) else np.zeros(raw.shape[1])
+        std = np.nanstd(raw, axis=0) if len(raw) else np.ones(raw.shape[1])
+        mean = np.nan_to_num(mean)
+        std = np.where(np.nan_to_num(std) > 0, std, 1.0)
+        # Valores ausentes equivalem à média do mercado
+        standardized = np.nan_to_num((raw - mean) / std)
+
+        one_hot = np.zeros((len(self.symbols), len(self.sector_names)))
+        for row, sector in enumerate(sectors):
+            if sector in sector_index:
+                one_hot[row, sector_index[sector]] = 1.0
+
+        self.vectors = np.hstack([standardized, one_hot])
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def column(self, name: str) -> np.ndarray:
+        return self.raw[:, FEATURES.index(name)]
+
+
+class NearestNeighbourIndex:
+    """
+    Busca por maior produto interno.
+
+    Universos pequenos usam produto matricial exato; acima de ANN_THRESHOLD,
+    com hnswlib instalado, usa-se um grafo HNSW aproximado.
+    """
+
+    def __init__(self, vectors: np.ndarray, ann_threshold: int = ANN_THRESHOLD):
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self._ann = None
+        if hnswlib is not None and len(vectors) > ann_threshold:
+            self._ann = hnswlib.Index(space='ip', dim=self.vectors.shape[1])
+            self._ann.init_index(max_elements=len(vectors), ef_construction=200, M=16)
+            self._ann.add_items(self.vectors, np.arange(len(vectors)))
+
+    @property
+    def approximate(self) -> bool:
+        return self._ann is not None
+
+    def search(self, query: np.ndarray, k: int, mask: Optional[np.ndarray] = None):
+        """Índices e escores dos k vetores de maior produto interno com query"""
+        query = np.asarray(query, dtype=np.float32)
+        size = len(self.vectors)
+        k = min(k, size)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        if self._ann is not None:
+            # Busca ampliada para compensar os itens removidos pela máscara
+            wanted = min(size, k * 4 if mask is not None else k)
+            self._ann.set_ef(max(wanted, 50))
+            labels, distances = self._ann.knn_query(query, k=wanted)
+            labels = labels[0].astype(np.int64)
+            scores = 1 - distances[0]
+            if mask is not None:
+                keep = mask[labels]
+                labels, scores = labels[keep], scores[keep]
+            return labels[:k], scores[:k]
+
+        scores = self.vectors @ query
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        top = top[np.isfinite(scores[top])]
+        return top, scores[top]
+
+
+def load_return_statistics(symbols: Sequence[str]) -> np.ndarray:
+    """Retorno e volatilidade anualizados de cada ativo (NaN sem histórico)"""
+    from core.models import HistoricalPrice
+
+    since = date.today() - timedelta(days=RETURN_WINDOW_DAYS)
+    rows = (
+        HistoricalPrice.objects.filter(symbol__in=symbols, date__gte=since)
+        .order_by('symbol', 'date')
+        .values_list('symbol', 'close')
+    )
+
+    closes: Dict[str, list] = {}
+    for symbol, close in rows.iterator(chunk_size=20000):
+        closes.setdefault(symbol, []).append(float(close))
+
+    stats = np.full((len(symbols), 2), np.nan)
+    for row, symbol in enumerate(symbols):
+        series = np.asarray(closes.get(symbol, ()))
+        if series.size < 20:
+            continue
+        returns = np.diff(np.log(series))
+        stats[row, 0] = np.expm1(returns.mean() * TRADING_DAYS)
+        stats[row, 1] = returns.std() * np.sqrt(TRADING_DAYS)
+    return stats
+
+
+def build_asset_features() -> AssetFeatures:
+    """Monta as características a partir da matriz fundamentalista e dos preços"""
+    matrix = fundamentalist_analyzer.matrix()
+    symbols = matrix.symbols
+    records = [matrix.get(symbol) for symbol in symbols]
+
+    raw = np.full((len(symbols), len(FEATURES)), np.nan)
+    if symbols:
+        raw[:, 0:2] = load_return_statistics(symbols)
+    for row, record in enumerate(records):
+        raw[row, 2] = record['dy'] if record['dy'] is not None else np.nan
+        pvp = record['pvp']
+        raw[row, 3] = 1 / pvp if pvp else np.nan
+        raw[row, 4] = record['roe'] if record['roe'] is not None else np.nan
+        raw[row, 5] = record['debt_equity'] if record['debt_equity'] is not None else np.nan
+
+    return AssetFeatures(symbols, raw, [record['sector'] for record in records])
+
+
+@instrument_service
+class RecommendationService:
+    """Recomendações servidas a partir de candidatos pré-calculados por perfil"""
+
+    def refresh_candidates(self, top_k: int = CANDIDATES_PER_PROFILE) -> Dict[str, int]:
+        """Recalcula os candidatos de todos os perfis (execução noturna)"""
+        features = build_asset_features()
+        index = NearestNeighbourIndex(features.vectors)
+        volatility = features.column('volatility')
+
+        summary = {}
+        for name, profile in investor_profile_service.profiles.items():
+            mask = None
+            limit = profile.get('max_volatility')
+            if limit is not None:
+                mask = ~(volatility > limit)
+            query = profile_vector(profile, features.sector_names)
+            rows, scores = index.search(query, top_k, mask=mask)
+
+            candidates = {
+                'symbols': [features.symbols[r] for r in rows],
+                'sectors': [features.sectors[r] for r in rows],
+                'sector_names': features.sector_names,
+                'vectors': features.vectors[rows].tolist(),
+                'scores': scores.tolist(),
+            }
+            cache.set(CANDIDATES_CACHE_KEY.format(profile=name), candidates, timeout=CANDIDATES_TIMEOUT)
+            cache.set(STALE_CANDIDATES_CACHE_KEY.format(profile=name), candidates, timeout=None)
+            summary[name] = len(rows)
+
+        cache.delete(REFRESH_LOCK_KEY)
+
+        logger.info(
+            f"Candidatos de recomendação atualizados: {len(features)} ativos "
+            f"({'aproximado' if index.approximate else 'exato'})"
+        )
+        return summary
+
+    def recommend(self, user_id: int, profile_name: str, holdings: Dict[str, float],
+                  sector_exposure: Dict[str, float], limit: int = DEFAULT_RECOMMENDATIONS) -> List[dict]:
+        """Reordena os candidatos do perfil para a carteira do usuário"""
+        profile_name = investor_profile_service.get_profile_name(profile_name)
+        cached = self._cached_items(user_id, profile_name, limit)
+        if cached is not None:
+            return cached
+        return self._rank(user_id, profile_name, holdings, sector_exposure, limit)
+
+    def recommend_for_user(self, user_id: int, profile_name: str,
+                           limit: int = DEFAULT_RECOMMENDATIONS) -> List[dict]:
+        """Como recommend(), lendo a carteira do banco só quando não há lista em cache"""
+        profile_name = investor_profile_service.get_profile_name(profile_name)
+        cached = self._cached_items(user_id, profile_name, limit)
+        if cached is not None:
+            return cached
+        holdings, sector_exposure = load_portfolio_context(user_id)
+        return self._rank(user_id, profile_name, holdings, sector_exposure, limit)
+
+    def _cached_items(self, user_id: int, profile_name: str, limit: int) -> Optional[List[dict]]:
+        cached = cache.get(USER_CACHE_KEY.format(user_id=user_id, profile=profile_name))
+        hit = cached is not None and cached['limit'] >= limit
+        record_cache_lookup('recommendations_user', hit)
+        return cached['items'][:limit] if hit else None
+
+    def _rank(self, user_id: int, profile_name: str, holdings: Dict[str, float],
+              sector_exposure: Dict[str, float], limit: int) -> List[dict]:
+        candidates = cache.get(CANDIDATES_CACHE_KEY.format(profile=profile_name))
+        record_cache_lookup('recommendations_candidates', candidates is not None)
+        stale = candidates is None
+        if stale:
+            # O cálculo percorre todo o universo: fica no worker, a requisição usa a cópia anterior
+            self.schedule_refresh()
+            candidates = cache.get(STALE_CANDIDATES_CACHE_KEY.format(profile=profile_name)) or {'symbols': []}
+        if not candidates['symbols']:
+            return []
+
+        profile = investor_profile_service.get_profile(profile_name)
+        query = user_vector(profile, candidates['sector_names'], sector_exposure)
+        vectors = np.asarray(candidates['vectors'])
+        scores = vectors @ query
+
+        held = np.array([symbol in holdings for symbol in candidates['symbols']])
+        scores = np.where(held, -np.inf, scores)
+        order = np.argsort(-scores, kind='stable')
+        order = order[np.isfinite(scores[order])][:limit]
+
+        items = [
+            {
+                'symbol': candidates['symbols'][i],
+                'sector': candidates['sectors'][i],
+                'score': round(float(scores[i]), 4),
+            }
+            for i in order
+        ]
+        if not stale:
+            cache.set(USER_CACHE_KEY.format(user_id=user_id, profile=profile_name),
+                      {'limit': limit, 'items': items}, timeout=USER_TIMEOUT)
+        return items
+
+    def schedule_refresh(self) -> bool:
+        """Enfileira a atualização dos candidatos, uma por vez"""
+        if not cache.add(REFRESH_LOCK_KEY, True, timeout=REFRESH_LOCK_TIMEOUT):
+            return False
+        refresh_recommendation_candidates.delay()
+        return True
+
+
+def load_portfolio_context(user_id: int) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """Quantidade por ativo e participação de cada setor no valor da carteira"""
+    from core.services.portfolio_service import latest_prices, load_positions
+
+    holdings: Dict[str, float] = {}
+    cost: Dict[str, float] = {}
+    for position in load_positions([user_id]).get(user_id, []):
+        symbol = position['symbol']
+        holdings[symbol] = holdings.get(symbol, 0.0) + float(position['quantity'])
+        cost[symbol] = float(position['average_price'] or 0)
+
+    prices = latest_prices(holdings)
+    by_sector: Dict[str, float] = {}
+    for symbol, quantity in holdings.items():
+        asset = fundamentalist_analyzer.get_asset(symbol)
+        if asset and asset.get('sector'):
+            # Sem cotação, a posição entra pelo preço médio
+            value = quantity * prices.get(symbol, cost[symbol])
+            by_sector[asset['sector']] = by_sector.get(asset['sector'], 0.0) + value
+
+    total = sum(by_sector.values())
+    exposure = {sector: value / total for sector, value in by_sector.items()} if total else {}
+    return holdings, exposure
+
+
+def invalidate_user_recommendations(user_id: int):
+    """Descarta recomendações em cache após mudança na carteira do usuário"""
+    cache.delete_many([
+        USER_CACHE_KEY.format(user_id=user_id, profile=name)
+        for name in investor_profile_service.profiles
+    ])
+
+
+# Instância compartilhada pelo processo
+recommendation_service = RecommendationService()
+
+
+@shared_task
+def refresh_recommendation_candidates():
+    """Atualização noturna dos candidatos por perfil"""
+    return recommendation_service.refresh_candidates()
@@ -0,0 +1,77 @@
+"""
+Serviço de Perfil de Risco para HUB Financeiro
+Monitoramento de concentração e perdas das carteiras frente ao perfil do investidor
+"""
+
+import logging
+from typing import List
+
+from celery import shared_task
+from django.core.cache import cache
+from django.utils import timezone
+
+from core.utils.fanout import dispatch
+
+logger = logging.getLogger(__name__)
+
+# Limites por perfil: peso máximo de um único ativo e perda máxima da carteira
+RISK_LIMITS = {
+    'conservador': {'max_position_weight': 0.15, 'max_drawdown': 0.05},
+    'moderado': {'max_position_weight': 0.25, 'max_drawdown': 0.10},
+    'arrojado': {'max_position_weight': 0.40, 'max_drawdown': 0.20},
+}
+
+# Evita repetir o mesmo alerta a cada execução de 10 minutos
+ALERT_COOLDOWN = 60 * 60 * 4
+# Intervalo do beat: cada janela de 10 minutos é uma execução distinta do fan-out
+CHECK_INTERVAL_MINUTES = 10
+_ALERT_SENT_KEY = 'risk:alert:{user_id}:{kind}'
+
+
+def check_risk_chunk(user_ids: List[int]) -> dict:
+    """Verifica limites de risco de um lote de usuários"""
+    from core.models import User
+    from core.services.notification_service import notify_user
+    from core.services.portfolio_service import latest_prices, load_positions
+
+    positions = load_positions(user_ids)
+    prices = latest_prices({p['symbol'] for rows in positions.values() for p in rows})
+    profiles = dict(User.objects.filter(id__in=user_ids).values_list('id', 'investor_profile'))
+
+    alerts = 0
+    for user_id, rows in positions.items():
+        limits = RISK_LIMITS.get(profiles.get(user_id), RISK_LIMITS['moderado'])
+        values = {
+            p['symbol']: float(p['quantity']) * prices.get(p['symbol'], float(p['average_price']))
+            for p in rows
+        }
+        total = sum(values.values())
+        invested = sum(float(p['quantity']) * float(p['average_price']) for p in rows)
+        if not total or not invested:
+            continue
+
+        findings = []
+        symbol, largest = max(values.items(), key=lambda item: item[1])
+        if largest / total > limits['max_position_weight']:
+            findings.append(('concentration', f"{symbol} representa {largest / total:.0%} da carteira"))
+        drawdown = 1 - total / invested
+        if drawdown > limits['max_drawdown']:
+            findings.append(('drawdown', f"Carteira com perda de {drawdown:.1%} sobre o investido"))
+
+        for kind, message in findings:
+            if cache.add(_ALERT_SENT_KEY.format(user_id=user_id, kind=kind), 1, timeout=ALERT_COOLDOWN):
+                notify_user(user_id, 'Alerta de risco', message, category='risk')
+                alerts += 1
+
+    return {'users': len(positions), 'alerts': alerts}
+
+
+@shared_task
+def check_risk_alerts():
+    """Distribui a verificação de risco em lotes na fila intradiária"""
+    from core.services.portfolio_service import active_investor_ids
+
+    now = timezone.localtime()
+    window = now.replace(minute=now.minute - now.minute % CHECK_INTERVAL_MINUTES, second=0, microsecond=0)
+    return dispatch('risk_alerts', active_investor_ids(), check_risk_chunk, lane='intraday',
+                    period=window.isoformat())
@@ -0,0 +1,92 @@
+"""
+Receptores de sinais do app core do HUB Financeiro
+Conectados em CoreConfig.ready() em todos os processos; os serviços só são importados quando o sinal dispara
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+
+# Usuários: qualquer processo que os altere (admin, shell, workers) invalida os snapshots de autenticação
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def _on_user_saved(sender, instance, created, **kwargs):
+    if created:
+        return
+    from core.utils.security import invalidate_user_snapshot
+
+    # Após o commit: antes dele, uma requisição concorrente recarregaria a linha antiga no cache.
+    # Troca de senha muda a credencial do snapshot e invalida os tokens anteriores
+    user_id = instance.pk
+    transaction.on_commit(lambda: invalidate_user_snapshot(user_id))
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def _on_user_deleted(sender, instance, **kwargs):
+    from core.utils.security import revoke_user_tokens
+
+    user_id = instance.pk
+    transaction.on_commit(lambda: revoke_user_tokens(user_id))
+
+
+@receiver(m2m_changed)
+def _on_permissions_changed(sender, instance, action, pk_set=None, **kwargs):
+    if not action.startswith('post_'):
+        return
+    from django.contrib.auth.models import Group
+
+    User = get_user_model()
+    if isinstance(instance, User):
+        user_ids = [instance.pk]
+    elif isinstance(instance, Group):
+        # Usuários entraram/saíram do grupo, ou as permissões do grupo mudaram
+        if sender is User.groups.through and pk_set:
+            user_ids = pk_set
+        else:
+            user_ids = instance.user_set.values_list('pk', flat=True)
+    else:
+        return
+
+    from core.utils.security import invalidate_user_snapshot
+
+    for user_id in user_ids:
+        invalidate_user_snapshot(user_id)
+
+
+@receiver(user_logged_out)
+def _on_logged_out(sender, request, user, **kwargs):
+    if user is not None:
+        from core.utils.security import invalidate_user_snapshot
+
+        invalidate_user_snapshot(user.pk)
+
+
+# Alertas de preço: as alterações são publicadas para o índice do processo do feed
+
+@receiver(post_save, sender='core.PriceAlert')
+def _on_alert_saved(sender, instance, **kwargs):
+    from core.services.market_alerts_service import sync_alert
+
+    sync_alert(instance)
+
+
+@receiver(post_delete, sender='core.PriceAlert')
+def _on_alert_deleted(sender, instance, **kwargs):
+    from core.services.market_alerts_service import drop_alert
+
+    drop_alert(instance)
+
+
+# Carteira: mudanças descartam as recomendações e a projeção de proventos em cache do usuário
+
+@receiver([post_save, post_delete], sender='core.Investment')
+def _on_investment_change(sender, instance, **kwargs):
+    from core.services.dividend_service import invalidate_projection
+    from core.services.recommendation_service import invalidate_user_recommendations
+
+    invalidate_user_recommendations(instance.user_id)
+    invalidate_projection(instance.user_id)
@@ -0,0 +1,99 @@
+"""
+Cache em camadas para HUB Financeiro
+Memória do processo (L1) sobre o cache compartilhado do Django (L2)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from django.core.cache import caches
+
+from core.utils.metrics import record_cache_lookup
+
+# Marca chaves ausentes no L2, para que consultas negativas também fiquem no L1
+_ABSENT = object()
+
+
+class TieredCache:
+    """
+    Cache de leitura em dois níveis.
+
+    O L1 guarda até max_entries chaves por local_ttl segundos (LRU). delete()
+    remove dos dois níveis no processo atual; nos demais processos a entrada
+    local expira em até local_ttl segundos.
+    """
+
+    def __init__(self, name: str, local_ttl: float = 5.0, max_entries: int = 10000, alias: str = 'default'):
+        self.name = name
+        self.local_ttl = local_ttl
+        self.max_entries = max_entries
+        self.alias = alias
+        self._local: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    def _get_local(self, key: str):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return entry
+
+    def _set_local(self, key: str, value: Any):
+        with self._lock:
+            self._local[key] = (time.monotonic() + self.local_ttl, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        entry = self._get_local(key)
+        if entry is not None:
+            record_cache_lookup(f'{self.name}:l1', True)
+            value = entry[1]
+            return default if value is _ABSENT else value
+
+        record_cache_lookup(f'{self.name}:l1', False)
+        value = self.shared.get(key, _ABSENT)
+        record_cache_lookup(f'{self.name}:l2', value is not _ABSENT)
+        self._set_local(key, value)
+        return default if value is _ABSENT else value
+
+    def get_or_set(self, key: str, loader: Callable[[], Any], timeout: Optional[int] = None) -> Any:
+        """Valor da chave; na falha dos dois níveis, carrega e grava em ambos"""
+        value = self.get(key, _ABSENT)
+        if value is _ABSENT:
+            value = loader()
+            if value is not None:
+                self.set(key, value, timeout)
+        return value
+
+    def set(self, key: str, value: Any, timeout: Optional[int] = None):
+        self.shared.set(key, value, timeout)
+        self._set_local(key, value)
+
+    def add(self, key: str, value: Any, timeout: Optional[int] = None) -> bool:
+        """Grava só se a chave não existir no nível compartilhado (atômico entre processos)"""
+        added = self.shared.add(key, value, timeout)
+        if added:
+            self._set_local(key, value)
+        return added
+
+    def delete(self, key: str):
+        self.shared.delete(key)
+        with self._lock:
+            self._local.pop(key, None)
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
@@ -0,0 +1,223 @@
+"""
+Calculadora de Dividendos para HUB Financeiro
+Calendário de proventos indexado por data, projeção de renda e simulação de reinvestimento
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from core.utils.lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+
+
+# Intervalos típicos de pagamento, em dias
+MIN_PAYMENT_INTERVAL = 20
+DEFAULT_PAYMENT_INTERVAL = 182
+
+
+def _to_day(value) -> np.datetime64:
+    return np.datetime64(value, 'D')
+
+
+class DividendCalendar:
+    """
+    Calendário de proventos anunciados e projetados.
+
+    Os eventos ficam em arrays paralelos ordenados pela data de pagamento,
+    permitindo recortes por período via busca binária.
+    """
+
+    def __init__(self, events: Iterable[dict] = ()):
+        self.symbols: List[str] = []
+        self.symbol_index: Dict[str, int] = {}
+
+        symbol_codes, ex_dates, pay_dates, amounts, projected = [], [], [], [], []
+        for event in events:
+            symbol_codes.append(self._code(event['symbol']))
+            ex_dates.append(_to_day(event['ex_date']))
+            pay_dates.append(_to_day(event.get('pay_date') or event['ex_date']))
+            amounts.append(float(event['amount']))
+            projected.append(bool(event.get('projected', False)))
+
+        order = np.argsort(np.array(pay_dates, dtype='datetime64[D]'), kind='stable')
+        self.symbol_codes = np.array(symbol_codes, dtype=np.int32)[order]
+        self.ex_dates = np.array(ex_dates, dtype='datetime64[D]')[order]
+        self.pay_dates = np.array(pay_dates, dtype='datetime64[D]')[order]
+        self.amounts = np.array(amounts, dtype=np.float64)[order]
+        self.projected = np.array(projected, dtype=bool)[order]
+
+    def _code(self, symbol: str) -> int:
+        code = self.symbol_index.get(symbol)
+        if code is None:
+            code = len(self.symbols)
+            self.symbol_index[symbol] = code
+            self.symbols.append(symbol)
+        return code
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def window(self, start, end) -> slice:
+        """Fatia dos eventos com pagamento em [start, end)"""
+        left = np.searchsorted(self.pay_dates, _to_day(start), side='left')
+        right = np.searchsorted(self.pay_dates, _to_day(end), side='left')
+        return slice(int(left), int(right))
+
+    def events(self, start, end, symbols: Optional[Sequence[str]] = None) -> List[dict]:
+        """Eventos com pagamento no período, opcionalmente filtrados por ativo"""
+        span = self.window(start, end)
+        codes = self.symbol_codes[span]
+        mask = np.ones(len(codes), dtype=bool)
+        if symbols is not None:
+            wanted = [self.symbol_index[s] for s in symbols if s in self.symbol_index]
+            mask = np.isin(codes, wanted)
+
+        positions = np.flatnonzero(mask) + span.start
+        return [
+            {
+                'symbol': self.symbols[self.symbol_codes[i]],
+                'ex_date': self.ex_dates[i].item(),
+                'pay_date': self.pay_dates[i].item(),
+                'amount': float(self.amounts[i]),
+                'projected': bool(self.projected[i]),
+            }
+            for i in positions
+        ]
+
+    def monthly_amounts(self, start, months: int) -> np.ndarray:
+        """Matriz ativo×mês com o valor por ação pago em cada mês"""
+        first_month = _to_day(start).astype('datetime64[M]')
+        end = (first_month + months).astype('datetime64[D]')
+        span = self.window(start, end)
+
+        table = np.zeros((len(self.symbols), months))
+        offsets = (self.pay_dates[span].astype('datetime64[M]') - first_month).astype(np.int64)
+        np.add.at(table, (self.symbol_codes[span], offsets), self.amounts[span])
+        return table
+
+
+def merge_events(*sources: Iterable[dict]) -> List[dict]:
+    """
+    Une listas de proventos com um evento por (ativo, data-com). Em caso de
+    repetição vale a fonte mais à direita (o banco sobrepõe a fixture).
+    """
+    merged: Dict[tuple, dict] = {}
+    for source in sources:
+        for event in source:
+            merged[(event['symbol'], _to_day(event['ex_date']))] = event
+    return list(merged.values())
+
+
+def project_events(history: Iterable[dict], until, today=None) -> List[dict]:
+    """
+    Projeta pagamentos futuros a partir do histórico de cada ativo.
+
+    A periodicidade é a mediana dos intervalos entre datas-com e o valor é a
+    média dos últimos pagamentos de mesma periodicidade.
+    """
+    today = _to_day(today or date.today())
+    until = _to_day(until)
+
+    by_symbol: Dict[str, list] = {}
+    for event in history:
+        by_symbol.setdefault(event['symbol'], []).append(event)
+
+    projected = []
+    for symbol, events in by_symbol.items():
+        events.sort(key=lambda e: _to_day(e['ex_date']))
+        ex_dates = np.array([_to_day(e['ex_date']) for e in events], dtype='datetime64[D]')
+        pay_lags = np.array([
+            (_to_day(e.get('pay_date') or e['ex_date']) - _to_day(e['ex_date'])).astype(int)
+            for e in events
+        ])
+        amounts = np.array([float(e['amount']) for e in events])
+
+        intervals = np.diff(ex_dates).astype(int)
+        intervals = intervals[intervals >= MIN_PAYMENT_INTERVAL]
+        interval = int(np.median(intervals)) if intervals.size else DEFAULT_PAYMENT_INTERVAL
+
+        per_year = max(1, round(365 / interval))
+        amount = float(amounts[-per_year:].mean())
+        lag = int(np.median(pay_lags))
+
+        horizon = int((until - ex_dates[-1]).astype(int))
+        steps = np.arange(1, max(horizon, 0) // interval + 2)
+        future = ex_dates[-1] + steps * interval
+        for ex_date in future[(future > today) & (future < until)]:
+            projected.append({
+                'symbol': symbol,
+                'ex_date': ex_date.item(),
+                'pay_date': (ex_date + lag).item(),
+                'amount': amount,
+                'projected': True,
+            })
+
+    return projected
+
+
+def project_income(
+    calendar: DividendCalendar,
+    owners: np.ndarray,
+    symbols: Sequence[str],
+    quantities: np.ndarray,
+    start,
+    months: int = 12,
+    owner_count: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Renda projetada por investidor e mês, em lote.
+
+    owners, symbols e quantities descrevem as posições (uma linha por posição);
+    o resultado é uma matriz investidor×mês.
+    """
+    owners = np.asarray(owners, dtype=np.int64)
+    quantities = np.asarray(quantities, dtype=np.float64)
+    owner_count = owner_count if owner_count is not None else (int(owners.max()) + 1 if owners.size else 0)
+
+    income = np.zeros((owner_count, months))
+    if not owners.size or not len(calendar):
+        return income
+
+    codes = np.array([calendar.symbol_index.get(s, -1) for s in symbols], dtype=np.int64)
+    known = codes >= 0
+    if not known.any():
+        return income
+
+    table = calendar.monthly_amounts(start, months)
+    np.add.at(income, owners[known], quantities[known, None] * table[codes[known]])
+    return income
+
+
+def simulate_drip(
+    shares: np.ndarray,
+    prices: np.ndarray,
+    dividends_per_share: np.ndarray,
+    tax_rate: float = 0.0,
+) -> Dict[str, np.ndarray]:
+    """
+    Simula o reinvestimento de proventos (DRIP).
+
+    prices e dividends_per_share têm o formato (cenários, períodos); cada
+    provento compra novas ações ao preço do período. A quantidade evolui como
+    produto acumulado de (1 + dividendo líquido / preço).
+    """
+    prices = np.atleast_2d(np.asarray(prices, dtype=np.float64))
+    dividends = np.atleast_2d(np.asarray(dividends_per_share, dtype=np.float64))
+    shares = np.asarray(shares, dtype=np.float64).reshape(-1, 1)
+
+    growth = 1 + dividends * (1 - tax_rate) / prices
+    share_path = shares * np.cumprod(growth, axis=1)
+    # Proventos de cada período calculados sobre a posição anterior ao reinvestimento
+    initial = np.broadcast_to(shares, (share_path.shape[0], 1))
+    held_before = np.concatenate([initial, share_path[:, :-1]], axis=1)
+    income = held_before * dividends * (1 - tax_rate)
+
+    return {
+        'shares': share_path,
+        'income': income,
+        'value': share_path * prices,
+        'total_income': income.sum(axis=1),
+    }
@@ -0,0 +1,202 @@
+"""
+Fan-out de tarefas periódicas para HUB Financeiro
+Divide jobs em lotes por usuário ou ativo, com prioridades, idempotência e progresso
+"""
+
+import hashlib
+import logging
+import time
+from typing import Callable, Iterable, List, Optional, Sequence
+
+from celery import chord, group, shared_task
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Filas e prioridades (no Redis, 0 é a maior prioridade)
+LANES = {
+    'intraday': {'queue': 'intraday', 'priority': 0},
+    'default': {'queue': 'celery', 'priority': 5},
+    'batch': {'queue': 'batch', 'priority': 9},
+}
+
+# Duração desejada de cada lote, em segundos
+TARGET_CHUNK_SECONDS = 30.0
+MIN_CHUNK_SIZE = 10
+MAX_CHUNK_SIZE = 5000
+DEFAULT_CHUNK_SIZE = 200
+# Peso da medição mais recente na média móvel do custo por item
+COST_SMOOTHING = 0.3
+
+# Retenção das chaves de controle de uma execução
+RUN_TTL = 60 * 60 * 24
+# Tempo máximo que um lote pode ficar marcado como em andamento
+CHUNK_LOCK_TTL = 60 * 30
+# Espera entre tentativas de um lote travado; o total cobre a expiração da trava
+# de um worker perdido, para que a reentrega não desista antes de poder rodar.
+# Essas esperas têm orçamento próprio e não consomem o max_retries dos erros do handler
+LOCK_RETRY_SECONDS = 60 * 5
+LOCK_RETRIES = CHUNK_LOCK_TTL // LOCK_RETRY_SECONDS + 2
+
+_COST_KEY = 'fanout:cost:{job}'
+_PROGRESS_KEY = 'fanout:progress:{job}:{run_id}'
+_TOTAL_KEY = 'fanout:total:{job}:{run_id}'
+_CHUNKS_KEY = 'fanout:chunks:{job}:{run_id}'
+_SIZE_KEY = 'fanout:size:{job}:{run_id}'
+_DONE_KEY = 'fanout:done:{job}:{run_id}:{chunk}'
+_LOCK_KEY = 'fanout:lock:{job}:{run_id}:{chunk}'
+
+
+class ChunkLocked(Exception):
+    """O lote continuou travado por outro worker durante todas as esperas"""
+
+
+def chunk_size_for(job: str) -> int:
+    """Tamanho de lote calculado a partir do custo médio medido por item"""
+    cost = cache.get(_COST_KEY.format(job=job))
+    if not cost:
+        return DEFAULT_CHUNK_SIZE
+    return int(max(MIN_CHUNK_SIZE, min(MAX_CHUNK_SIZE, TARGET_CHUNK_SECONDS / cost)))
+
+
+def record_item_cost(job: str, seconds: float, items: int):
+    """Atualiza a média móvel do custo por item do job"""
+    if items <= 0:
+        return
+    key = _COST_KEY.format(job=job)
+    measured = seconds / items
+    previous = cache.get(key)
+    cost = measured if previous is None else previous + COST_SMOOTHING * (measured - previous)
+    cache.set(key, cost, timeout=None)
+
+
+def split(items: Sequence, size: int) -> List[list]:
+    return [list(items[start:start + size]) for start in range(0, len(items), size)]
+
+
+def _handler_path(handler: Callable) -> str:
+    return f'{handler.__module__}.{handler.__qualname__}'
+
+
+def run_id_for(job: str, period: str, items: Sequence) -> str:
+    """Identificador da execução: o mesmo job, período e itens geram o mesmo id"""
+    digest = hashlib.sha1(f'{job}:{period}'.encode())
+    for item in items:
+        digest.update(f':{item}'.encode())
+    return digest.hexdigest()[:32]
+
+
+def dispatch(job: str, items: Iterable, handler: Callable, lane: str = 'batch',
+             chunk_size: Optional[int] = None, run_id: Optional[str] = None,
+             period: Optional[str] = None) -> dict:
+    """
+    Distribui os itens de um job em lotes paralelos.
+
+    handler recebe a lista de itens de um lote e retorna um dicionário de
+    contadores, somados ao final pela tarefa de consolidação. Sem run_id, o
+    id é derivado do período (o dia, por padrão) e dos itens: uma tarefa do
+    beat reexecutada reaproveita os lotes já concluídos.
+    """
+    items = list(items)
+    run_id = run_id or run_id_for(job, period or timezone.localdate().isoformat(), items)
+    options = LANES[lane]
+
+    if not items:
+        logger.info(f"Fan-out {job}: nenhum item para processar")
+        return {'job': job, 'run_id': run_id, 'chunks': 0, 'items': 0}
+
+    # O tamanho fica fixo na execução: uma reexecução divide os itens nos mesmos lotes
+    size_key = _SIZE_KEY.format(job=job, run_id=run_id)
+    cache.add(size_key, chunk_size or chunk_size_for(job), timeout=RUN_TTL)
+    size = cache.get(size_key) or chunk_size or chunk_size_for(job)
+    chunks = split(items, size)
+    path = _handler_path(handler)
+
+    cache.set_many({
+        _TOTAL_KEY.format(job=job, run_id=run_id): len(items),
+        _CHUNKS_KEY.format(job=job, run_id=run_id): len(chunks),
+    }, timeout=RUN_TTL)
+    cache.add(_PROGRESS_KEY.format(job=job, run_id=run_id), 0, timeout=RUN_TTL)
+
+    header = group(
+        run_chunk.s(job, run_id, number, path, chunk).set(**options)
+        for number, chunk in enumerate(chunks)
+    )
+    chord(header)(finalize_run.s(job, run_id).set(**options))
+
+    logger.info(f"Fan-out {job} [{run_id}]: {len(items)} itens em {len(chunks)} lotes de até {size}")
+    return {'job': job, 'run_id': run_id, 'chunks': len(chunks), 'items': len(items)}
+
+
+def get_progress(job: str, run_id: str) -> dict:
+    """Progresso agregado de uma execução"""
+    values = cache.get_many([
+        _PROGRESS_KEY.format(job=job, run_id=run_id),
+        _TOTAL_KEY.format(job=job, run_id=run_id),
+        _CHUNKS_KEY.format(job=job, run_id=run_id),
+    ])
+    done = values.get(_PROGRESS_KEY.format(job=job, run_id=run_id), 0)
+    total = values.get(_TOTAL_KEY.format(job=job, run_id=run_id))
+    return {
+        'job': job,
+        'run_id': run_id,
+        'processed': done,
+        'total': total,
+        'chunks': values.get(_CHUNKS_KEY.format(job=job, run_id=run_id)),
+        'percent': round(100 * done / total, 1) if total else None,
+    }
+
+
+@shared_task(bind=True, acks_late=True, max_retries=3)
+def run_chunk(self, job, run_id, chunk_number, handler_path, items, lock_waits=0):
+    """
+    Processa um lote uma única vez, mesmo se a mensagem for reentregue.
+    lock_waits conta as esperas por trava, descontadas do contador de tentativas do Celery.
+    """
+    done_key = _DONE_KEY.format(job=job, run_id=run_id, chunk=chunk_number)
+    lock_key = _LOCK_KEY.format(job=job, run_id=run_id, chunk=chunk_number)
+
+    previous = cache.get(done_key)
+    if previous is not None:
+        logger.info(f"Fan-out {job} [{run_id}]: lote {chunk_number} já processado")
+        return previous
+
+    if not cache.add(lock_key, self.request.id or True, timeout=CHUNK_LOCK_TTL):
+        # Outro worker está processando este lote (ou morreu com a trava); tenta de novo depois
+        if lock_waits >= LOCK_RETRIES:
+            raise ChunkLocked(f"Fan-out {job} [{run_id}]: lote {chunk_number} travado após {lock_waits} esperas")
+        raise self.retry(kwargs={'lock_waits': lock_waits + 1}, countdown=LOCK_RETRY_SECONDS, max_retries=None)
+
+    try:
+        started = time.monotonic()
+        result = import_string(handler_path)(items) or {}
+        record_item_cost(job, time.monotonic() - started, len(items))
+    except Exception as exc:
+        cache.delete(lock_key)
+        logger.error(f"Fan-out {job} [{run_id}]: erro no lote {chunk_number}: {exc}")
+        # request.retries inclui as esperas por trava: o orçamento de erros continua sendo max_retries
+        raise self.retry(exc=exc, max_retries=self.max_retries + lock_waits)
+
+    cache.set(done_key, result, timeout=RUN_TTL)
+    cache.delete(lock_key)
+    try:
+        cache.incr(_PROGRESS_KEY.format(job=job, run_id=run_id), len(items))
+    except ValueError:
+        cache.set(_PROGRESS_KEY.format(job=job, run_id=run_id), len(items), timeout=RUN_TTL)
+    return result
+
+
+@shared_task
+def finalize_run(results, job, run_id):
+    """Soma os contadores de todos os lotes"""
+    totals = {}
+    for result in results:
+        for key, value in (result or {}).items():
+            if isinstance(value, (int, float)):
+                totals[key] = totals.get(key, 0) + value
+
+    progress = get_progress(job, run_id)
+    logger.info(f"Fan-out {job} [{run_id}] concluído: {progress['processed']}/{progress['total']} itens, {totals}")
+    return {**progress, 'totals': totals}
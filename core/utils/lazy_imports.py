@@ -0,0 +1,38 @@
+"""
+Importação tardia de bibliotecas pesadas para HUB Financeiro
+Módulos carregados somente no primeiro acesso a um atributo
+"""
+
+import importlib.util
+import sys
+from types import ModuleType
+from typing import Optional
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Registra o módulo sem executá-lo; o carregamento real ocorre no primeiro
+    acesso a um atributo. Falha imediatamente se o módulo não estiver instalado.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'", name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def optional_lazy_import(name: str) -> Optional[ModuleType]:
+    """Como lazy_import, mas retorna None para dependências opcionais ausentes"""
+    try:
+        return lazy_import(name)
+    except ImportError:
+        return None
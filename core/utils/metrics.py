@@ -0,0 +1,199 @@
+"""
+Métricas de desempenho para HUB Financeiro
+Latência, chamadas, consultas ao banco e acertos de cache por serviço, exportados para o Prometheus
+"""
+
+import functools
+import glob
+import inspect
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Faixas de latência, de 1 ms a 30 s
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250, 1000)
+
+# Métricas registradas no primeiro uso: importar serviços não carrega o prometheus_client
+# nome -> (tipo, métrica, descrição, labels, opções)
+_METRICS = {
+    'SERVICE_LATENCY': ('Histogram', 'hub_service_latency_seconds', 'Latência dos métodos de serviço',
+                        ['service', 'method'], {'buckets': LATENCY_BUCKETS}),
+    'SERVICE_CALLS': ('Counter', 'hub_service_calls_total', 'Chamadas aos métodos de serviço',
+                      ['service', 'method', 'status'], {}),
+    'SERVICE_DB_QUERIES': ('Histogram', 'hub_service_db_queries', 'Consultas ao banco por chamada de serviço',
+                           ['service', 'method'], {'buckets': QUERY_BUCKETS}),
+    'CACHE_LOOKUPS': ('Counter', 'hub_cache_lookups_total', 'Consultas a caches da aplicação',
+                      ['cache', 'result'], {}),
+    'REQUEST_LATENCY': ('Histogram', 'hub_http_request_latency_seconds', 'Latência das requisições HTTP',
+                        ['view', 'method', 'status'], {'buckets': LATENCY_BUCKETS}),
+    'TASK_LATENCY': ('Histogram', 'hub_task_latency_seconds', 'Duração das tarefas Celery',
+                     ['task', 'state'], {'buckets': LATENCY_BUCKETS}),
+}
+_registered = {}
+_register_lock = threading.Lock()
+
+
+def _metric(name: str):
+    metric = _registered.get(name)
+    if metric is None:
+        with _register_lock:
+            metric = _registered.get(name)
+            if metric is None:
+                import prometheus_client
+
+                kind, metric_name, documentation, labels, options = _METRICS[name]
+                metric = getattr(prometheus_client, kind)(metric_name, documentation, labels, **options)
+                _registered[name] = metric
+    return metric
+
+
+def __getattr__(name):
+    # Acesso direto (metrics.REQUEST_LATENCY, metrics.REGISTRY) registra sob demanda
+    if name in _METRICS:
+        return _metric(name)
+    if name == 'REGISTRY':
+        from prometheus_client import REGISTRY
+        return REGISTRY
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+_local = threading.local()
+
+
+class _QueryCounter:
+    """execute_wrapper que conta consultas executadas na conexão"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def timed(service: str, method: str):
+    """Mede latência, resultado e consultas ao banco de um trecho de código"""
+    from django.db import connection
+
+    # Chamadas aninhadas contam apenas no nível mais externo de consultas
+    depth = getattr(_local, 'depth', 0)
+    _local.depth = depth + 1
+    counter = _QueryCounter()
+    wrapper = connection.execute_wrapper(counter) if depth == 0 else None
+    status = 'ok'
+    started = time.perf_counter()
+    try:
+        if wrapper is not None:
+            with wrapper:
+                yield
+        else:
+            yield
+    except Exception:
+        status = 'error'
+        raise
+    finally:
+        _local.depth = depth
+        _metric('SERVICE_LATENCY').labels(service, method).observe(time.perf_counter() - started)
+        _metric('SERVICE_CALLS').labels(service, method, status).inc()
+        if wrapper is not None:
+            _metric('SERVICE_DB_QUERIES').labels(service, method).observe(counter.count)
+
+
+def instrumented(service: str, method: str = None):
+    """Decorador de função ou método medido com timed()"""
+    def decorator(func):
+        name = method or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(service, name):
+                return func(*args, **kwargs)
+
+        wrapper.__instrumented__ = True
+        return wrapper
+    return decorator
+
+
+def instrument_service(cls):
+    """Decorador de classe que instrumenta todos os métodos públicos do serviço"""
+    service = cls.__name__
+    for name, member in list(vars(cls).items()):
+        if name.startswith('_') or not inspect.isfunction(member):
+            continue
+        if getattr(member, '__instrumented__', False):
+            continue
+        setattr(cls, name, instrumented(service, name)(member))
+    return cls
+
+
+def record_cache_lookup(cache_name: str, hit: bool):
+    """Registra acerto ou falha de um cache da aplicação"""
+    _metric('CACHE_LOOKUPS').labels(cache_name, 'hit' if hit else 'miss').inc()
+
+
+def record_request(view: str, method: str, status: int, seconds: float):
+    """Registra a latência de uma requisição HTTP"""
+    _metric('REQUEST_LATENCY').labels(view, method, str(status)).observe(seconds)
+
+
+def metrics_registry():
+    """Registro exposto: agregado dos processos quando PROMETHEUS_MULTIPROC_DIR está definido"""
+    from prometheus_client import REGISTRY, CollectorRegistry, multiprocess
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        # Vários workers gunicorn/Celery agregados a partir do diretório compartilhado
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_metrics():
+    """Corpo e content-type da exposição no formato texto do Prometheus"""
+    from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+    return generate_latest(metrics_registry()), CONTENT_TYPE_LATEST
+
+
+def reset_multiprocess_dir():
+    """
+    Cria o diretório de métricas multiprocesso e remove arquivos de execuções anteriores.
+
+    Deve rodar no processo principal antes do fork dos filhos; cada serviço
+    (web, worker) precisa do seu próprio diretório.
+    """
+    path = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if not path:
+        return None
+    os.makedirs(path, exist_ok=True)
+    for stale in glob.glob(os.path.join(path, '*.db')):
+        os.remove(stale)
+    return path
+
+
+def mark_process_dead(pid: int):
+    """Descarta os medidores do processo filho encerrado; contadores e histogramas permanecem"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid)
+
+
+def connect_celery_signals():
+    """Mede a duração de cada tarefa Celery"""
+    from celery.signals import task_postrun, task_prerun
+
+    started = {}
+
+    @task_prerun.connect(weak=False)
+    def _on_prerun(task_id=None, **kwargs):
+        started[task_id] = time.perf_counter()
+
+    @task_postrun.connect(weak=False)
+    def _on_postrun(task_id=None, task=None, state=None, **kwargs):
+        begin = started.pop(task_id, None)
+        if begin is not None and task is not None:
+            _metric('TASK_LATENCY').labels(task.name, state or 'UNKNOWN').observe(time.perf_counter() - begin)
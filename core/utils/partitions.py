@@ -0,0 +1,182 @@
+"""
+Particionamento mensal de séries temporais para HUB Financeiro
+Criação antecipada, listagem e expiração (DROP/DETACH) de partições no PostgreSQL
+"""
+
+import logging
+import re
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+# Tabelas particionadas por mês (ver migração 011) e sua política de retenção.
+# 'expire': 'drop' apaga a partição; 'detach' a move para o schema de arquivo.
+PARTITIONED_TABLES = {
+    'transactions': {'column': 'date', 'retention_months': 60, 'expire': 'detach'},
+    'trading_signals': {'column': 'created_at', 'retention_months': 12, 'expire': 'drop'},
+    'news_articles': {'column': 'published_at', 'retention_months': 6, 'expire': 'drop'},
+    'intraday_bars': {'column': 'timestamp', 'retention_months': 3, 'expire': 'drop'},
+}
+
+ARCHIVE_SCHEMA = 'archive'
+MONTHS_AHEAD = 3
+
+_PARTITION_SUFFIX = re.compile(r'_p(\d{4})(\d{2})$')
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f'{table}_p{month:%Y%m}'
+
+
+def retention_months(table: str) -> int:
+    """Retenção configurada, com TIME_SERIES_RETENTION_MONTHS sobrepondo o padrão"""
+    overrides = getattr(settings, 'TIME_SERIES_RETENTION_MONTHS', {}) or {}
+    return int(overrides.get(table, PARTITIONED_TABLES[table]['retention_months']))
+
+
+def retention_cutoff(table: str, today: Optional[date] = None) -> date:
+    """Primeiro mês mantido: partições de meses anteriores expiram"""
+    return add_months(month_start(today or date.today()), -retention_months(table))
+
+
+def list_partitions(table: str) -> List[Tuple[str, Optional[date]]]:
+    """Partições anexadas à tabela, com o mês de cada uma (None para a DEFAULT)"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            ORDER BY child.relname
+            """,
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        match = _PARTITION_SUFFIX.search(name)
+        month = date(int(match.group(1)), int(match.group(2)), 1) if match else None
+        partitions.append((name, month))
+    return partitions
+
+
+def ensure_partitions(table: str, months_ahead: int = MONTHS_AHEAD, today: Optional[date] = None) -> List[str]:
+    """Cria as partições do mês corrente e dos próximos meses que ainda não existem"""
+    current = month_start(today or date.today())
+    partitions = list_partitions(table)
+    existing = {month for _, month in partitions if month}
+    default = next((name for name, month in partitions if month is None), None)
+
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if month in existing:
+            continue
+        name = partition_name(table, month)
+        create_partition(table, name, month, default)
+        created.append(name)
+
+    if created:
+        logger.info(f"Partições criadas em {table}: {', '.join(created)}")
+    return created
+
+
+def create_partition(table: str, name: str, month: date, default: Optional[str] = None):
+    """
+    Cria a partição do mês. Linhas desse mês já gravadas na DEFAULT (datas
+    futuras) impediriam o CREATE ... PARTITION OF; nesse caso elas são movidas
+    para a nova tabela, anexada em seguida, tudo na mesma transação.
+    """
+    column = PARTITIONED_TABLES[table]['column']
+    quote = connection.ops.quote_name
+    bounds = [month, add_months(month, 1)]
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        has_rows = False
+        if default:
+            cursor.execute(
+                f"SELECT EXISTS (SELECT 1 FROM {quote(default)} "
+                f"WHERE {quote(column)} >= %s AND {quote(column)} < %s)",
+                bounds,
+            )
+            has_rows = cursor.fetchone()[0]
+
+        if not has_rows:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {quote(name)} PARTITION OF {quote(table)} "
+                f"FOR VALUES FROM (%s) TO (%s)",
+                bounds,
+            )
+            return
+
+        cursor.execute(
+            f"CREATE TABLE {quote(name)} (LIKE {quote(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {quote(default)} "
+            f"WHERE {quote(column)} >= %s AND {quote(column)} < %s RETURNING *) "
+            f"INSERT INTO {quote(name)} SELECT * FROM moved",
+            bounds,
+        )
+        # Os índices da tabela pai são criados na partição ao anexá-la
+        cursor.execute(
+            f"ALTER TABLE {quote(table)} ATTACH PARTITION {quote(name)} FOR VALUES FROM (%s) TO (%s)",
+            bounds,
+        )
+        logger.warning(f"Linhas de {month:%Y-%m} movidas de {default} para {name}")
+
+
+def expire_partitions(table: str, today: Optional[date] = None) -> List[str]:
+    """
+    Remove da tabela as partições inteiramente fora da janela de retenção.
+    A operação é só de metadados: nenhuma linha é apagada individualmente.
+    """
+    spec = PARTITIONED_TABLES[table]
+    cutoff = retention_cutoff(table, today)
+    expired = [name for name, month in list_partitions(table) if month and month < cutoff]
+    quote = connection.ops.quote_name
+
+    for name in expired:
+        # Cada partição muda por inteiro: uma falha no SET SCHEMA não a deixa solta no schema público
+        with transaction.atomic(), connection.cursor() as cursor:
+            if spec['expire'] == 'detach':
+                cursor.execute(f"ALTER TABLE {quote(table)} DETACH PARTITION {quote(name)}")
+                cursor.execute(f"ALTER TABLE {quote(name)} SET SCHEMA {quote(ARCHIVE_SCHEMA)}")
+            else:
+                cursor.execute(f"DROP TABLE {quote(name)}")
+
+    if expired:
+        logger.info(f"Partições expiradas em {table} ({spec['expire']}): {', '.join(expired)}")
+    return expired
+
+
+def partition_sizes(table: str) -> Dict[str, int]:
+    """Tamanho em bytes (dados e índices) de cada partição"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname, pg_total_relation_size(child.oid)
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            """,
+            [table],
+        )
+        return dict(cursor.fetchall())
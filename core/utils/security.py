@@ -0,0 +1,250 @@
+"""
+Segurança e autenticação para HUB Financeiro
+Tokens JWT verificados localmente, snapshots de usuário em cache e revogação explícita
+"""
+
+import logging
+import time
+from datetime import timedelta
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import connection, router
+from django.contrib.auth import get_user_model
+from django.utils.crypto import salted_hmac
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.utils.cache import TieredCache
+
+logger = logging.getLogger(__name__)
+
+USER_SNAPSHOT_KEY = 'auth:user:{user_id}'
+GENERATION_KEY = 'auth:generation:{user_id}'
+REVOKED_KEY = 'auth:revoked:{jti}'
+
+# Geração dos tokens por usuário (migração 013); o cache é só uma cópia.
+# As revogações por jti existem apenas no Redis: ele deve rodar com
+# maxmemory-policy noeviction, ou um token revogado volta a valer se a chave for despejada
+GENERATION_TABLE = 'auth_token_generations'
+
+# Claims próprios dos tokens emitidos pelo HUB
+GENERATION_CLAIM = 'gen'
+CREDENTIAL_CLAIM = 'cred'
+DEVICE_CLAIM = 'device'
+
+auth_cache = TieredCache(
+    'auth',
+    local_ttl=getattr(settings, 'AUTH_LOCAL_CACHE_SECONDS', 5),
+    max_entries=getattr(settings, 'AUTH_LOCAL_CACHE_ENTRIES', 50000),
+)
+
+
+def user_from_snapshot(snapshot: dict):
+    """
+    Instância do modelo de usuário montada do snapshot, sem consulta ao banco.
+
+    Serve em filter(user=...) e em chaves estrangeiras como qualquer instância.
+    Os campos fora do snapshot ficam adiados: são lidos do banco no primeiro
+    acesso, e um save() sem update_fields grava só os campos carregados.
+    """
+    User = get_user_model()
+    values = {
+        User._meta.pk.attname: snapshot['id'],
+        User.USERNAME_FIELD: snapshot['username'],
+        User.get_email_field_name(): snapshot['email'],
+        'is_active': snapshot['is_active'],
+        'is_staff': snapshot['is_staff'],
+        'is_superuser': snapshot['is_superuser'],
+    }
+    fields = [field.attname for field in User._meta.concrete_fields if field.attname in values]
+    user = User.from_db(router.db_for_read(User), fields, [values[name] for name in fields])
+    user.snapshot = snapshot
+    user.investor_profile = snapshot['investor_profile']
+    # Cache de permissões do ModelBackend preenchido: has_perm não consulta o banco
+    user._perm_cache = set(snapshot['permissions'])
+    return user
+
+
+def credential_fingerprint(user) -> str:
+    """
+    Impressão do hash de senha gravado no banco. Vai no token e no snapshot:
+    uma troca de senha invalida os tokens anteriores mesmo que o cache se perca.
+    """
+    return salted_hmac('core.utils.security.credential', user.password).hexdigest()[:16]
+
+
+def build_user_snapshot(user) -> dict:
+    """Dados de autenticação e permissões do usuário, serializáveis para o cache"""
+    return {
+        'id': user.pk,
+        'credential': credential_fingerprint(user),
+        'username': user.get_username(),
+        'email': user.email,
+        'is_active': user.is_active,
+        'is_staff': user.is_staff,
+        'is_superuser': user.is_superuser,
+        'investor_profile': getattr(user, 'investor_profile', None),
+        'permissions': sorted(user.get_all_permissions()) if user.is_active else [],
+    }
+
+
+def _load_user_snapshot(user_id) -> Optional[dict]:
+    User = get_user_model()
+    try:
+        user = User.objects.get(pk=user_id)
+    except User.DoesNotExist:
+        return None
+    return build_user_snapshot(user)
+
+
+def get_user_snapshot(user_id) -> Optional[dict]:
+    """Snapshot do usuário; o banco só é consultado na falha dos dois níveis de cache"""
+    return auth_cache.get_or_set(
+        USER_SNAPSHOT_KEY.format(user_id=user_id),
+        lambda: _load_user_snapshot(user_id),
+        settings.AUTH_SNAPSHOT_TTL,
+    )
+
+
+def prime_user_snapshot(user) -> dict:
+    """Grava o snapshot a partir de uma instância já carregada (ex.: no login)"""
+    snapshot = build_user_snapshot(user)
+    auth_cache.set(USER_SNAPSHOT_KEY.format(user_id=user.pk), snapshot, settings.AUTH_SNAPSHOT_TTL)
+    # Usuário autenticado por JWT: issue_tokens passa a usar a credencial nova
+    user.snapshot = snapshot
+    return snapshot
+
+
+def invalidate_user_snapshot(user_id):
+    """Descarta o snapshot após mudança de perfil, permissões ou status"""
+    auth_cache.delete(USER_SNAPSHOT_KEY.format(user_id=user_id))
+
+
+def _load_token_generation(user_id) -> int:
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT generation FROM {GENERATION_TABLE} WHERE user_id = %s", [user_id])
+        row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def token_generation(user_id) -> int:
+    """
+    Geração atual dos tokens do usuário; tokens de gerações anteriores são
+    recusados. Na falha do cache a geração vem do banco, nunca de um padrão.
+    """
+    return auth_cache.get_or_set(
+        GENERATION_KEY.format(user_id=user_id),
+        lambda: _load_token_generation(user_id),
+        settings.AUTH_SNAPSHOT_TTL,
+    )
+
+
+def revoke_user_tokens(user_id):
+    """Invalida todos os tokens já emitidos para o usuário (logout geral, troca de senha)"""
+    # Microssegundos: tokens emitidos logo após a revogação já nascem na nova geração
+    generation = time.time_ns() // 1000
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {GENERATION_TABLE} (user_id, generation, updated_at) VALUES (%s, %s, CURRENT_TIMESTAMP) "
+            f"ON CONFLICT (user_id) DO UPDATE SET generation = EXCLUDED.generation, updated_at = EXCLUDED.updated_at",
+            [user_id, generation],
+        )
+    auth_cache.set(GENERATION_KEY.format(user_id=user_id), generation, settings.AUTH_SNAPSHOT_TTL)
+    invalidate_user_snapshot(user_id)
+    logger.info(f"Tokens do usuário {user_id} revogados")
+
+
+def revoke_token(token):
+    """Inclui o jti do token no conjunto de revogados até a sua expiração"""
+    remaining = int(token['exp'] - time.time())
+    if remaining > 0:
+        auth_cache.set(REVOKED_KEY.format(jti=token[jwt_settings.JTI_CLAIM]), True, timeout=remaining)
+
+
+def claim_token(token) -> bool:
+    """Revoga o jti só se ainda não estava revogado; False indica uso repetido ou concorrente"""
+    remaining = max(int(token['exp'] - time.time()), 1)
+    return auth_cache.add(REVOKED_KEY.format(jti=token[jwt_settings.JTI_CLAIM]), True, timeout=remaining)
+
+
+def is_revoked(token) -> bool:
+    return bool(auth_cache.get(REVOKED_KEY.format(jti=token[jwt_settings.JTI_CLAIM])))
+
+
+def issue_tokens(user, device: Optional[str] = None, lifetime: Optional[timedelta] = None) -> Dict[str, str]:
+    """Par refresh/access com a geração vigente e a credencial do usuário"""
+    # Autenticado por JWT, o usuário traz o snapshot, que já tem a impressão da senha
+    snapshot = getattr(user, 'snapshot', None)
+    refresh = RefreshToken.for_user(user)
+    refresh[GENERATION_CLAIM] = token_generation(user.pk)
+    refresh[CREDENTIAL_CLAIM] = snapshot['credential'] if snapshot else credential_fingerprint(user)
+    if device:
+        refresh[DEVICE_CLAIM] = device
+    if lifetime:
+        refresh.set_exp(lifetime=lifetime)
+    return {'refresh': str(refresh), 'access': str(refresh.access_token)}
+
+
+def validate_token_state(token) -> dict:
+    """
+    Verificações que a assinatura não cobre: revogação, geração, senha vigente
+    e usuário ativo. Retorna o snapshot do usuário.
+    """
+    if is_revoked(token):
+        raise AuthenticationFailed('Token revogado', code='token_revoked')
+
+    try:
+        user_id = token[jwt_settings.USER_ID_CLAIM]
+    except KeyError:
+        raise InvalidToken('Token sem identificação de usuário')
+
+    if token.get(GENERATION_CLAIM, 0) < token_generation(user_id):
+        raise AuthenticationFailed('Token revogado', code='token_revoked')
+
+    snapshot = get_user_snapshot(user_id)
+    if snapshot is None:
+        raise AuthenticationFailed('Usuário não encontrado', code='user_not_found')
+    if not snapshot['is_active']:
+        raise AuthenticationFailed('Usuário inativo', code='user_inactive')
+    # O snapshot vem do banco na falha do cache: vale mesmo sem a geração em cache
+    if token.get(CREDENTIAL_CLAIM) != snapshot['credential']:
+        raise AuthenticationFailed('Token revogado', code='token_revoked')
+    return snapshot
+
+
+def decode_refresh_token(raw_token: str) -> RefreshToken:
+    """Refresh token com assinatura e expiração verificadas"""
+    try:
+        return RefreshToken(raw_token)
+    except TokenError as e:
+        raise InvalidToken(str(e))
+
+
+def rotate_refresh_token(refresh: RefreshToken) -> Dict[str, str]:
+    """Troca um refresh token válido por um novo par, revogando o anterior"""
+    validate_token_state(refresh)
+    # Duas renovações simultâneas com o mesmo token: só a primeira recebe um par novo
+    if not claim_token(refresh):
+        raise AuthenticationFailed('Token revogado', code='token_revoked')
+
+    # Mantém a validade original (dispositivos biométricos têm refresh mais longo)
+    lifetime = timedelta(seconds=refresh['exp'] - refresh['iat'])
+    refresh.set_jti()
+    refresh.set_iat()
+    refresh.set_exp(lifetime=lifetime)
+    return {'refresh': str(refresh), 'access': str(refresh.access_token)}
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    Autenticação por JWT assinado sem acesso ao banco por requisição.
+
+    A assinatura e a expiração são verificadas localmente; revogação, geração
+    e o snapshot do usuário vêm do cache em camadas.
+    """
+
+    def get_user(self, validated_token):
+        return user_from_snapshot(validate_token_state(validated_token))
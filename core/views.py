@@ -0,0 +1,39 @@
+"""
+Views de infraestrutura para HUB Financeiro
+Health check e exposição de métricas para o Prometheus
+"""
+
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.views.decorators.http import require_GET
+
+from core.services.health_service import HealthService
+
+
+@require_GET
+def health_view(request):
+    """Verificação completa; 503 quando algum serviço crítico falha"""
+    result = HealthService().run_health_check(include_broker=request.GET.get('broker') != '0')
+    return JsonResponse(result, status=200 if result['status'] == 'ok' else 503)
+
+
+@require_GET
+def liveness_view(request):
+    """Verificação leve usada pelo orquestrador: o processo responde"""
+    return JsonResponse({'status': 'ok'})
+
+
+@require_GET
+def metrics_view(request):
+    """Métricas no formato texto do Prometheus; sem METRICS_AUTH_TOKEN o endpoint fica fechado"""
+    token = settings.METRICS_AUTH_TOKEN
+    provided = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+    if not token or not hmac.compare_digest(provided, token):
+        return HttpResponseForbidden()
+
+    from core.utils.metrics import render_metrics
+
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)
@@ -45,6 +45,9 @@ def main():
             setup_project()
             return
     
+    # Comandos e o shell podem enfileirar tarefas: o app Celery precisa ser o atual
+    from hub_financeiro import celery_app  # noqa: F401
+
     execute_from_command_line(sys.argv)
 
 def initialize_system():
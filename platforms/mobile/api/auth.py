@@ -0,0 +1,113 @@
+"""
+API de Autenticação Mobile para HUB Financeiro
+Login com JWT, renovação com rotação, logout e troca de senha
+"""
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken, Token
+
+from core.utils.security import (
+    build_user_snapshot,
+    decode_refresh_token,
+    issue_tokens,
+    prime_user_snapshot,
+    revoke_token,
+    revoke_user_tokens,
+    rotate_refresh_token,
+)
+
+
+def _user_payload(snapshot):
+    return {
+        'id': snapshot['id'],
+        'username': snapshot['username'],
+        'email': snapshot['email'],
+        'investor_profile': snapshot['investor_profile'],
+    }
+
+
+class MobileAuthViewSet(viewsets.ViewSet):
+    """
+    Autenticação do app. Só o login e a troca de senha consultam o banco;
+    renovação e logout operam sobre o token e o cache.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @action(detail=False, methods=['post'], permission_classes=[AllowAny], authentication_classes=[])
+    def login(self, request):
+        """Credenciais → par de tokens e dados do usuário"""
+        username = request.data.get('username')
+        password = request.data.get('password')
+        if not username or not password:
+            return Response({'error': 'Usuário e senha são obrigatórios'}, status=status.HTTP_400_BAD_REQUEST)
+
+        user = authenticate(request, username=username, password=password)
+        if user is None:
+            return Response({'error': 'Credenciais inválidas'}, status=status.HTTP_401_UNAUTHORIZED)
+
+        # O snapshot já nasce no cache: a primeira requisição autenticada não vai ao banco
+        snapshot = prime_user_snapshot(user)
+        return Response({**issue_tokens(user), 'user': _user_payload(snapshot)})
+
+    @action(detail=False, methods=['post'], permission_classes=[AllowAny], authentication_classes=[])
+    def refresh(self, request):
+        """Novo par de tokens; o refresh token usado é revogado"""
+        raw_token = request.data.get('refresh')
+        if not raw_token:
+            return Response({'error': 'refresh é obrigatório'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(rotate_refresh_token(decode_refresh_token(raw_token)))
+
+    @action(detail=False, methods=['post'])
+    def logout(self, request):
+        """Revoga os tokens da sessão atual, ou de todos os dispositivos com all_devices=true"""
+        if str(request.data.get('all_devices', '')).lower() in ('1', 'true'):
+            revoke_user_tokens(request.user.id)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        if isinstance(request.auth, Token):
+            revoke_token(request.auth)
+
+        raw_token = request.data.get('refresh')
+        if raw_token:
+            try:
+                refresh = RefreshToken(raw_token)
+            except TokenError:
+                return Response(status=status.HTTP_204_NO_CONTENT)
+            if refresh.get(jwt_settings.USER_ID_CLAIM) == request.user.id:
+                revoke_token(refresh)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=['post'], url_path='password')
+    def change_password(self, request):
+        """Troca a senha, revoga todos os tokens e devolve um par novo para este dispositivo"""
+        # Autenticado por JWT, a senha ainda não foi carregada: check_password a lê do banco
+        user = request.user
+        if not user.check_password(request.data.get('current_password', '')):
+            return Response({'error': 'Senha atual incorreta'}, status=status.HTTP_400_BAD_REQUEST)
+
+        new_password = request.data.get('new_password', '')
+        try:
+            validate_password(new_password, user=user)
+        except ValidationError as e:
+            return Response({'error': list(e.messages)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # A senha nova muda a credencial do snapshot: os tokens anteriores deixam de valer
+        user.set_password(new_password)
+        user.save(update_fields=['password'])
+        prime_user_snapshot(user)
+        return Response(issue_tokens(user))
+
+    @action(detail=False, methods=['get'])
+    def me(self, request):
+        """Dados do usuário autenticado, servidos do snapshot em cache"""
+        snapshot = getattr(request.user, 'snapshot', None) or build_user_snapshot(request.user)
+        return Response(_user_payload(snapshot))
@@ -0,0 +1,116 @@
+"""
+API de Autenticação Biométrica Mobile para HUB Financeiro
+Refresh tokens vinculados ao dispositivo, liberados no app por biometria
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from core.utils.security import (
+    DEVICE_CLAIM,
+    decode_refresh_token,
+    issue_tokens,
+    revoke_token,
+    rotate_refresh_token,
+)
+
+DEVICES_KEY = 'auth:devices:{user_id}'
+MAX_DEVICES = 5
+
+
+def _devices(user_id) -> dict:
+    return cache.get(DEVICES_KEY.format(user_id=user_id)) or {}
+
+
+def _save_devices(user_id, devices: dict):
+    timeout = int(settings.BIOMETRIC_REFRESH_LIFETIME.total_seconds())
+    cache.set(DEVICES_KEY.format(user_id=user_id), devices, timeout=timeout)
+
+
+def _register(user_id, device_id: str, refresh_token: str, name: str = None, unlocked: bool = False):
+    refresh = decode_refresh_token(refresh_token)
+    devices = _devices(user_id)
+    previous = devices.get(device_id, {})
+    devices[device_id] = {
+        'name': name or previous.get('name') or device_id,
+        'jti': refresh[jwt_settings.JTI_CLAIM],
+        'exp': refresh['exp'],
+        'enrolled_at': previous.get('enrolled_at', int(time.time())),
+        'last_unlock': int(time.time()) if unlocked else previous.get('last_unlock'),
+    }
+    _save_devices(user_id, devices)
+
+
+class BiometricViewSet(viewsets.ViewSet):
+    """
+    O app guarda o refresh token do dispositivo no armazenamento seguro,
+    liberado apenas após a biometria local. O desbloqueio não consulta o banco.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @action(detail=False, methods=['post'])
+    def enroll(self, request):
+        """Cadastra o dispositivo atual e emite o seu refresh token de longa duração"""
+        device_id = request.data.get('device_id')
+        if not device_id:
+            return Response({'error': 'device_id é obrigatório'}, status=status.HTTP_400_BAD_REQUEST)
+
+        user_id = request.user.id
+        devices = _devices(user_id)
+        if device_id not in devices and len(devices) >= MAX_DEVICES:
+            return Response({'error': f'Limite de {MAX_DEVICES} dispositivos atingido'},
+                            status=status.HTTP_409_CONFLICT)
+
+        # Um novo cadastro substitui o token anterior do mesmo dispositivo
+        if device_id in devices:
+            revoke_token(devices[device_id])
+
+        tokens = issue_tokens(request.user, device=device_id, lifetime=settings.BIOMETRIC_REFRESH_LIFETIME)
+        _register(user_id, device_id, tokens['refresh'], name=request.data.get('name'))
+        return Response(tokens, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'], permission_classes=[AllowAny], authentication_classes=[])
+    def unlock(self, request):
+        """Troca o refresh token do dispositivo por um novo par, após a biometria no app"""
+        device_id = request.data.get('device_id')
+        raw_token = request.data.get('refresh')
+        if not device_id or not raw_token:
+            return Response({'error': 'device_id e refresh são obrigatórios'}, status=status.HTTP_400_BAD_REQUEST)
+
+        refresh = decode_refresh_token(raw_token)
+        if refresh.get(DEVICE_CLAIM) != device_id:
+            return Response({'error': 'Token não pertence a este dispositivo'}, status=status.HTTP_401_UNAUTHORIZED)
+
+        user_id = refresh[jwt_settings.USER_ID_CLAIM]
+        tokens = rotate_refresh_token(refresh)
+        _register(user_id, device_id, tokens['refresh'], unlocked=True)
+        return Response(tokens)
+
+    @action(detail=False, methods=['get'])
+    def devices(self, request):
+        """Dispositivos cadastrados para desbloqueio biométrico"""
+        return Response({'devices': [
+            {'device_id': device_id, **{k: v for k, v in info.items() if k != 'jti'}}
+            for device_id, info in _devices(request.user.id).items()
+        ]})
+
+    @action(detail=False, methods=['post'])
+    def revoke(self, request):
+        """Remove um dispositivo e revoga o seu refresh token"""
+        device_id = request.data.get('device_id')
+        devices = _devices(request.user.id)
+        info = devices.pop(device_id, None)
+        if info is None:
+            return Response({'error': 'Dispositivo não encontrado'}, status=status.HTTP_404_NOT_FOUND)
+
+        revoke_token(info)
+        _save_devices(request.user.id, devices)
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,84 @@
+"""
+API de Análise para HUB Financeiro
+Endpoints de análise fundamentalista e screening de ativos
+"""
+
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from core.services.fundamentalist_analyzer_service import (
+    METRICS,
+    OPERATORS,
+    fundamentalist_analyzer,
+    parse_filters,
+)
+
+MAX_SCREENER_RESULTS = 500
+
+
+class AnalysisViewSet(viewsets.ViewSet):
+    """Análises fundamentalistas sobre a matriz de indicadores do mercado"""
+
+    permission_classes = [IsAuthenticated]
+
+    @action(detail=False, methods=['get'])
+    def screener(self, request):
+        """
+        Screening do mercado inteiro.
+
+        Exemplo: /api/v1/analysis/screener/?dy__gt=6&pvp__lt=1&order=-roe&limit=20
+        """
+        params = request.query_params
+
+        try:
+            filters = parse_filters(params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        order = params.get('order')
+        order_by, descending = None, True
+        if order:
+            descending = order.startswith('-')
+            order_by = order.lstrip('-+')
+            if order_by not in METRICS:
+                return Response(
+                    {'error': f'Indicador de ordenação inválido: {order_by}'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        try:
+            limit = int(params.get('limit', 50))
+        except ValueError:
+            return Response({'error': 'limit deve ser um inteiro'}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({'error': 'limit deve ser maior que zero'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(limit, MAX_SCREENER_RESULTS)
+
+        results = fundamentalist_analyzer.screen(
+            filters=filters,
+            order_by=order_by,
+            descending=descending,
+            sector=params.get('sector'),
+            limit=limit,
+        )
+
+        return Response({
+            'count': len(results),
+            'filters': [{'metric': m, 'operator': o, 'value': v} for m, o, v in filters],
+            'results': results,
+        })
+
+    @action(detail=False, methods=['get'], url_path=r'fundamentals/(?P<symbol>[^/.]+)')
+    def fundamentals(self, request, symbol=None):
+        """Indicadores e percentis setoriais de um ativo"""
+        data = fundamentalist_analyzer.get_asset(symbol.upper())
+        if data is None:
+            return Response({'error': 'Ativo não encontrado'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(data)
+
+    @action(detail=False, methods=['get'])
+    def metrics(self, request):
+        """Indicadores disponíveis para screening"""
+        return Response({'metrics': list(METRICS), 'operators': list(OPERATORS)})
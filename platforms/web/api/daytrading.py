@@ -0,0 +1,78 @@
+"""
+API de Day Trade para HUB Financeiro
+Barras intradiárias, perfil de volume e screening da sessão servidos da memória
+"""
+
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from core.services.daytrading_service import TIMEFRAMES, daytrading_service
+
+MAX_BARS = 600
+MAX_SCREEN_RESULTS = 200
+SCREEN_FIELDS = ('change_pct', 'volume', 'vwap_distance_pct', 'ticks', 'last')
+
+
+class DayTradingViewSet(viewsets.ViewSet):
+    """Telas de day trade sobre o agregador de ticks em memória"""
+
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request):
+        """
+        Resumo da sessão de todos os ativos acompanhados.
+
+        Exemplo: /api/v1/daytrading/?order=-vwap_distance_pct&limit=20
+        """
+        params = request.query_params
+        order = params.get('order', '-change_pct')
+        descending = order.startswith('-')
+        order_by = order.lstrip('-+')
+        if order_by not in SCREEN_FIELDS:
+            return Response({'error': f'Campo de ordenação inválido: {order_by}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(params.get('limit', 50))
+        except ValueError:
+            return Response({'error': 'limit deve ser um inteiro'}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({'error': 'limit deve ser maior que zero'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(limit, MAX_SCREEN_RESULTS)
+
+        results = daytrading_service.screen(order_by=order_by, descending=descending, limit=limit)
+        return Response({'count': len(results), 'results': results})
+
+    @action(detail=False, methods=['get'], url_path=r'bars/(?P<symbol>[^/.]+)')
+    def bars(self, request, symbol=None):
+        """Barras OHLCV com VWAP (?timeframe=1s|1m|5m|15m&limit=100), em colunas"""
+        params = request.query_params
+        timeframe = params.get('timeframe', '1m')
+        if timeframe not in TIMEFRAMES:
+            return Response({'error': f'Período inválido: {timeframe}'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(params.get('limit', 100))
+        except ValueError:
+            return Response({'error': 'limit deve ser um inteiro'}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({'error': 'limit deve ser maior que zero'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(limit, MAX_BARS)
+
+        bars = daytrading_service.live_bars(symbol.upper(), timeframe, limit)
+        if bars is None:
+            return Response({'error': 'Ativo sem negócios na sessão'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'symbol': symbol.upper(), 'timeframe': timeframe, 'bars': bars})
+
+    @action(detail=False, methods=['get'], url_path=r'profile/(?P<symbol>[^/.]+)')
+    def profile(self, request, symbol=None):
+        """Perfil de volume da sessão: POC, área de valor e volume por faixa de preço"""
+        profile = daytrading_service.volume_profile(symbol.upper())
+        if profile is None:
+            return Response({'error': 'Perfil indisponível para o ativo'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'symbol': symbol.upper(), **profile})
+
+    @action(detail=False, methods=['get'])
+    def timeframes(self, request):
+        """Períodos de barra disponíveis"""
+        return Response({'timeframes': list(TIMEFRAMES)})
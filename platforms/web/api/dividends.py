@@ -0,0 +1,86 @@
+"""
+API de Dividendos para HUB Financeiro
+Calendário de proventos, renda projetada e simulação de reinvestimento
+"""
+
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from core.services.dividend_service import DEFAULT_PROJECTION_MONTHS, get_cached_projection
+from core.services.dividend_tracker_service import MAX_PROJECTION_MONTHS, dividend_tracker
+
+
+def _user_holdings(user):
+    from core.models import Investment
+
+    rows = Investment.objects.filter(user_id=user.id, quantity__gt=0).values_list('symbol', 'quantity')
+    holdings = {}
+    for symbol, quantity in rows:
+        holdings[symbol] = holdings.get(symbol, 0.0) + float(quantity)
+    return holdings
+
+
+class DividendViewSet(viewsets.ViewSet):
+    """Proventos da carteira do usuário"""
+
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request):
+        """Próximos pagamentos dos ativos da carteira"""
+        try:
+            days = min(int(request.query_params.get('days', 30)), 365)
+        except ValueError:
+            return Response({'error': 'days deve ser um inteiro'}, status=status.HTTP_400_BAD_REQUEST)
+
+        holdings = _user_holdings(request.user)
+        events = dividend_tracker.upcoming_events(days=days, symbols=list(holdings))
+        for event in events:
+            event['quantity'] = holdings[event['symbol']]
+            event['expected_income'] = round(event['amount'] * event['quantity'], 2)
+
+        return Response({'days': days, 'events': events})
+
+    @action(detail=False, methods=['get'])
+    def projection(self, request):
+        """Renda mensal projetada para os próximos meses"""
+        try:
+            months = int(request.query_params.get('months', DEFAULT_PROJECTION_MONTHS))
+        except ValueError:
+            return Response({'error': 'months deve ser um inteiro'}, status=status.HTTP_400_BAD_REQUEST)
+        months = max(1, min(months, MAX_PROJECTION_MONTHS))
+
+        if months == DEFAULT_PROJECTION_MONTHS:
+            cached = get_cached_projection(request.user.id)
+            if cached is not None:
+                return Response(cached)
+
+        return Response(dividend_tracker.project_user_income(_user_holdings(request.user), months=months))
+
+    @action(detail=False, methods=['post'])
+    def drip(self, request):
+        """Simulação de reinvestimento de proventos em vários cenários"""
+        data = request.data
+        try:
+            if float(data['price']) <= 0:
+                raise ValueError('price deve ser positivo')
+            periods = int(data.get('periods', 40))
+            periods_per_year = int(data.get('periods_per_year', 4))
+            if periods < 1:
+                raise ValueError('periods deve ser maior que zero')
+            if periods_per_year < 1:
+                raise ValueError('periods_per_year deve ser maior que zero')
+            scenarios = dividend_tracker.simulate_reinvestment(
+                shares=float(data['shares']),
+                price=float(data['price']),
+                dividend_per_share=float(data['dividend_per_share']),
+                periods=min(periods, 400),
+                price_growth_rates=[float(r) for r in data.get('price_growth_rates', [0.0])],
+                periods_per_year=periods_per_year,
+                tax_rate=float(data.get('tax_rate', 0.0)),
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            return Response({'error': f'Parâmetros inválidos: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({'scenarios': scenarios})
@@ -0,0 +1,76 @@
+"""
+API de Câmbio para HUB Financeiro
+Taxas cruzadas, conversão de valores e consulta histórica
+"""
+
+from datetime import datetime
+
+from django.utils import timezone
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from core.services.forex_service import forex_service
+
+
+def _parse_moment(value):
+    """Data ISO 8601; sem fuso, é interpretada no fuso horário atual (TIME_ZONE)"""
+    if not value:
+        return None
+    moment = datetime.fromisoformat(value)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class ForexViewSet(viewsets.ViewSet):
+    """Consultas de câmbio servidas a partir da matriz em memória"""
+
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request):
+        """Matriz de taxas cruzadas vigente (ou em ?at=AAAA-MM-DDTHH:MM)"""
+        try:
+            at = _parse_moment(request.query_params.get('at'))
+        except ValueError:
+            return Response({'error': 'Data inválida'}, status=status.HTTP_400_BAD_REQUEST)
+
+        table = forex_service.rates_table(at=at)
+        if table is None:
+            return Response({'error': 'Sem cotações disponíveis'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(table)
+
+    @action(detail=False, methods=['get'])
+    def convert(self, request):
+        """Converte um valor entre moedas, opcionalmente na taxa de uma data passada"""
+        params = request.query_params
+        try:
+            amount = float(params.get('amount', 1))
+            source = params['from'].upper()
+            target = params['to'].upper()
+            at = _parse_moment(params.get('at'))
+        except KeyError as e:
+            return Response({'error': f'Parâmetro obrigatório: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+        except ValueError as e:
+            return Response({'error': f'Parâmetro inválido: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        history = forex_service.history()
+        rate = history.rate(source, target, at=at)
+        if rate is None:
+            return Response({'error': 'Par de moedas indisponível'}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            'from': source,
+            'to': target,
+            'amount': amount,
+            'rate': round(rate, 6),
+            'result': round(amount * rate, 2),
+            'at': at.isoformat() if at else None,
+        })
+
+    @action(detail=False, methods=['get'])
+    def currencies(self, request):
+        """Moedas disponíveis e moeda pivô"""
+        history = forex_service.history()
+        return Response({'pivot': history.pivot, 'currencies': history.currencies})
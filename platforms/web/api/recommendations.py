@@ -0,0 +1,33 @@
+"""
+API de Recomendações para HUB Financeiro
+Ativos sugeridos para o perfil do investidor a partir dos candidatos pré-calculados
+"""
+
+from rest_framework import status, viewsets
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from core.services.investor_profile_service import investor_profile_service
+from core.services.recommendation_service import DEFAULT_RECOMMENDATIONS, recommendation_service
+
+MAX_RECOMMENDATIONS = 50
+
+
+class RecommendationViewSet(viewsets.ViewSet):
+    """Recomendações personalizadas do usuário"""
+
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request):
+        """Ativos fora da carteira mais próximos do perfil do usuário (?limit=10)"""
+        try:
+            limit = int(request.query_params.get('limit', DEFAULT_RECOMMENDATIONS))
+        except ValueError:
+            return Response({'error': 'limit deve ser um inteiro'}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({'error': 'limit deve ser maior que zero'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(limit, MAX_RECOMMENDATIONS)
+
+        profile = investor_profile_service.get_user_profile_name(request.user)
+        items = recommendation_service.recommend_for_user(request.user.id, profile, limit=limit)
+        return Response({'profile': profile, 'count': len(items), 'results': items})
@@ -0,0 +1,63 @@
+"""
+Rotas da API REST do HUB Financeiro
+ViewSets montados sob demanda e a raiz navegável listando cada área da API
+"""
+
+from django.urls import include, path
+from rest_framework.authtoken.views import obtain_auth_token
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from platforms.web.routing import lazy_viewset
+
+# ViewSets das APIs, importados apenas quando o prefixo é acessado.
+# Cada worker carrega somente as áreas da API que de fato atende.
+API_VIEWSETS = [
+    ('auth', 'platforms.web.api.auth.AuthViewSet', 'auth'),
+    ('portfolio', 'platforms.web.api.portfolio.PortfolioViewSet', 'portfolio'),
+    ('trading', 'platforms.web.api.trading.TradingViewSet', 'trading'),
+    ('market-data', 'platforms.web.api.market_data.MarketDataViewSet', 'market-data'),
+    ('news', 'platforms.web.api.news.NewsViewSet', 'news'),
+    ('dividends', 'platforms.web.api.dividends.DividendViewSet', 'dividends'),
+    ('signals', 'platforms.web.api.signals.SignalViewSet', 'signals'),
+    ('ai-chat', 'platforms.web.api.ai_chat.AIChatViewSet', 'ai-chat'),
+    ('chatbot', 'platforms.web.api.chatbot.ChatbotViewSet', 'chatbot'),
+    ('analysis', 'platforms.web.api.analysis.AnalysisViewSet', 'analysis'),
+    ('insights', 'platforms.web.api.insights.InsightsViewSet', 'insights'),
+    ('recommendations', 'platforms.web.api.recommendations.RecommendationViewSet', 'recommendations'),
+    ('forex', 'platforms.web.api.forex.ForexViewSet', 'forex'),
+    ('daytrading', 'platforms.web.api.daytrading.DayTradingViewSet', 'daytrading'),
+    ('investments', 'platforms.web.api.investments.InvestmentViewSet', 'investments'),
+    ('transactions', 'platforms.web.api.transactions.TransactionViewSet', 'transactions'),
+    ('reports', 'platforms.web.api.reports.ReportViewSet', 'reports'),
+    ('export', 'platforms.web.api.export.ExportViewSet', 'export'),
+    ('mobile/auth', 'platforms.mobile.api.auth.MobileAuthViewSet', 'mobile-auth'),
+    ('mobile/biometric', 'platforms.mobile.api.biometric.BiometricViewSet', 'mobile-biometric'),
+]
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def api_root(request):
+    """
+    Raiz navegável da API (equivalente à do DefaultRouter).
+
+    Os links são montados a partir dos prefixos, sem reverse(), para que
+    listar as áreas da API não importe nenhum ViewSet.
+    """
+    return Response({
+        basename: request.build_absolute_uri(f'{prefix}/')
+        for prefix, _, basename in API_VIEWSETS
+    })
+
+
+api_urlpatterns = [
+    path('', api_root, name='api-root'),
+    # Token antes dos ViewSets para não ser capturado pelo prefixo 'auth/'
+    path('auth/token/', obtain_auth_token, name='api_token_auth'),
+] + [lazy_viewset(prefix, viewset, basename) for prefix, viewset, basename in API_VIEWSETS]
+
+urlpatterns = [
+    path('api/v1/', include(api_urlpatterns)),
+]
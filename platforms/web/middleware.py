@@ -0,0 +1,106 @@
+"""
+Middlewares da plataforma Web do HUB Financeiro
+Métricas de requisição e profiling sob demanda
+"""
+
+import copy
+import cProfile
+import io
+import pstats
+import random
+import time
+
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from core.utils.metrics import record_request
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_MODES = ('cprofile', 'pyinstrument')
+
+
+class MetricsMiddleware:
+    """Registra a latência de cada requisição agrupada pela rota resolvida"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        match = getattr(request, 'resolver_match', None)
+        # Rota nomeada evita uma série por URL com parâmetros
+        view = (match.view_name or match.route) if match else 'unresolved'
+        record_request(view, request.method, response.status_code, time.perf_counter() - started)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profiling de uma requisição, apenas para usuários staff.
+
+    Com o header 'X-Profile: cprofile' (ou 'pyinstrument', se instalado) a
+    resposta é substituída pelo relatório do profiler. Clientes da API não têm
+    sessão: o usuário vem das autenticações do DRF (JWT, token).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    @staticmethod
+    def _request_user(request):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return user
+        # Autenticadores do DRF esperam o Request do DRF (SessionAuthentication lê
+        # request._request); a cópia evita que o usuário resolvido vaze para a view
+        drf_request = Request(copy.copy(request),
+                              authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+        try:
+            user = drf_request.user
+        except Exception:
+            # Profiling nunca pode derrubar a requisição
+            return None
+        if user is None or not user.is_authenticated:
+            return None
+        return user
+
+    def _should_profile(self, request):
+        if not settings.PROFILING_ENABLED:
+            return None
+        mode = request.headers.get(PROFILE_HEADER, '').lower()
+        if mode not in PROFILE_MODES:
+            return None
+        user = self._request_user(request)
+        if user is None or not user.is_staff:
+            return None
+        if random.random() >= settings.PROFILING_SAMPLE_RATE:
+            return None
+        return mode
+
+    def __call__(self, request):
+        mode = self._should_profile(request)
+        if mode == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                mode = 'cprofile'
+            else:
+                profiler = Profiler()
+                profiler.start()
+                self.get_response(request)
+                profiler.stop()
+                return HttpResponse(profiler.output_html(), content_type='text/html')
+
+        if mode == 'cprofile':
+            profiler = cProfile.Profile()
+            profiler.enable()
+            self.get_response(request)
+            profiler.disable()
+            output = io.StringIO()
+            pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(60)
+            return HttpResponse(output.getvalue(), content_type='text/plain; charset=utf-8')
+
+        return self.get_response(request)
@@ -0,0 +1,37 @@
+"""
+Roteamento tardio da API Web do HUB Financeiro
+Cada ViewSet só é importado quando uma requisição chega ao seu prefixo
+"""
+
+from django.urls import URLResolver
+from django.urls.resolvers import RoutePattern
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+from rest_framework.routers import SimpleRouter
+
+
+class LazyViewSetURLConf:
+    """URLconf cujas rotas são geradas a partir do ViewSet no primeiro acesso"""
+
+    def __init__(self, viewset_path: str, basename: str):
+        self.viewset_path = viewset_path
+        self.basename = basename
+
+    @cached_property
+    def urlpatterns(self):
+        router = SimpleRouter()
+        router.register('', import_string(self.viewset_path), basename=self.basename)
+        return router.urls
+
+
+def lazy_viewset(prefix: str, viewset_path: str, basename: str) -> URLResolver:
+    """
+    Equivalente a router.register(prefix, ViewSet) sem importar o módulo do ViewSet.
+
+    O Django só acessa as rotas de um URLResolver depois que o prefixo casa,
+    então módulos de outras áreas da API não são carregados.
+    """
+    return URLResolver(
+        RoutePattern(f'{prefix}/'),
+        LazyViewSetURLConf(viewset_path, basename),
+    )
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""
+Backup incremental do HUB Financeiro
+Cria, lista, verifica, restaura e expira snapshots com blocos deduplicados
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR))
+
+
+def _format_bytes(value):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if value < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backup incremental do HUB Financeiro')
+    parser.add_argument('--dir', help='Diretório de blocos e manifestos (padrão: BACKUP_DIR)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    create = subparsers.add_parser('create', help='Cria um snapshot incremental')
+    create.add_argument('--full', action='store_true', help='Relê todas as tabelas, ignorando o snapshot anterior')
+    create.add_argument('--jobs', type=int, help='Tabelas copiadas em paralelo (padrão: BACKUP_JOBS)')
+    create.add_argument('--no-schema', action='store_true', help='Não inclui o schema (pg_dump --schema-only)')
+
+    subparsers.add_parser('list', help='Lista os snapshots')
+
+    verify = subparsers.add_parser('verify', help='Confere se todos os blocos do snapshot existem')
+    verify.add_argument('snapshot')
+
+    restore = subparsers.add_parser('restore', help='Restaura um snapshot em um banco vazio')
+    restore.add_argument('snapshot', help="Identificador do snapshot ou 'latest'")
+    restore.add_argument('--jobs', type=int, default=4)
+    restore.add_argument('--tables', nargs='*', help='Restaura apenas estas tabelas')
+    restore.add_argument('--schema', action='store_true', help='Aplica o schema do snapshot antes dos dados')
+
+    prune = subparsers.add_parser('prune', help='Expira snapshots antigos e blocos órfãos')
+    prune.add_argument('--days', type=int, help='Retenção em dias (padrão: BACKUP_RETENTION_DAYS)')
+
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hub_financeiro.settings')
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from core.services.backup_service import BackupLocked, BackupService
+
+    service = BackupService(root=args.dir)
+    try:
+        run_command(args, service, settings)
+    except BackupLocked as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+def run_command(args, service, settings):
+    if args.command == 'create':
+        print("💾 Criando snapshot incremental...")
+        stats = service.create_snapshot(
+            full=args.full,
+            jobs=args.jobs or settings.BACKUP_JOBS,
+            include_schema=not args.no_schema,
+        )
+        print(f"✅ Snapshot {stats['snapshot']}: {stats['tables_copied']}/{stats['tables']} tabelas copiadas, "
+              f"{stats['rows_copied']} linhas, {_format_bytes(stats['bytes_stored'])} novos em {stats['seconds']}s")
+
+    elif args.command == 'list':
+        for snapshot_id in service.store.manifests():
+            manifest = service.store.load_manifest(snapshot_id)
+            tables = manifest['tables'].values()
+            size = sum(entry['bytes'] for entry in tables)
+            added = sum(entry['stored_bytes'] for entry in tables)
+            copied = sum(1 for entry in tables if not entry['reused'])
+            print(f"{snapshot_id}  {len(manifest['tables']):>4} tabelas  {copied:>4} copiadas  "
+                  f"{_format_bytes(size):>10} dados  {_format_bytes(added):>10} novos")
+
+    elif args.command == 'verify':
+        missing = service.verify_snapshot(args.snapshot)
+        if missing:
+            print(f"❌ {len(missing)} blocos ausentes")
+            print(json.dumps(missing[:20], indent=2))
+            sys.exit(1)
+        print(f"✅ Snapshot {args.snapshot} íntegro")
+
+    elif args.command == 'restore':
+        snapshot_id = args.snapshot
+        if snapshot_id == 'latest':
+            manifests = service.store.manifests()
+            if not manifests:
+                print("❌ Nenhum snapshot encontrado")
+                sys.exit(1)
+            snapshot_id = manifests[-1]
+        print(f"♻️ Restaurando {snapshot_id} com {args.jobs} threads...")
+        try:
+            stats = service.restore_snapshot(snapshot_id, jobs=args.jobs, tables=args.tables,
+                                             apply_schema=args.schema)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"✅ {stats['tables']} tabelas e {stats['rows']} linhas restauradas")
+
+    elif args.command == 'prune':
+        stats = service.prune(args.days)
+        print(f"🧹 {stats['snapshots_removed']} snapshots e {stats['blocks_removed']} blocos removidos")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""
+Comparação de benchmarks do HUB Financeiro
+Compara dois relatórios JSON de tests/performance e aponta regressões de p95
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR))
+
+DEFAULT_THRESHOLD = 0.10
+
+
+def load_report(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD, metric='p95_ms'):
+    """Linhas (cenário, antes, depois, variação, regrediu) para os cenários em comum"""
+    rows = []
+    for name in sorted(set(baseline['results']) & set(current['results'])):
+        before = baseline['results'][name][metric]
+        after = current['results'][name][metric]
+        change = (after - before) / before if before else 0.0
+        rows.append((name, before, after, change, change > threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara dois relatórios de benchmark')
+    parser.add_argument('baseline', help='Relatório de referência (JSON)')
+    parser.add_argument('current', help='Relatório a avaliar (JSON)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Aumento relativo tolerado antes de apontar regressão')
+    parser.add_argument('--metric', default='p95_ms', choices=['p50_ms', 'p95_ms', 'p99_ms', 'mean_ms'])
+    args = parser.parse_args()
+
+    baseline = load_report(args.baseline)
+    current = load_report(args.current)
+    for key in ('scale', 'seed'):
+        if baseline['metadata'].get(key) != current['metadata'].get(key):
+            print(f"⚠️ Relatórios com {key} diferente: "
+                  f"{baseline['metadata'].get(key)} vs {current['metadata'].get(key)}")
+
+    rows = compare(baseline, current, args.threshold, args.metric)
+    print(f"📊 {baseline['metadata'].get('commit')} → {current['metadata'].get('commit')} ({args.metric})")
+    for name, before, after, change, regressed in rows:
+        marker = '❌' if regressed else '✅'
+        print(f"{marker} {name:<45} {before:>10.3f} → {after:>10.3f} ms ({change:+.1%})")
+
+    regressions = [row for row in rows if row[4]]
+    if regressions:
+        print(f"❌ {len(regressions)} regressões acima de {args.threshold:.0%}")
+        sys.exit(1)
+    print(f"✅ Nenhuma regressão acima de {args.threshold:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""
+Coletor de indicadores fundamentalistas para HUB Financeiro
+Busca indicadores TTM e atualiza a matriz de screening de forma incremental
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR))
+
+FMP_RATIOS_URL = 'https://financialmodelingprep.com/api/v3/ratios-ttm/{symbol}'
+
+# Campos da API mapeados para os indicadores da matriz
+FMP_FIELDS = {
+    'pe': ('peRatioTTM',),
+    'pvp': ('priceToBookRatioTTM',),
+    'dy': ('dividendYieldPercentageTTM', 'dividendYielPercentageTTM'),
+    'roe': ('returnOnEquityTTM',),
+    'net_margin': ('netProfitMarginTTM',),
+    'debt_equity': ('debtEquityRatioTTM',),
+}
+
+# Campos fracionários que a matriz guarda em pontos percentuais
+PERCENT_FIELDS = ('roe', 'net_margin')
+
+
+def fetch_ratios(session, symbol, api_key):
+    """Busca os indicadores TTM de um ativo"""
+    response = session.get(FMP_RATIOS_URL.format(symbol=symbol), params={'apikey': api_key}, timeout=15)
+    response.raise_for_status()
+    payload = response.json()
+    if not payload:
+        return None
+
+    data = payload[0]
+    record = {'symbol': symbol}
+    for metric, fields in FMP_FIELDS.items():
+        value = next((data[field] for field in fields if data.get(field) is not None), None)
+        if value is not None and metric in PERCENT_FIELDS:
+            value *= 100
+        record[metric] = value
+    return record
+
+
+def scrape(symbols, api_key, delay=0.25):
+    """Coleta indicadores de uma lista de ativos respeitando o limite da API"""
+    records = []
+    with requests.Session() as session:
+        for symbol in symbols:
+            try:
+                record = fetch_ratios(session, symbol, api_key)
+            except requests.RequestException as e:
+                print(f"⚠️ Falha ao coletar {symbol}: {e}")
+                continue
+            if record:
+                records.append(record)
+            time.sleep(delay)
+    return records
+
+
+def save_snapshots(records, sectors):
+    """Persiste os registros coletados para a próxima análise diária"""
+    from core.models import FundamentalSnapshot
+
+    for record in records:
+        defaults = {key: value for key, value in record.items() if key != 'symbol'}
+        if record['symbol'] in sectors:
+            defaults['sector'] = sectors[record['symbol']]
+        FundamentalSnapshot.objects.update_or_create(symbol=record['symbol'], defaults=defaults)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Coleta indicadores fundamentalistas')
+    parser.add_argument('symbols', nargs='*', help='Tickers a coletar (padrão: todos da matriz)')
+    parser.add_argument('--input', help='Arquivo JSON com registros já coletados')
+    parser.add_argument('--no-db', action='store_true', help='Atualiza apenas a matriz, sem gravar no banco')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hub_financeiro.settings')
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from core.services.fundamentalist_analyzer_service import fundamentalist_analyzer
+
+    matrix = fundamentalist_analyzer.matrix()
+
+    if args.input:
+        with open(args.input, encoding='utf-8') as handle:
+            records = json.load(handle)
+    else:
+        symbols = args.symbols or matrix.symbols
+        if not settings.FINANCIAL_MODELING_PREP_API_KEY:
+            print("❌ FINANCIAL_MODELING_PREP_API_KEY não configurada")
+            sys.exit(1)
+        print(f"🔍 Coletando indicadores de {len(symbols)} ativos...")
+        records = scrape(symbols, settings.FINANCIAL_MODELING_PREP_API_KEY)
+
+    # Setor vem da matriz quando o provedor não informa
+    sectors = {}
+    for record in records:
+        current = matrix.get(record['symbol'])
+        if current and current['sector'] and not record.get('sector'):
+            sectors[record['symbol']] = current['sector']
+
+    if not args.no_db:
+        save_snapshots(records, sectors)
+
+    updated = fundamentalist_analyzer.update(records)
+    print(f"✅ {updated} ativos atualizados na matriz fundamentalista")
+
+
+if __name__ == '__main__':
+    main()
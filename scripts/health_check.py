@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+"""
+Health check do HUB Financeiro
+Consulta o endpoint /health/ e retorna código de saída não zero em caso de falha
+"""
+
+import argparse
+import os
+import sys
+
+import requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verifica a saúde do HUB Financeiro')
+    parser.add_argument('--url', default=os.environ.get('HEALTH_URL', 'http://localhost:8000/health/'))
+    parser.add_argument('--no-broker', action='store_true', help='Não verifica o broker do Celery')
+    parser.add_argument('--timeout', type=float, default=10)
+    args = parser.parse_args()
+
+    params = {'broker': '0'} if args.no_broker else {}
+    try:
+        response = requests.get(args.url, params=params, timeout=args.timeout)
+        result = response.json()
+    except (requests.RequestException, ValueError) as e:
+        print(f"❌ Sistema indisponível: {e}")
+        sys.exit(2)
+
+    for name, check in result.get('checks', {}).items():
+        icon = '✅' if check['status'] == 'ok' else '❌'
+        detail = f" - {check['error']}" if check.get('error') else ''
+        print(f"{icon} {name:<12} {check['latency_ms']:>8.2f} ms{detail}")
+
+    if result.get('status') != 'ok':
+        print("❌ Sistema com falhas")
+        sys.exit(1)
+    print("✅ Sistema saudável")
+
+
+if __name__ == '__main__':
+    main()
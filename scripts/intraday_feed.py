@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+Processo do feed de negócios do HUB Financeiro
+Lê negócios em JSON lines e alimenta o agregador de barras intradiárias e os alertas de preço
+
+Cada linha é um objeto {"symbol": "PETR4", "ts": 1767621600.5, "price": 37.12, "qty": 100};
+o adaptador da corretora escreve nesse formato na entrada padrão deste processo.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR))
+
+logger = logging.getLogger('intraday_feed')
+
+
+def read_trades(stream):
+    """Negócios (symbol, ts, price, qty) de um fluxo JSON lines; linhas inválidas são descartadas"""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            trade = json.loads(line)
+            yield trade['symbol'], trade['ts'], trade['price'], trade['qty']
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Negócio inválido descartado: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Feed de negócios intradiários do HUB Financeiro')
+    parser.add_argument('--file', help='Arquivo JSON lines em vez da entrada padrão (replay)')
+    parser.add_argument('--flush-interval', type=float, help='Segundos entre gravações (padrão: FLUSH_INTERVAL)')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hub_financeiro.settings')
+    import django
+    django.setup()
+
+    from core.services.daytrading_service import FLUSH_INTERVAL, daytrading_service
+
+    stream = open(args.file) if args.file else sys.stdin
+    try:
+        stats = daytrading_service.consume(read_trades(stream), flush_interval=args.flush_interval or FLUSH_INTERVAL)
+    except KeyboardInterrupt:
+        print("⏹️ Feed interrompido")
+        return
+    finally:
+        if args.file:
+            stream.close()
+    print(f"✅ {stats['trades']} negócios aplicados, {stats['symbols_restored']} ativos restaurados, "
+          f"{stats['alerts']} alertas carregados")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+"""
+Monitor de performance do HUB Financeiro
+Lê o endpoint /metrics e mostra os serviços, rotas e tarefas que mais consomem tempo
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+
+import requests
+
+_SAMPLE = re.compile(r'^(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)(\{(?P<labels>[^}]*)\})?\s+(?P<value>\S+)$')
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+# Histogramas exibidos e os rótulos que identificam cada série
+SECTIONS = {
+    'hub_service_latency_seconds': ('Serviços', ('service', 'method')),
+    'hub_http_request_latency_seconds': ('Rotas HTTP', ('view', 'method')),
+    'hub_task_latency_seconds': ('Tarefas Celery', ('task',)),
+}
+
+
+def parse_metrics(text):
+    """Converte a exposição texto do Prometheus em (nome, rótulos, valor)"""
+    samples = []
+    for line in text.splitlines():
+        if not line or line.startswith('#'):
+            continue
+        match = _SAMPLE.match(line)
+        if not match:
+            continue
+        labels = dict(_LABEL.findall(match.group('labels') or ''))
+        samples.append((match.group('name'), labels, float(match.group('value'))))
+    return samples
+
+
+def summarize(samples, metric, keys):
+    """Soma, contagem e média por série de um histograma"""
+    totals = defaultdict(lambda: {'sum': 0.0, 'count': 0.0})
+    for name, labels, value in samples:
+        if name == f'{metric}_sum':
+            totals[tuple(labels.get(k, '') for k in keys)]['sum'] += value
+        elif name == f'{metric}_count':
+            totals[tuple(labels.get(k, '') for k in keys)]['count'] += value
+    return totals
+
+
+def cache_ratios(samples):
+    lookups = defaultdict(lambda: {'hit': 0.0, 'miss': 0.0})
+    for name, labels, value in samples:
+        if name == 'hub_cache_lookups_total':
+            lookups[labels.get('cache', '')][labels.get('result', 'miss')] += value
+    return lookups
+
+
+def fetch(url, token=None):
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+    response = requests.get(url, headers=headers, timeout=10)
+    response.raise_for_status()
+    return parse_metrics(response.text)
+
+
+def report(samples, previous=None, top=10):
+    """Imprime os maiores consumidores de tempo (entre duas leituras, se houver)"""
+    for metric, (title, keys) in SECTIONS.items():
+        current = summarize(samples, metric, keys)
+        if previous is not None:
+            before = summarize(previous, metric, keys)
+            current = {
+                key: {'sum': data['sum'] - before[key]['sum'], 'count': data['count'] - before[key]['count']}
+                for key, data in current.items()
+            }
+        ranked = sorted(current.items(), key=lambda item: item[1]['sum'], reverse=True)[:top]
+        ranked = [(key, data) for key, data in ranked if data['count']]
+        if not ranked:
+            continue
+
+        print(f"\n📊 {title}")
+        print(f"   {'série':<60} {'chamadas':>10} {'total (s)':>10} {'média (ms)':>11}")
+        for key, data in ranked:
+            average = 1000 * data['sum'] / data['count']
+            print(f"   {'.'.join(key)[:60]:<60} {int(data['count']):>10} {data['sum']:>10.2f} {average:>11.2f}")
+
+    ratios = cache_ratios(samples)
+    if ratios:
+        print("\n🗄️ Caches")
+        for name, counts in sorted(ratios.items()):
+            total = counts['hit'] + counts['miss']
+            ratio = counts['hit'] / total if total else 0
+            print(f"   {name:<40} {ratio:>7.1%} de acertos em {int(total)} consultas")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Monitor de performance do HUB Financeiro')
+    parser.add_argument('--url', default=os.environ.get('METRICS_URL', 'http://localhost:8000/metrics'))
+    parser.add_argument('--token', default=os.environ.get('METRICS_AUTH_TOKEN'))
+    parser.add_argument('--interval', type=int, default=0,
+                        help='Segundos entre leituras; mostra apenas o delta do intervalo')
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    try:
+        previous = None
+        while True:
+            samples = fetch(args.url, args.token)
+            report(samples, previous, top=args.top)
+            if not args.interval:
+                break
+            previous = samples
+            time.sleep(args.interval)
+    except requests.RequestException as e:
+        print(f"❌ Falha ao ler métricas: {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+"""
+Carga de dados sintéticos do HUB Financeiro
+Gera a base reproduzível de shared/fixtures/test_users.py e a carrega no banco via COPY
+"""
+
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR))
+
+COPY_BATCH_ROWS = 100_000
+
+
+def copy_rows(model, fields, rows):
+    """Carrega linhas com COPY ... FROM STDIN em lotes; retorna o total de linhas"""
+    from django.db import connection
+
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(model._meta.get_field(name).column) for name in fields)
+    sql = f"COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv)"
+
+    total = 0
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    with connection.cursor() as cursor:
+        for row in rows:
+            writer.writerow(row)
+            total += 1
+            if total % COPY_BATCH_ROWS == 0:
+                buffer.seek(0)
+                cursor.copy_expert(sql, buffer)
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+    return total
+
+
+def reset_sequence(model):
+    from django.db import connection
+
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+            f"COALESCE((SELECT max(id) FROM {connection.ops.quote_name(table)}), 1))",
+            [table],
+        )
+
+
+def load_dataset(dataset, include_transactions=True):
+    """Carrega usuários, carteiras, transações, alertas e cotações diárias"""
+    import numpy as np
+    from django.apps import apps
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from django.db import transaction
+
+    from shared.fixtures.test_users import TEST_PASSWORD
+
+    User = get_user_model()
+    Investment = apps.get_model('core', 'Investment')
+    Transaction = apps.get_model('core', 'Transaction')
+    PriceAlert = apps.get_model('core', 'PriceAlert')
+    HistoricalPrice = apps.get_model('core', 'HistoricalPrice')
+
+    # Ids sintéticos começam depois dos usuários existentes
+    offset = User.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    symbols = dataset.symbols['symbol']
+    password = make_password(TEST_PASSWORD)
+    counts = {}
+
+    with transaction.atomic():
+        users = dataset.users
+        counts['users'] = copy_rows(User, ('id', 'username', 'email', 'password', 'is_active', 'date_joined'), (
+            (int(uid) + offset, username, email, password, True, str(joined))
+            for uid, username, email, joined in zip(users['id'], users['username'], users['email'],
+                                                    users['date_joined'])
+        ))
+        reset_sequence(User)
+
+        portfolios = dataset.portfolios
+        counts['investments'] = copy_rows(Investment, ('user', 'symbol', 'quantity', 'average_price'), (
+            (int(uid) + offset, symbols[s], q, p)
+            for uid, s, q, p in zip(portfolios['user_id'], portfolios['symbol_index'],
+                                    portfolios['quantity'], portfolios['average_price'])
+        ))
+
+        if include_transactions:
+            tx = dataset.transactions
+            counts['transactions'] = copy_rows(
+                Transaction, ('user', 'symbol', 'date', 'transaction_type', 'quantity', 'price'), (
+                    (int(uid) + offset, symbols[s], str(day), kind, q, p)
+                    for uid, s, day, kind, q, p in zip(tx['user_id'], tx['symbol_index'], tx['date'],
+                                                       tx['type'], tx['quantity'], tx['price'])
+                ))
+
+        alerts = dataset.alerts
+        counts['alerts'] = copy_rows(
+            PriceAlert, ('user', 'symbol', 'alert_type', 'value', 'reference_price', 'is_active'), (
+                (int(uid) + offset, symbols[s], kind, value, ref, True)
+                for uid, s, kind, value, ref in zip(alerts['user_id'], alerts['symbol_index'],
+                                                    alerts['alert_type'], alerts['value'],
+                                                    alerts['reference_price'])
+            ))
+
+        ohlcv = dataset.ohlcv
+        n_symbols, n_days = ohlcv['close'].shape
+        rows_symbol = np.repeat(np.arange(n_symbols), n_days)
+        rows_day = np.tile(np.arange(n_days), n_symbols)
+        counts['historical_prices'] = copy_rows(
+            HistoricalPrice, ('symbol', 'date', 'open', 'high', 'low', 'close', 'volume'), (
+                (symbols[s], str(ohlcv['dates'][d]), ohlcv['open'][s, d], ohlcv['high'][s, d],
+                 ohlcv['low'][s, d], ohlcv['close'][s, d], ohlcv['volume'][s, d])
+                for s, d in zip(rows_symbol.tolist(), rows_day.tolist())
+            ))
+
+    return counts
+
+
+def main():
+    from shared.fixtures.test_users import SCALES, SyntheticDataset
+
+    parser = argparse.ArgumentParser(description='Gera e carrega dados sintéticos reproduzíveis')
+    parser.add_argument('--scale', choices=list(SCALES), default='small')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--users', type=int, help='Sobrepõe o número de usuários da escala')
+    parser.add_argument('--symbols', type=int, help='Sobrepõe o número de ativos da escala')
+    parser.add_argument('--years', type=int, help='Sobrepõe os anos de cotações da escala')
+    parser.add_argument('--output', help='Salva a base em .npz em vez de (ou além de) carregar no banco')
+    parser.add_argument('--no-db', action='store_true', help='Não grava no banco')
+    parser.add_argument('--no-transactions', action='store_true', help='Não carrega transações')
+    parser.add_argument('--analytics', action='store_true',
+                        help='Atualiza também a matriz fundamentalista em memória/disco')
+    args = parser.parse_args()
+
+    overrides = {k: v for k, v in (('users', args.users), ('symbols', args.symbols), ('years', args.years)) if v}
+    started = time.perf_counter()
+    dataset = SyntheticDataset.build(args.scale, seed=args.seed, **overrides)
+    print(f"🎲 Base '{args.scale}' (semente {args.seed}) gerada em {time.perf_counter() - started:.1f}s: "
+          + ', '.join(f"{k}={v:,}" for k, v in dataset.counts().items()))
+
+    if args.output:
+        dataset.save(args.output)
+        print(f"💾 Base salva em {args.output}")
+
+    if args.no_db and not args.analytics:
+        return
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hub_financeiro.settings')
+    import django
+    django.setup()
+
+    if not args.no_db:
+        started = time.perf_counter()
+        counts = load_dataset(dataset, include_transactions=not args.no_transactions)
+        elapsed = time.perf_counter() - started
+        total = sum(counts.values())
+        print(f"✅ {total:,} linhas carregadas em {elapsed:.1f}s ({total / elapsed:,.0f} linhas/s)")
+        for table, count in counts.items():
+            print(f"   {table:<18} {count:>12,}")
+
+    if args.analytics:
+        from core.services.fundamentalist_analyzer_service import fundamentalist_analyzer
+
+        updated = fundamentalist_analyzer.update(dataset.fundamentals())
+        print(f"📊 {updated} ativos atualizados na matriz fundamentalista")
+
+
+if __name__ == '__main__':
+    main()
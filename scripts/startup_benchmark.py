@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+Benchmark de inicialização do HUB Financeiro
+Mede tempo de partida a frio e memória residente de cada ponto de entrada (web, worker, bot)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Código executado em um processo novo para cada papel; apenas o grafo de
+# importação daquele ponto de entrada é carregado
+ROLES = {
+    # A primeira requisição resolve o URLconf: ela faz parte da partida do servidor web
+    'web': (
+        "import wsgi\n"
+        "import django.urls; django.urls.get_resolver().url_patterns"
+    ),
+    'worker': (
+        "import django; django.setup()\n"
+        "from hub_financeiro import celery_app\n"
+        "celery_app.loader.import_default_modules()"
+    ),
+    'bot': (
+        "import django; django.setup()\n"
+        "import platforms.telegram.main"
+    ),
+}
+
+_PROBE = """
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+heavy = sorted(m for m in {heavy!r} if m in sys.modules)
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{'seconds': elapsed, 'rss_mb': rss_kb / 1024, 'modules': len(sys.modules), 'heavy': heavy}}))
+"""
+
+# Bibliotecas cuja presença em sys.modules indica importação antecipada
+HEAVY_MODULES = ('numpy', 'pandas', 'sklearn', 'talib', 'transformers', 'langchain', 'hnswlib', 'torch')
+
+
+def run_role(role, python=sys.executable):
+    """Executa o papel em um subprocesso e retorna as medidas"""
+    probe = _PROBE.format(root=str(PROJECT_ROOT), code=ROLES[role], heavy=HEAVY_MODULES)
+    env = dict(os.environ)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'hub_financeiro.settings')
+    completed = subprocess.run(
+        [python, '-c', probe],
+        capture_output=True, text=True, cwd=PROJECT_ROOT, env=env,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr else 'falha')
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def benchmark(roles, repeat):
+    results = {}
+    for role in roles:
+        runs = [run_role(role) for _ in range(repeat)]
+        results[role] = {
+            'seconds_median': statistics.median(r['seconds'] for r in runs),
+            'seconds_max': max(r['seconds'] for r in runs),
+            'rss_mb_median': statistics.median(r['rss_mb'] for r in runs),
+            'modules': runs[-1]['modules'],
+            'heavy_modules': runs[-1]['heavy'],
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de inicialização por ponto de entrada')
+    parser.add_argument('roles', nargs='*', metavar='papel',
+                        help=f"Papéis a medir: {', '.join(ROLES)} (padrão: todos)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=1.0,
+                        help='Tempo máximo aceitável em segundos')
+    parser.add_argument('--json', action='store_true', help='Saída em JSON')
+    args = parser.parse_args()
+    unknown = set(args.roles) - set(ROLES)
+    if unknown:
+        parser.error(f"papéis desconhecidos: {', '.join(sorted(unknown))}")
+
+    try:
+        results = benchmark(args.roles or list(ROLES), args.repeat)
+    except RuntimeError as e:
+        print(f"❌ Falha ao iniciar: {e}")
+        sys.exit(2)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'papel':<8} {'mediana (s)':>12} {'máx (s)':>9} {'RSS (MB)':>9} {'módulos':>8}  pesados")
+        for role, data in results.items():
+            heavy = ', '.join(data['heavy_modules']) or '-'
+            print(f"{role:<8} {data['seconds_median']:>12.3f} {data['seconds_max']:>9.3f} "
+                  f"{data['rss_mb_median']:>9.1f} {data['modules']:>8}  {heavy}")
+
+    slow = [role for role, data in results.items() if data['seconds_median'] > args.budget]
+    if slow:
+        print(f"❌ Acima de {args.budget:.1f}s: {', '.join(slow)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""
+Benchmark de replay de ticks do HUB Financeiro
+Gera um pregão sintético e mede ticks por segundo do agregador de barras intradiárias
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR))
+
+
+def synthetic_session(symbols, ticks, seed=42):
+    """Negócios de um pregão (10h às 17h) com preços em passeio aleatório log-normal"""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    session_start = 1_760_000_000 + 13 * 3600
+    per_symbol = ticks // symbols
+    session = {}
+    for i in range(symbols):
+        ts = np.sort(rng.uniform(session_start, session_start + 7 * 3600, per_symbol))
+        prices = rng.uniform(5, 100) * np.exp(np.cumsum(rng.normal(0, 3e-4, per_symbol)))
+        qtys = rng.integers(1, 100, per_symbol) * 100.0
+        session[f'SYM{i:04d}'] = (ts, prices.round(2), qtys)
+    return session
+
+
+def replay_ticks(aggregator, session):
+    """Um negócio por vez, intercalando ativos em ordem de tempo, como no feed"""
+    import numpy as np
+
+    symbols = np.concatenate([np.full(len(ts), name) for name, (ts, _, _) in session.items()])
+    ts = np.concatenate([data[0] for data in session.values()])
+    prices = np.concatenate([data[1] for data in session.values()])
+    qtys = np.concatenate([data[2] for data in session.values()])
+    order = np.argsort(ts, kind='stable')
+    trades = list(zip(symbols[order].tolist(), ts[order].tolist(), prices[order].tolist(), qtys[order].tolist()))
+
+    on_tick = aggregator.on_tick
+    started = time.perf_counter()
+    for symbol, moment, price, qty in trades:
+        on_tick(symbol, moment, price, qty)
+    return len(trades), time.perf_counter() - started
+
+
+def replay_batches(aggregator, session, batch_seconds):
+    """Lotes por ativo cobrindo batch_seconds de pregão cada"""
+    import numpy as np
+
+    batches = []
+    for symbol, (ts, prices, qtys) in session.items():
+        edges = np.searchsorted(ts, np.arange(ts[0], ts[-1] + batch_seconds, batch_seconds))
+        for begin, end in zip(edges[:-1], edges[1:]):
+            if end > begin:
+                batches.append((ts[begin], symbol, ts[begin:end], prices[begin:end], qtys[begin:end]))
+    batches.sort(key=lambda item: item[0])
+
+    total = sum(len(item[2]) for item in batches)
+    started = time.perf_counter()
+    for _, symbol, ts, prices, qtys in batches:
+        aggregator.on_ticks(symbol, ts, prices, qtys)
+    return total, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay sintético de ticks no agregador intradiário')
+    parser.add_argument('--symbols', type=int, default=50)
+    parser.add_argument('--ticks', type=int, default=1_000_000)
+    parser.add_argument('--batch-seconds', type=float, default=60.0,
+                        help='Janela de cada lote no modo vetorizado')
+    parser.add_argument('--json', action='store_true', help='Saída em JSON')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hub_financeiro.settings')
+    import django
+    django.setup()
+
+    from core.services.daytrading_service import TickAggregator
+
+    session = synthetic_session(args.symbols, args.ticks)
+    results = {}
+    for mode in ('tick', 'batch'):
+        aggregator = TickAggregator()
+        if mode == 'tick':
+            count, seconds = replay_ticks(aggregator, session)
+        else:
+            count, seconds = replay_batches(aggregator, session, args.batch_seconds)
+        results[mode] = {
+            'ticks': count,
+            'seconds': round(seconds, 3),
+            'ticks_per_second': round(count / seconds),
+            'bars_1m': sum(len(aggregator.bars(s, '1m')['start']) for s in aggregator.symbols()),
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"📈 {args.ticks:,} ticks sintéticos em {args.symbols} ativos")
+    for mode, data in results.items():
+        print(f"   {mode:<6} {data['ticks_per_second']:>12,} ticks/s  ({data['seconds']:.2f}s, "
+              f"{data['bars_1m']:,} barras de 1m)")
+
+
+if __name__ == '__main__':
+    main()
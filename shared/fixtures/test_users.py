@@ -0,0 +1,264 @@
+"""
+Dados sintéticos para testes e benchmarks do HUB Financeiro
+Gerador determinístico e vetorizado de usuários, carteiras, transações, alertas e cotações
+"""
+
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, List
+
+import numpy as np
+
+# Usuários fixos usados pelos testes funcionais
+TEST_USERS = [
+    {'username': 'investidor_conservador', 'email': 'conservador@hubfinanceiro.test', 'profile': 'conservador'},
+    {'username': 'investidor_moderado', 'email': 'moderado@hubfinanceiro.test', 'profile': 'moderado'},
+    {'username': 'investidor_arrojado', 'email': 'arrojado@hubfinanceiro.test', 'profile': 'arrojado'},
+    {'username': 'daytrader', 'email': 'daytrader@hubfinanceiro.test', 'profile': 'arrojado'},
+    {'username': 'admin_teste', 'email': 'admin@hubfinanceiro.test', 'profile': 'moderado', 'is_staff': True},
+]
+TEST_PASSWORD = 'senha-de-teste-123'
+
+# Volumes por escala; 'large' aproxima a base de produção
+SCALES = {
+    'small': {'users': 200, 'symbols': 60, 'years': 1, 'positions_per_user': 6, 'alerts_per_user': 2},
+    'medium': {'users': 10_000, 'symbols': 400, 'years': 5, 'positions_per_user': 10, 'alerts_per_user': 4},
+    'large': {'users': 100_000, 'symbols': 1_000, 'years': 10, 'positions_per_user': 12, 'alerts_per_user': 5},
+}
+
+SECTORS = (
+    'Financeiro', 'Energia', 'Materiais Básicos', 'Utilidade Pública', 'Consumo Cíclico',
+    'Consumo não Cíclico', 'Saúde', 'Tecnologia', 'Imobiliário', 'Telecomunicações',
+)
+PROFILES = ('conservador', 'moderado', 'arrojado')
+TRANSACTION_TYPES = ('buy', 'sell', 'dividend')
+ALERT_TYPES = ('above', 'below', 'percent_up', 'percent_down')
+
+EPOCH = date(2015, 1, 2)
+# Fim fixo do histórico de cotações: a mesma semente gera as mesmas séries em qualquer dia
+HISTORY_END = date(2025, 12, 30)
+
+
+def business_days(start: date, end: date) -> np.ndarray:
+    """Dias úteis (segunda a sexta) entre start e end, inclusive"""
+    days = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1)
+    return days[np.is_busday(days)]
+
+
+def generate_symbols(count: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    """Ativos fictícios no formato da B3 com setor, preço inicial e dividend yield"""
+    # Raízes de 4 letras sorteadas sem reposição: tickers sempre distintos
+    codes = rng.choice(26 ** 4, size=count, replace=False)
+    letters = (codes[:, None] // 26 ** np.arange(3, -1, -1)) % 26 + 65
+    roots = letters.astype(np.uint8).view('S4').ravel().astype(str)
+    symbols = np.char.add(roots, rng.choice(['3', '4', '11'], size=count, p=[0.6, 0.3, 0.1]))
+
+    return {
+        'symbol': symbols,
+        'sector': rng.choice(SECTORS, size=count),
+        'base_price': np.round(np.exp(rng.normal(3.0, 0.8, size=count)), 2),
+        'dividend_yield': np.round(np.clip(rng.gamma(2.0, 2.5, size=count), 0, 20), 2),
+        'volatility': np.clip(rng.normal(0.02, 0.007, size=count), 0.005, 0.06),
+    }
+
+
+def generate_users(count: int, rng: np.random.Generator, start_id: int = 1) -> Dict[str, np.ndarray]:
+    ids = np.arange(start_id, start_id + count)
+    return {
+        'id': ids,
+        'username': np.char.add('usuario_', ids.astype(str)),
+        'email': np.char.add(np.char.add('usuario_', ids.astype(str)), '@hubfinanceiro.test'),
+        'profile': rng.choice(PROFILES, size=count, p=[0.45, 0.4, 0.15]),
+        'date_joined': np.datetime64(EPOCH) + rng.integers(0, 3000, size=count).astype('timedelta64[D]'),
+    }
+
+
+def generate_ohlcv(symbols: Dict[str, np.ndarray], years: int, rng: np.random.Generator,
+                   end: date = None) -> Dict[str, np.ndarray]:
+    """
+    Cotações diárias em matrizes ativo×dia (float32). Fechamentos seguem um
+    passeio aleatório log-normal; máximas e mínimas envolvem abertura e fechamento.
+    """
+    end = end or HISTORY_END
+    dates = business_days(end - timedelta(days=365 * years), end)
+    n_symbols, n_days = len(symbols['symbol']), len(dates)
+
+    returns = rng.normal(0.0003, 1.0, size=(n_symbols, n_days)) * symbols['volatility'][:, None]
+    close = symbols['base_price'][:, None] * np.exp(np.cumsum(returns, axis=1))
+    gap = rng.normal(0, 0.3, size=(n_symbols, n_days)) * symbols['volatility'][:, None]
+    open_ = np.concatenate([symbols['base_price'][:, None], close[:, :-1]], axis=1) * np.exp(gap)
+    spread = np.abs(rng.normal(0, 0.6, size=(n_symbols, n_days))) * symbols['volatility'][:, None]
+    high = np.maximum(open_, close) * (1 + spread)
+    low = np.minimum(open_, close) * (1 - spread)
+    volume = rng.lognormal(13, 1.0, size=(n_symbols, n_days)).round(-2)
+
+    return {
+        'dates': dates,
+        'open': open_.astype(np.float32).round(2),
+        'high': high.astype(np.float32).round(2),
+        'low': low.astype(np.float32).round(2),
+        'close': close.astype(np.float32).round(2),
+        'volume': volume.astype(np.int64),
+    }
+
+
+def generate_portfolios(users: Dict[str, np.ndarray], symbols: Dict[str, np.ndarray], last_close: np.ndarray,
+                        positions_per_user: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    """Posições por usuário (uma linha por posição, sem ativos repetidos por usuário)"""
+    n_symbols = len(symbols['symbol'])
+    counts = rng.poisson(positions_per_user, size=len(users['id'])) + 1
+    # Sorteio com reposição e deduplicação pela chave usuário×ativo
+    keys = np.repeat(users['id'], counts) * n_symbols + rng.integers(0, n_symbols, size=counts.sum())
+    keys = np.unique(keys)
+    owners, picks = keys // n_symbols, keys % n_symbols
+    quantity = (rng.integers(1, 50, size=len(owners)) * 100).astype(np.float64)
+    average_price = np.round(last_close[picks] * rng.uniform(0.7, 1.3, size=len(owners)), 2)
+    return {'user_id': owners, 'symbol_index': picks, 'quantity': quantity, 'average_price': average_price}
+
+
+def generate_transactions(portfolios: Dict[str, np.ndarray], ohlcv: Dict[str, np.ndarray],
+                          rng: np.random.Generator, per_position: float = 6.0) -> Dict[str, np.ndarray]:
+    """Compras, vendas e proventos distribuídos ao longo do histórico de cotações"""
+    counts = rng.poisson(per_position, size=len(portfolios['user_id'])) + 1
+    rows = np.repeat(np.arange(len(portfolios['user_id'])), counts)
+    day_index = rng.integers(0, len(ohlcv['dates']), size=len(rows))
+    symbol_index = portfolios['symbol_index'][rows]
+    kind = rng.choice(len(TRANSACTION_TYPES), size=len(rows), p=[0.6, 0.15, 0.25])
+    price = ohlcv['close'][symbol_index, day_index].astype(np.float64)
+
+    order = np.lexsort((day_index, portfolios['user_id'][rows]))
+    return {
+        'user_id': portfolios['user_id'][rows][order],
+        'symbol_index': symbol_index[order],
+        'date': ohlcv['dates'][day_index][order],
+        'type': np.array(TRANSACTION_TYPES)[kind][order],
+        'quantity': (rng.integers(1, 20, size=len(rows)) * 100).astype(np.float64)[order],
+        'price': np.round(price, 2)[order],
+    }
+
+
+def generate_alerts(users: Dict[str, np.ndarray], symbols: Dict[str, np.ndarray], last_close: np.ndarray,
+                    alerts_per_user: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    counts = rng.poisson(alerts_per_user, size=len(users['id']))
+    owners = np.repeat(users['id'], counts)
+    picks = rng.integers(0, len(symbols['symbol']), size=len(owners))
+    kind = rng.choice(ALERT_TYPES, size=len(owners))
+    distance = rng.uniform(0.01, 0.15, size=len(owners))
+    reference = last_close[picks].astype(np.float64)
+    value = np.where(kind == 'above', reference * (1 + distance),
+                     np.where(kind == 'below', reference * (1 - distance), distance * 100))
+    return {
+        'id': np.arange(1, len(owners) + 1),
+        'user_id': owners,
+        'symbol_index': picks,
+        'alert_type': kind,
+        'value': np.round(value, 2),
+        'reference_price': np.round(reference, 2),
+    }
+
+
+def generate_fundamentals(symbols: Dict[str, np.ndarray], rng: np.random.Generator) -> List[dict]:
+    """Registros no formato aceito por MetricMatrix.bulk_upsert, com ~5% de ausências"""
+    n = len(symbols['symbol'])
+    columns = {
+        'pe': rng.lognormal(2.3, 0.6, n),
+        'pvp': rng.lognormal(0.2, 0.6, n),
+        'dy': symbols['dividend_yield'],
+        'roe': rng.normal(14, 8, n),
+        'net_margin': rng.normal(12, 9, n),
+        'debt_equity': rng.lognormal(-0.3, 0.7, n),
+        'net_debt_ebitda': rng.normal(1.8, 1.2, n),
+    }
+    missing = rng.random((n, len(columns))) < 0.05
+    records = []
+    for i in range(n):
+        metrics = {
+            name: (None if missing[i, j] else round(float(values[i]), 4))
+            for j, (name, values) in enumerate(columns.items())
+        }
+        records.append({'symbol': str(symbols['symbol'][i]), 'sector': str(symbols['sector'][i]), **metrics})
+    return records
+
+
+def generate_dividends(symbols: Dict[str, np.ndarray], last_close: np.ndarray, years: int,
+                       rng: np.random.Generator, today: date = None) -> List[dict]:
+    """Histórico de proventos trimestrais coerente com o dividend yield de cada ativo"""
+    today = today or date.today()
+    events = []
+    quarters = years * 4
+    payers = np.flatnonzero(symbols['dividend_yield'] > 0.5)
+    offsets = rng.integers(0, 90, size=len(payers))
+    for i, offset in zip(payers, offsets):
+        amount = last_close[i] * symbols['dividend_yield'][i] / 100 / 4
+        for q in range(quarters):
+            ex_date = today - timedelta(days=int(91 * (q + 1) - offset))
+            events.append({
+                'symbol': str(symbols['symbol'][i]),
+                'ex_date': ex_date,
+                'pay_date': ex_date + timedelta(days=15),
+                'amount': round(float(amount * rng.uniform(0.8, 1.2)), 4),
+            })
+    return events
+
+
+@dataclass
+class SyntheticDataset:
+    """Base sintética completa, reproduzível a partir de (escala, semente)"""
+
+    scale: str
+    seed: int
+    symbols: Dict[str, np.ndarray] = field(repr=False)
+    users: Dict[str, np.ndarray] = field(repr=False)
+    ohlcv: Dict[str, np.ndarray] = field(repr=False)
+    portfolios: Dict[str, np.ndarray] = field(repr=False)
+    transactions: Dict[str, np.ndarray] = field(repr=False)
+    alerts: Dict[str, np.ndarray] = field(repr=False)
+
+    @classmethod
+    def build(cls, scale: str = 'small', seed: int = 42, **overrides) -> 'SyntheticDataset':
+        params = {**SCALES[scale], **overrides}
+        rng = np.random.default_rng(seed)
+        symbols = generate_symbols(params['symbols'], rng)
+        users = generate_users(params['users'], rng)
+        ohlcv = generate_ohlcv(symbols, params['years'], rng)
+        last_close = ohlcv['close'][:, -1]
+        portfolios = generate_portfolios(users, symbols, last_close, params['positions_per_user'], rng)
+        transactions = generate_transactions(portfolios, ohlcv, rng)
+        alerts = generate_alerts(users, symbols, last_close, params['alerts_per_user'], rng)
+        return cls(scale, seed, symbols, users, ohlcv, portfolios, transactions, alerts)
+
+    @property
+    def last_close(self) -> np.ndarray:
+        return self.ohlcv['close'][:, -1]
+
+    def fundamentals(self) -> List[dict]:
+        return generate_fundamentals(self.symbols, np.random.default_rng(self.seed + 1))
+
+    def dividends(self) -> List[dict]:
+        years = min(SCALES[self.scale]['years'], 3)
+        return generate_dividends(self.symbols, self.last_close, years, np.random.default_rng(self.seed + 2))
+
+    def holdings(self, user_id: int) -> Dict[str, float]:
+        rows = np.flatnonzero(self.portfolios['user_id'] == user_id)
+        return {
+            str(self.symbols['symbol'][self.portfolios['symbol_index'][r]]): float(self.portfolios['quantity'][r])
+            for r in rows
+        }
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            'symbols': len(self.symbols['symbol']),
+            'users': len(self.users['id']),
+            'bars': int(self.ohlcv['close'].size),
+            'positions': len(self.portfolios['user_id']),
+            'transactions': len(self.transactions['user_id']),
+            'alerts': len(self.alerts['id']),
+        }
+
+    def save(self, path: str):
+        """Salva todas as tabelas em um único .npz (uso offline, sem banco)"""
+        arrays = {}
+        for table in ('symbols', 'users', 'ohlcv', 'portfolios', 'transactions', 'alerts'):
+            for name, values in getattr(self, table).items():
+                arrays[f'{table}/{name}'] = values
+        np.savez_compressed(path, **arrays)
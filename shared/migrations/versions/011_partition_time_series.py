@@ -0,0 +1,162 @@
+"""Particionamento mensal de séries temporais e tabelas de rollup
+
+Converte transactions, trading_signals e news_articles em tabelas
+particionadas por mês, cria intraday_bars já particionada e os rollups
+diários de barras e sinais.
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19
+"""
+from datetime import date
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+# Tabela existente -> coluna de particionamento e índices recriados na tabela pai
+CONVERTED_TABLES = {
+    'transactions': {
+        'column': 'date',
+        'indexes': {
+            'ix_transactions_user_date': ('user_id', 'date'),
+        },
+    },
+    'trading_signals': {
+        'column': 'created_at',
+        'indexes': {
+            'ix_trading_signals_symbol_created': ('symbol', 'created_at'),
+        },
+    },
+    'news_articles': {
+        'column': 'published_at',
+        'indexes': {
+            'ix_news_articles_published': ('published_at',),
+        },
+    },
+}
+
+MONTHS_AHEAD = 3
+
+
+def _add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_partitions(table, first_month):
+    """Partições mensais de first_month até MONTHS_AHEAD meses à frente, mais a DEFAULT"""
+    last_month = _add_months(date.today().replace(day=1), MONTHS_AHEAD)
+    month = first_month
+    while month <= last_month:
+        op.execute(
+            f"CREATE TABLE {table}_p{month:%Y%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+
+def _move_sequence(bind, source, target):
+    """Transfere a sequência do id para a nova tabela antes de apagar a antiga"""
+    sequence = bind.execute(sa.text(f"SELECT pg_get_serial_sequence('{source}', 'id')")).scalar()
+    if sequence:
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {target}.id")
+
+
+def upgrade():
+    bind = op.get_bind()
+    op.execute("CREATE SCHEMA IF NOT EXISTS archive")
+
+    for table, spec in CONVERTED_TABLES.items():
+        column = spec['column']
+        legacy = f'{table}_legacy'
+
+        op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+        op.execute(
+            f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            f"PARTITION BY RANGE ({column})"
+        )
+        # A chave primária de uma tabela particionada precisa conter a coluna de partição
+        op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, {column})")
+
+        oldest = bind.execute(sa.text(f"SELECT min({column})::date FROM {legacy}")).scalar()
+        _create_partitions(table, (oldest or date.today()).replace(day=1))
+
+        op.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+        _move_sequence(bind, legacy, table)
+        op.execute(f"DROP TABLE {legacy}")
+
+        # Índices criados depois da cópia, propagados para cada partição
+        for name, columns in spec['indexes'].items():
+            op.execute(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})")
+
+    # Barras intradiárias de 1 minuto
+    op.execute(
+        """
+        CREATE TABLE intraday_bars (
+            id BIGSERIAL,
+            symbol VARCHAR(20) NOT NULL,
+            "timestamp" TIMESTAMPTZ NOT NULL,
+            open NUMERIC(18, 6) NOT NULL,
+            high NUMERIC(18, 6) NOT NULL,
+            low NUMERIC(18, 6) NOT NULL,
+            close NUMERIC(18, 6) NOT NULL,
+            volume BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (id, "timestamp")
+        ) PARTITION BY RANGE ("timestamp")
+        """
+    )
+    _create_partitions('intraday_bars', date.today().replace(day=1))
+    op.execute('CREATE INDEX ix_intraday_bars_symbol_timestamp ON intraday_bars (symbol, "timestamp")')
+
+    op.create_table(
+        'intraday_bars_daily',
+        sa.Column('symbol', sa.String(20), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('open', sa.Numeric(18, 6), nullable=False),
+        sa.Column('high', sa.Numeric(18, 6), nullable=False),
+        sa.Column('low', sa.Numeric(18, 6), nullable=False),
+        sa.Column('close', sa.Numeric(18, 6), nullable=False),
+        sa.Column('volume', sa.BigInteger(), nullable=False),
+        sa.Column('bars', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('symbol', 'date'),
+    )
+    op.create_table(
+        'trading_signals_daily',
+        sa.Column('symbol', sa.String(20), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('signal_type', sa.String(20), nullable=False),
+        sa.Column('signals', sa.Integer(), nullable=False),
+        sa.Column('avg_confidence', sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint('symbol', 'date', 'signal_type'),
+    )
+    op.create_index('ix_trading_signals_daily_date', 'trading_signals_daily', ['date'])
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    op.drop_index('ix_trading_signals_daily_date', table_name='trading_signals_daily')
+    op.drop_table('trading_signals_daily')
+    op.drop_table('intraday_bars_daily')
+    op.execute("DROP TABLE intraday_bars")
+
+    for table, spec in CONVERTED_TABLES.items():
+        plain = f'{table}_plain'
+
+        op.execute(f"CREATE TABLE {plain} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        op.execute(f"INSERT INTO {plain} SELECT * FROM {table}")
+        _move_sequence(bind, table, plain)
+        op.execute(f"DROP TABLE {table}")
+        op.execute(f"ALTER TABLE {plain} RENAME TO {table}")
+        op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id)")
+
+        for name, columns in spec['indexes'].items():
+            op.execute(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})")
+
+    # Partições já movidas para o arquivo permanecem lá como tabelas comuns
@@ -0,0 +1,38 @@
+"""Chave única (symbol, "timestamp") em intraday_bars
+
+O flush do day trade grava as barras com INSERT ... ON CONFLICT (symbol,
+"timestamp") DO UPDATE, que exige um índice único nessas colunas. Como o
+índice contém a coluna de particionamento, ele pode ser criado na tabela
+pai e é propagado para cada partição.
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Barras regravadas antes da chave única: mantém a de maior id de cada minuto
+    op.execute(
+        """
+        DELETE FROM intraday_bars AS bar
+        USING intraday_bars AS newer
+        WHERE bar.symbol = newer.symbol
+          AND bar."timestamp" = newer."timestamp"
+          AND bar.id < newer.id
+        """
+    )
+    op.execute('CREATE UNIQUE INDEX ux_intraday_bars_symbol_timestamp ON intraday_bars (symbol, "timestamp")')
+    # O índice único atende às mesmas consultas do índice comum criado na 011
+    op.execute('DROP INDEX ix_intraday_bars_symbol_timestamp')
+
+
+def downgrade():
+    op.execute('CREATE INDEX ix_intraday_bars_symbol_timestamp ON intraday_bars (symbol, "timestamp")')
+    op.execute('DROP INDEX ux_intraday_bars_symbol_timestamp')
@@ -0,0 +1,34 @@
+"""Geração dos tokens JWT por usuário
+
+revoke_user_tokens grava aqui a geração a partir da qual os tokens do usuário
+valem. O Redis guarda só uma cópia para acelerar a verificação: uma chave
+despejada ou um FLUSHALL volta a ler a geração do banco, em vez de reabilitar
+os tokens revogados.
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Sem chave estrangeira: a tabela de usuários depende de AUTH_USER_MODEL
+    op.execute(
+        """
+        CREATE TABLE auth_token_generations (
+            user_id bigint PRIMARY KEY,
+            generation bigint NOT NULL,
+            updated_at timestamptz NOT NULL DEFAULT now()
+        )
+        """
+    )
+
+
+def downgrade():
+    op.execute('DROP TABLE auth_token_generations')
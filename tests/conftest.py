@@ -0,0 +1,123 @@
+"""
+Configuração global dos testes do HUB Financeiro
+Settings mínimos em memória (SQLite, cache local, Celery síncrono) sem Redis nem Postgres
+"""
+
+import sys
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# O celery.py da raiz do projeto não pode sombrear o pacote celery instalado:
+# a raiz sai do início do sys.path e volta no fim, só para os imports de core/platforms
+sys.path[:] = [entry for entry in sys.path if Path(entry or '.').resolve() != BASE_DIR]
+sys.path.append(str(BASE_DIR))
+
+
+def pytest_configure(config):
+    from django.conf import settings
+
+    if settings.configured:
+        return
+
+    data_dir = Path(tempfile.mkdtemp(prefix='hub_tests_'))
+
+    settings.configure(
+        DEBUG=False,
+        BASE_DIR=BASE_DIR,
+        SECRET_KEY='hub-financeiro-testes',
+        ALLOWED_HOSTS=['testserver', 'localhost'],
+        INSTALLED_APPS=[
+            'django.contrib.contenttypes',
+            'django.contrib.auth',
+            'rest_framework',
+            'rest_framework.authtoken',
+            'core',
+        ],
+        DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                            'OPTIONS': {'MAX_ENTRIES': 1_000_000}}},
+        ROOT_URLCONF='platforms.web.api.urls',
+        MIDDLEWARE=[],
+        PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+        DEFAULT_AUTO_FIELD='django.db.models.BigAutoField',
+        TIME_ZONE='America/Sao_Paulo',
+        USE_TZ=True,
+        REST_FRAMEWORK={
+            'DEFAULT_AUTHENTICATION_CLASSES': [
+                'core.utils.security.CachedJWTAuthentication',
+                'rest_framework.authentication.TokenAuthentication',
+            ],
+            'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.IsAuthenticated'],
+            'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+            'UNAUTHENTICATED_USER': None,
+        },
+        SIMPLE_JWT={
+            'ACCESS_TOKEN_LIFETIME': timedelta(minutes=15),
+            'REFRESH_TOKEN_LIFETIME': timedelta(days=30),
+            'SIGNING_KEY': 'hub-financeiro-chave-de-assinatura-dos-testes',
+            'UPDATE_LAST_LOGIN': False,
+        },
+        BIOMETRIC_REFRESH_LIFETIME=timedelta(days=90),
+        AUTH_SNAPSHOT_TTL=900,
+        AUTH_LOCAL_CACHE_SECONDS=5,
+        ANALYTICS_DATA_DIR=data_dir,
+        FUNDAMENTAL_MATRIX_PATH=data_dir / 'fundamental_matrix.npz',
+        FOREX_HISTORY_PATH=data_dir / 'forex_rates.npz',
+        FOREX_PIVOT_CURRENCY='USD',
+        FOREX_CURRENCIES=['USD', 'BRL', 'EUR', 'GBP', 'JPY', 'CHF', 'CAD', 'AUD', 'CNY', 'ARS'],
+        FOREX_CHECK_PAIRS=[('EUR', 'BRL')],
+        PORTFOLIO_CURRENCY='BRL',
+        ALPHA_VANTAGE_API_KEY='teste',
+        FINANCIAL_MODELING_PREP_API_KEY='teste',
+        BACKUP_DIR=data_dir / 'backups',
+        BACKUP_RETENTION_DAYS=30,
+        BACKUP_JOBS=1,
+        METRICS_AUTH_TOKEN='',
+        PROFILING_ENABLED=False,
+        PROFILING_SAMPLE_RATE=1.0,
+        CELERY_TASK_ALWAYS_EAGER=True,
+        CELERY_TASK_EAGER_PROPAGATES=True,
+    )
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker):
+    """Tabelas criadas pelas migrações do Alembic que o código de autenticação usa"""
+    from django.db import connection
+
+    with django_db_blocker.unblock(), connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE TABLE auth_token_generations ("
+            "user_id bigint PRIMARY KEY, generation bigint NOT NULL, updated_at timestamp NOT NULL)"
+        )
+
+
+@pytest.fixture
+def eager_celery():
+    """Tarefas Celery executadas na própria thread, com exceções propagadas"""
+    from celery import current_app
+
+    previous = current_app.conf.task_always_eager, current_app.conf.task_eager_propagates
+    current_app.conf.task_always_eager = True
+    current_app.conf.task_eager_propagates = True
+    yield current_app
+    current_app.conf.task_always_eager, current_app.conf.task_eager_propagates = previous
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    """Cada teste começa com o cache compartilhado e o L1 de autenticação vazios"""
+    from django.core.cache import cache
+
+    from core.utils.security import auth_cache
+
+    cache.clear()
+    auth_cache.clear_local()
+    yield
+    cache.clear()
+    auth_cache.clear_local()
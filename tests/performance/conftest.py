@@ -0,0 +1,215 @@
+"""
+Configuração dos benchmarks de performance do HUB Financeiro
+Base sintética, substitutos locais de Redis e provedores e relatório JSON com percentis
+"""
+
+import json
+import os
+import platform
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+RESULTS_DIR = Path(__file__).parent / 'results'
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'performance: benchmark com resultado gravado no relatório JSON')
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+class BenchmarkRecorder:
+    """Mede cenários e acumula latências (p50/p95/p99) e vazão para o relatório JSON"""
+
+    def __init__(self, metadata):
+        self.metadata = metadata
+        self.results = {}
+
+    def measure(self, name, func, iterations=200, warmup=10, items=1):
+        """Executa func repetidamente; items é quantos itens cada chamada processa"""
+        for _ in range(warmup):
+            func()
+        samples = np.empty(iterations)
+        for i in range(iterations):
+            started = time.perf_counter()
+            func()
+            samples[i] = time.perf_counter() - started
+        return self.record(name, samples, items=items)
+
+    def measure_concurrent(self, name, func, threads=8, iterations=200, items=1):
+        """Executa func em várias threads; a vazão considera o tempo de parede total"""
+        def run(_):
+            started = time.perf_counter()
+            func()
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            samples = list(executor.map(run, range(iterations)))
+        wall = time.perf_counter() - started
+        result = self.record(name, samples, items=items, wall_seconds=wall)
+        result['threads'] = threads
+        return result
+
+    def record(self, name, samples, items=1, wall_seconds=None):
+        samples = np.asarray(samples, dtype=np.float64)
+        elapsed = wall_seconds if wall_seconds is not None else float(samples.sum())
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1000
+        result = {
+            'iterations': int(len(samples)),
+            'items_per_iteration': items,
+            'p50_ms': round(float(p50), 4),
+            'p95_ms': round(float(p95), 4),
+            'p99_ms': round(float(p99), 4),
+            'mean_ms': round(float(samples.mean() * 1000), 4),
+            'max_ms': round(float(samples.max() * 1000), 4),
+            'throughput_per_s': round(items * len(samples) / elapsed, 2) if elapsed else None,
+        }
+        self.results[name] = result
+        return result
+
+    def write(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        report = {'metadata': self.metadata, 'results': dict(sorted(self.results.items()))}
+        path.write_text(json.dumps(report, indent=2), encoding='utf-8')
+        return path
+
+
+class ProviderSession:
+    """
+    Substituto local de requests.Session para os provedores de mercado:
+    respostas determinísticas no formato das APIs, sem acesso à rede.
+    """
+
+    def __init__(self, seed=7):
+        self.rng = np.random.default_rng(seed)
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        params = params or {}
+        if params.get('function') == 'CURRENCY_EXCHANGE_RATE':
+            rate = float(self.rng.uniform(0.5, 6.0))
+            payload = {'Realtime Currency Exchange Rate': {
+                '1. From_Currency Code': params.get('from_currency'),
+                '3. To_Currency Code': params.get('to_currency'),
+                '5. Exchange Rate': f'{rate:.6f}',
+            }}
+        else:
+            payload = [{
+                'peRatioTTM': float(self.rng.lognormal(2.3, 0.5)),
+                'priceToBookRatioTTM': float(self.rng.lognormal(0.2, 0.5)),
+                'dividendYieldPercentageTTM': float(self.rng.gamma(2.0, 2.5)),
+                'returnOnEquityTTM': float(self.rng.normal(0.14, 0.08)),
+                'netProfitMarginTTM': float(self.rng.normal(0.12, 0.09)),
+                'debtEquityRatioTTM': float(self.rng.lognormal(-0.3, 0.6)),
+            }]
+        return _ProviderResponse(payload)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _ProviderResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+
+@pytest.fixture(scope='session', autouse=True)
+def offline_environment(tmp_path_factory):
+    """Cache em memória no lugar do Redis, tarefas Celery síncronas e arquivos em diretório temporário"""
+    from celery import current_app
+    from django.test import override_settings
+
+    data_dir = tmp_path_factory.mktemp('analytics')
+    overrides = override_settings(
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                            'OPTIONS': {'MAX_ENTRIES': 1_000_000}}},
+        SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies',
+        ANALYTICS_DATA_DIR=data_dir,
+        FUNDAMENTAL_MATRIX_PATH=data_dir / 'fundamental_matrix.npz',
+        FOREX_HISTORY_PATH=data_dir / 'forex_rates.npz',
+        BACKUP_DIR=tmp_path_factory.mktemp('backups'),
+        PROFILING_ENABLED=False,
+    )
+    overrides.enable()
+    previous = current_app.conf.task_always_eager, current_app.conf.task_eager_propagates
+    current_app.conf.task_always_eager = True
+    current_app.conf.task_eager_propagates = True
+    yield data_dir
+    current_app.conf.task_always_eager, current_app.conf.task_eager_propagates = previous
+    overrides.disable()
+
+
+@pytest.fixture(scope='session')
+def dataset():
+    """Base sintética; escala e semente via BENCHMARK_SCALE e BENCHMARK_SEED"""
+    from shared.fixtures.test_users import SyntheticDataset
+
+    return SyntheticDataset.build(
+        os.environ.get('BENCHMARK_SCALE', 'small'),
+        seed=int(os.environ.get('BENCHMARK_SEED', 42)),
+    )
+
+
+@pytest.fixture(scope='session')
+def bench(dataset):
+    """Registrador compartilhado; o JSON é gravado ao fim da sessão"""
+    recorder = BenchmarkRecorder({
+        'commit': _git_commit(),
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'scale': dataset.scale,
+        'seed': dataset.seed,
+        'dataset': dataset.counts(),
+    })
+    yield recorder
+    output = os.environ.get('BENCHMARK_OUTPUT') or RESULTS_DIR / f"{recorder.metadata['commit']}.json"
+    recorder.write(output)
+
+
+@pytest.fixture
+def provider_session():
+    return ProviderSession()
+
+
+@pytest.fixture
+def api_client():
+    """Cliente da API autenticado sem banco: o usuário não é persistido"""
+    from django.contrib.auth import get_user_model
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(user=get_user_model()(id=1, username='usuario_1'))
+    return client
@@ -0,0 +1,62 @@
+"""
+Benchmarks de análise fundamentalista do HUB Financeiro
+Job diário da matriz, screening em memória e rota de screening da API
+"""
+
+import pytest
+
+from core.services.fundamentalist_analyzer_service import MetricMatrix, fundamentalist_analyzer, parse_filters
+
+pytestmark = pytest.mark.performance
+
+
+@pytest.fixture(scope='module')
+def records(dataset):
+    return dataset.fundamentals()
+
+
+@pytest.fixture(scope='module')
+def matrix(records):
+    matrix = MetricMatrix()
+    matrix.bulk_upsert(records)
+    return matrix
+
+
+def test_daily_analysis_job(bench, records):
+    """Kernel de run_daily_analysis: reconstrução da matriz e dos percentis setoriais"""
+    def rebuild():
+        MetricMatrix().bulk_upsert(records)
+
+    result = bench.measure('beat.run_daily_analysis', rebuild, iterations=30, warmup=2, items=len(records))
+    assert result['throughput_per_s'] > 0
+
+
+def test_incremental_update(bench, matrix, records):
+    """Atualização de um único ativo recalcula só o setor afetado"""
+    record = dict(records[0], dy=7.5)
+    bench.measure('analysis.incremental_update', lambda: matrix.bulk_upsert([record]), iterations=300)
+    assert matrix.get(record['symbol'])['dy'] == 7.5
+
+
+@pytest.mark.parametrize('query', [
+    {'dy__gt': '6'},
+    {'dy__gt': '4', 'pvp__lt': '1.5', 'roe__gte': '10'},
+])
+def test_screener(bench, matrix, query):
+    filters = parse_filters(query)
+    name = 'analysis.screen[' + ','.join(sorted(query)) + ']'
+    bench.measure(name, lambda: matrix.screen(filters=filters, order_by='roe', limit=50), iterations=500)
+    results = matrix.screen(filters=filters, order_by='roe', limit=50)
+    assert all(row['dy'] > float(query['dy__gt']) for row in results)
+
+
+def test_screener_api(bench, api_client, records):
+    fundamentalist_analyzer.update(records)
+    params = {'dy__gt': 5, 'order': '-roe', 'limit': 20}
+    assert api_client.get('/api/v1/analysis/screener/', params).status_code == 200
+
+    bench.measure('api.analysis.screener', lambda: api_client.get('/api/v1/analysis/screener/', params),
+                  iterations=300)
+    symbol = records[0]['symbol']
+    bench.measure('api.analysis.fundamentals', lambda: api_client.get(f'/api/v1/analysis/fundamentals/{symbol}/'),
+                  iterations=300)
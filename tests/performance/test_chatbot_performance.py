@@ -0,0 +1,69 @@
+"""
+Benchmarks do chatbot do HUB Financeiro
+Autenticação por mensagem e consultas de dados usadas nas respostas, sem o modelo de linguagem
+"""
+
+import numpy as np
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+from core.services import forex_service as forex_module
+from core.services.forex_service import forex_service, update_forex_rates
+from core.services.fundamentalist_analyzer_service import fundamentalist_analyzer
+from core.utils.security import CachedJWTAuthentication, issue_tokens, prime_user_snapshot
+
+pytestmark = pytest.mark.performance
+
+MESSAGES = 2_000
+
+
+@pytest.fixture
+def access_tokens(django_user_model):
+    """Um token de acesso por usuário, como enviados pelo app a cada mensagem"""
+    tokens = []
+    for number in range(1, 51):
+        user = django_user_model.objects.create_user(username=f'usuario_{number}', password='senha-forte-123')
+        prime_user_snapshot(user)
+        tokens.append(issue_tokens(user)['access'])
+    return tokens
+
+
+@pytest.mark.django_db
+def test_message_authentication(bench, access_tokens):
+    """Cada mensagem do chatbot é autenticada por JWT sem consultar o banco"""
+    authenticator = CachedJWTAuthentication()
+    factory = APIRequestFactory()
+    requests = [
+        factory.post('/api/v1/chatbot/message/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        for token in access_tokens
+    ]
+
+    def authenticate_all():
+        for request in requests:
+            authenticator.authenticate(request)
+
+    with CaptureQueriesContext(connection) as queries:
+        bench.measure('chatbot.authenticate_message', authenticate_all, iterations=50, items=len(requests))
+    assert len(queries) == 0
+
+
+def test_answer_lookups(bench, dataset, monkeypatch, provider_session):
+    """Indicadores de um ativo e conversão de moeda, as consultas mais comuns nas respostas"""
+    monkeypatch.setattr(forex_module.requests, 'Session', lambda: provider_session)
+    update_forex_rates()
+    fundamentalist_analyzer.update(dataset.fundamentals())
+
+    rng = np.random.default_rng(9)
+    symbols = rng.choice(dataset.symbols['symbol'], MESSAGES).tolist()
+    amounts = rng.uniform(100, 50_000, MESSAGES).tolist()
+
+    def answer_all():
+        for symbol, amount in zip(symbols, amounts):
+            fundamentalist_analyzer.get_asset(symbol)
+            forex_service.convert(amount, 'USD', 'BRL')
+
+    bench.measure('chatbot.answer_lookups', answer_all, iterations=20, warmup=1, items=MESSAGES)
+    assert fundamentalist_analyzer.get_asset(symbols[0]) is not None
+    assert forex_service.convert(100, 'USD', 'BRL') > 0
@@ -0,0 +1,63 @@
+"""
+Benchmarks de câmbio do HUB Financeiro
+Job de atualização com provedor local, consultas as-of e conversões em lote
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from core.services import forex_service as forex_module
+from core.services.forex_service import ForexRateHistory, forex_service, update_forex_rates
+
+pytestmark = pytest.mark.performance
+
+CURRENCIES = ['USD', 'BRL', 'EUR', 'GBP', 'JPY', 'CHF', 'CAD', 'AUD', 'CNY', 'ARS']
+
+
+@pytest.fixture(scope='module')
+def history():
+    """Um ano de observações de hora em hora"""
+    rng = np.random.default_rng(3)
+    history = ForexRateHistory(CURRENCIES, pivot='USD')
+    base = rng.uniform(0.5, 6.0, len(CURRENCIES) - 1)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for hour in range(24 * 365):
+        drift = np.exp(rng.normal(0, 0.001, len(base)))
+        base = base * drift
+        history.append(dict(zip(CURRENCIES[1:], base.tolist())), at=start + timedelta(hours=hour))
+    return history
+
+
+def test_update_job(bench, monkeypatch, provider_session):
+    """update_forex_rates completo com o provedor substituído"""
+    monkeypatch.setattr(forex_module.requests, 'Session', lambda: provider_session)
+    assert update_forex_rates()['updated'] > 0
+    bench.measure('beat.update_forex_rates', update_forex_rates, iterations=50, warmup=2)
+
+
+def test_as_of_lookup(bench, history):
+    moment = datetime(2025, 7, 1, 12, 30, tzinfo=timezone.utc)
+    bench.measure('forex.rate_as_of', lambda: history.rate('EUR', 'BRL', at=moment), iterations=2000)
+    bench.measure('forex.cross_matrix', lambda: history.matrix(moment), iterations=2000)
+    assert history.rate('EUR', 'BRL', at=moment) > 0
+
+
+def test_convert_many(bench, history):
+    rng = np.random.default_rng(4)
+    amounts = rng.uniform(10, 10_000, 5_000)
+    sources = rng.choice(CURRENCIES, 5_000).tolist()
+    bench.measure('forex.convert_many', lambda: history.convert_many(amounts, sources, 'BRL'),
+                  iterations=300, items=len(amounts))
+
+
+def test_forex_api(bench, api_client, monkeypatch, provider_session):
+    monkeypatch.setattr(forex_module.requests, 'Session', lambda: provider_session)
+    update_forex_rates()
+    assert forex_service.history().rate('USD', 'BRL') is not None
+
+    params = {'amount': 1500, 'from': 'EUR', 'to': 'BRL'}
+    assert api_client.get('/api/v1/forex/convert/', params).status_code == 200
+    bench.measure('api.forex.convert', lambda: api_client.get('/api/v1/forex/convert/', params), iterations=300)
+    bench.measure('api.forex.list', lambda: api_client.get('/api/v1/forex/'), iterations=300)
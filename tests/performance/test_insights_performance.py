@@ -0,0 +1,84 @@
+"""
+Benchmarks de insights do HUB Financeiro
+Projeção de proventos, candidatos de recomendação e insights diários por usuário
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from core.services import recommendation_service as recommendation_module
+from core.services.ai_service import build_insights
+from core.services.fundamentalist_analyzer_service import fundamentalist_analyzer
+from core.services.recommendation_service import recommendation_service
+from core.utils.dividend_calculator import DividendCalendar, project_events, project_income
+
+pytestmark = pytest.mark.performance
+
+
+@pytest.fixture(scope='module')
+def calendar(dataset):
+    history = dataset.dividends()
+    today = date.today()
+    return DividendCalendar(history + project_events(history, until=today + timedelta(days=400), today=today))
+
+
+def test_dividend_calendar(bench, dataset):
+    """Montagem do calendário com projeção por ativo"""
+    history = dataset.dividends()
+    today = date.today()
+
+    def build():
+        DividendCalendar(history + project_events(history, until=today + timedelta(days=400), today=today))
+
+    bench.measure('dividends.build_calendar', build, iterations=10, warmup=1, items=len(history))
+
+
+def test_project_income(bench, dataset, calendar):
+    """Kernel de analyze_upcoming_dividends: renda investidor×mês em uma única junção"""
+    portfolios = dataset.portfolios
+    symbols = dataset.symbols['symbol'][portfolios['symbol_index']].tolist()
+    unique_users, owners = np.unique(portfolios['user_id'], return_inverse=True)
+    start = date.today().replace(day=1)
+
+    def project():
+        return project_income(calendar, owners, symbols, portfolios['quantity'], start,
+                              months=12, owner_count=len(unique_users))
+
+    bench.measure('beat.analyze_upcoming_dividends', project, iterations=30, warmup=2, items=len(symbols))
+    assert project().shape == (len(unique_users), 12)
+
+
+def test_recommendation_candidates(bench, dataset, monkeypatch):
+    """refresh_recommendation_candidates com estatísticas de retorno da base sintética"""
+    closes = dataset.ohlcv['close'][:, -252:].astype(np.float64)
+    returns = np.diff(np.log(closes), axis=1)
+    stats = np.column_stack([np.expm1(returns.mean(axis=1) * 252), returns.std(axis=1) * np.sqrt(252)])
+    rows = {symbol: i for i, symbol in enumerate(dataset.symbols['symbol'].tolist())}
+    monkeypatch.setattr(recommendation_module, 'load_return_statistics',
+                        lambda symbols: stats[[rows[s] for s in symbols]])
+
+    fundamentalist_analyzer.update(dataset.fundamentals())
+    bench.measure('beat.refresh_recommendation_candidates', recommendation_service.refresh_candidates,
+                  iterations=20, warmup=1, items=len(rows))
+    assert all(recommendation_service.refresh_candidates().values())
+
+
+def test_daily_insights(bench, dataset):
+    """Kernel de generate_daily_insights sobre dois snapshots por usuário"""
+    rng = np.random.default_rng(6)
+    count = len(dataset.users['id'])
+    invested = rng.uniform(1_000, 500_000, count)
+    previous = invested * rng.uniform(0.7, 1.5, count)
+    latest = previous * rng.uniform(0.97, 1.03, count)
+    snapshots = [
+        [{'invested': i, 'market_value': m, 'profit': m - i}, {'invested': i, 'market_value': p, 'profit': p - i}]
+        for i, m, p in zip(invested.tolist(), latest.tolist(), previous.tolist())
+    ]
+
+    def generate():
+        for history in snapshots:
+            build_insights(history)
+
+    bench.measure('beat.generate_daily_insights', generate, iterations=10, warmup=1, items=count)
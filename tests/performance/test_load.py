@@ -0,0 +1,96 @@
+"""
+Teste de carga do HUB Financeiro
+Mistura ponderada de rotas da API e fan-out de job periódico em modo síncrono
+"""
+
+import time
+from collections import defaultdict
+
+import numpy as np
+import pytest
+
+from core.services.ai_service import build_insights
+from core.services.daytrading_service import TickAggregator, daytrading_service
+from core.services.forex_service import forex_service
+from core.services.fundamentalist_analyzer_service import fundamentalist_analyzer
+from core.utils.fanout import dispatch, get_progress
+from scripts.tick_replay_benchmark import replay_batches, synthetic_session
+
+pytestmark = pytest.mark.performance
+
+REQUESTS = 3_000
+
+
+def insights_chunk(user_ids):
+    """Handler do fan-out: insights sobre snapshots derivados do id do usuário"""
+    generated = 0
+    for user_id in user_ids:
+        invested = 1_000.0 + user_id
+        generated += len(build_insights([
+            {'invested': invested, 'market_value': invested * 1.1, 'profit': invested * 0.1},
+            {'invested': invested, 'market_value': invested * 1.05, 'profit': invested * 0.05},
+        ]))
+    return {'users': len(user_ids), 'insights': generated}
+
+
+@pytest.fixture(scope='module')
+def scenarios(dataset, monkeypatch_module):
+    """Rotas e pesos aproximando o tráfego de um pregão"""
+    fundamentalist_analyzer.update(dataset.fundamentals())
+    forex_service.record({'BRL': 5.4, 'EUR': 0.92, 'GBP': 0.79})
+    session = synthetic_session(20, 40_000)
+    monkeypatch_module.setattr(daytrading_service, '_aggregator', TickAggregator())
+    replay_batches(daytrading_service.aggregator, session, batch_seconds=60)
+
+    symbol = dataset.fundamentals()[0]['symbol']
+    intraday = next(iter(session))
+    return [
+        ('analysis.screener', 4, '/api/v1/analysis/screener/', {'dy__gt': 5, 'order': '-roe', 'limit': 20}),
+        ('analysis.fundamentals', 2, f'/api/v1/analysis/fundamentals/{symbol}/', {}),
+        ('forex.convert', 2, '/api/v1/forex/convert/', {'amount': 100, 'from': 'USD', 'to': 'BRL'}),
+        ('daytrading.bars', 5, f'/api/v1/daytrading/bars/{intraday}/', {'timeframe': '1m', 'limit': 60}),
+        ('daytrading.screen', 3, '/api/v1/daytrading/', {'order': '-change_pct', 'limit': 20}),
+    ]
+
+
+@pytest.fixture(scope='module')
+def monkeypatch_module():
+    patcher = pytest.MonkeyPatch()
+    yield patcher
+    patcher.undo()
+
+
+def test_api_mix(bench, api_client, scenarios):
+    """Sequência ponderada de requisições; percentis por rota e no agregado"""
+    rng = np.random.default_rng(8)
+    weights = np.array([weight for _, weight, _, _ in scenarios], dtype=np.float64)
+    picks = rng.choice(len(scenarios), size=REQUESTS, p=weights / weights.sum())
+
+    samples = defaultdict(list)
+    errors = 0
+    started = time.perf_counter()
+    for pick in picks.tolist():
+        name, _, path, params = scenarios[pick]
+        begin = time.perf_counter()
+        response = api_client.get(path, params)
+        samples[name].append(time.perf_counter() - begin)
+        errors += response.status_code >= 400
+    wall = time.perf_counter() - started
+
+    for name, values in samples.items():
+        bench.record(f'load.{name}', values)
+    bench.record('load.api_mix', np.concatenate([np.asarray(v) for v in samples.values()]), wall_seconds=wall)
+    assert errors == 0
+
+
+def test_fanout_dispatch(bench, dataset):
+    """Divisão em lotes, execução e consolidação do fan-out com Celery síncrono"""
+    user_ids = dataset.users['id'].tolist()
+    runs = []
+
+    def run():
+        runs.append(dispatch('benchmark_insights', user_ids, insights_chunk, chunk_size=500))
+
+    bench.measure('beat.fanout_dispatch', run, iterations=10, warmup=1, items=len(user_ids))
+    progress = get_progress('benchmark_insights', runs[-1]['run_id'])
+    assert progress['processed'] == len(user_ids)
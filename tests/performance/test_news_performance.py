@@ -0,0 +1,12 @@
+"""
+Benchmarks de notícias do HUB Financeiro
+Coleta, parsing e agregação de notícias financeiras
+"""
+
+import pytest
+
+pytestmark = pytest.mark.performance
+
+# news_service, news_aggregator_service e news_parser ainda não têm implementação;
+# o relatório registra o módulo como pulado em vez de omiti-lo
+pytest.skip('serviços de notícias sem implementação para medir', allow_module_level=True)
@@ -0,0 +1,69 @@
+"""
+Benchmarks de alertas de preço do HUB Financeiro
+Reconstrução do índice de alertas e avaliação por tick
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from core.services.market_alerts_service import AlertIndex, MarketAlert
+
+pytestmark = pytest.mark.performance
+
+
+@pytest.fixture(scope='module')
+def alerts(dataset):
+    symbols = dataset.symbols['symbol']
+    data = dataset.alerts
+    return [
+        MarketAlert(alert_id=int(alert_id), user_id=int(user_id), symbol=str(symbols[s]),
+                    alert_type=str(kind), value=float(value), reference_price=float(reference))
+        for alert_id, user_id, s, kind, value, reference in zip(
+            data['id'], data['user_id'], data['symbol_index'], data['alert_type'],
+            data['value'], data['reference_price'])
+    ]
+
+
+@pytest.fixture(scope='module')
+def prices(dataset):
+    return dict(zip(dataset.symbols['symbol'].tolist(), dataset.last_close.tolist()))
+
+
+def test_rebuild_alert_index(bench, alerts, prices):
+    """Kernel de rebuild_alert_index sem a leitura do banco"""
+    index = AlertIndex()
+    bench.measure('beat.rebuild_alert_index', lambda: index.rebuild(alerts, prices=prices),
+                  iterations=20, warmup=1, items=len(alerts))
+    assert index.stats()['alerts'] == len(alerts)
+
+
+def test_tick_evaluation(bench, alerts, prices):
+    """Ticks em passeio aleatório; o índice é reconstruído antes de cada repetição"""
+    rng = np.random.default_rng(5)
+    symbols = list(prices)
+    picks = rng.integers(0, len(symbols), 20_000)
+    moves = np.exp(rng.normal(0, 0.01, len(picks)))
+    current = dict(prices)
+    ticks = []
+    for s, move in zip(picks.tolist(), moves.tolist()):
+        symbol = symbols[s]
+        current[symbol] *= move
+        ticks.append((symbol, current[symbol]))
+
+    # Alertas disparados saem do índice: sem reconstrução, as repetições
+    # seguintes mediriam um índice cada vez menor
+    samples, triggered_counts = [], []
+    for _ in range(5):
+        index = AlertIndex()
+        index.rebuild(alerts, prices=prices)
+        started = time.perf_counter()
+        triggered = sum(len(index.on_tick(symbol, price)) for symbol, price in ticks)
+        samples.append(time.perf_counter() - started)
+        triggered_counts.append(triggered)
+        assert index.stats()['alerts'] == len(alerts) - triggered
+
+    bench.record('signals.on_tick', samples, items=len(ticks))
+    assert triggered_counts[0] > 0
+    assert len(set(triggered_counts)) == 1
@@ -0,0 +1,82 @@
+"""
+Teste de estresse do HUB Financeiro
+Rotas da API e estruturas em memória sob acesso concorrente
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+from core.services.daytrading_service import TickAggregator
+from core.services.fundamentalist_analyzer_service import fundamentalist_analyzer
+from core.services.market_alerts_service import AlertIndex, MarketAlert
+
+pytestmark = pytest.mark.performance
+
+THREADS = (1, 4, 16)
+
+
+@pytest.mark.parametrize('threads', THREADS)
+def test_screener_concurrency(bench, dataset, threads):
+    """Screening concorrente contra a mesma matriz compartilhada"""
+    from rest_framework.test import APIClient
+    from django.contrib.auth import get_user_model
+
+    fundamentalist_analyzer.update(dataset.fundamentals())
+    user = get_user_model()(id=1, username='usuario_1')
+    local = threading.local()
+    params = {'dy__gt': 4, 'order': '-roe', 'limit': 20}
+
+    def request():
+        # APIClient não é seguro entre threads: um cliente por thread
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = APIClient()
+            client.force_authenticate(user=user)
+        assert client.get('/api/v1/analysis/screener/', params).status_code == 200
+
+    result = bench.measure_concurrent(f'stress.api.screener[{threads}]', request, threads=threads, iterations=400)
+    assert result['iterations'] == 400
+
+
+@pytest.mark.parametrize('threads', THREADS)
+def test_alert_index_concurrency(bench, dataset, threads):
+    """Ticks de vários feeds contra o mesmo índice de alertas"""
+    symbols = dataset.symbols['symbol'].tolist()
+    prices = dataset.last_close.tolist()
+    index = AlertIndex()
+    index.rebuild(
+        (MarketAlert(alert_id=i, user_id=1, symbol=symbols[i % len(symbols)], alert_type='above',
+                     value=prices[i % len(symbols)] * (1.01 + (i % 10) / 100))
+         for i in range(20_000)),
+        prices=dict(zip(symbols, prices)),
+    )
+    rng = np.random.default_rng(9)
+    picks = rng.integers(0, len(symbols), 1_000)
+    moves = np.exp(rng.normal(0, 0.02, 1_000))
+
+    def ticks():
+        for s, move in zip(picks.tolist(), moves.tolist()):
+            index.on_tick(symbols[s], prices[s] * move)
+
+    bench.measure_concurrent(f'stress.alert_ticks[{threads}]', ticks, threads=threads, iterations=64, items=1_000)
+
+
+@pytest.mark.parametrize('threads', THREADS)
+def test_aggregator_concurrency(bench, threads):
+    """Feeds paralelos gravando no mesmo agregador"""
+    aggregator = TickAggregator()
+    ts = 1_760_000_000 + 13 * 3600 + np.arange(500) * 0.5
+    prices = np.random.default_rng(10).uniform(9.5, 10.5, 500).round(2)
+    qtys = np.full(500, 100.0)
+    counter = iter(range(10**9))
+    lock = threading.Lock()
+
+    def batch():
+        # Um ativo por lote: a ordem temporal de cada ativo independe das threads
+        with lock:
+            number = next(counter)
+        aggregator.on_ticks(f'SYM{number:04d}', ts, prices, qtys)
+
+    bench.measure_concurrent(f'stress.aggregator[{threads}]', batch, threads=threads, iterations=256, items=500)
@@ -0,0 +1,60 @@
+"""
+Benchmarks de day trade do HUB Financeiro
+Replay de ticks no agregador, publicação periódica e rotas de barras da API
+"""
+
+import pytest
+
+from core.services import daytrading_service as daytrading_module
+from core.services import market_alerts_service as alerts_module
+from core.services.daytrading_service import TickAggregator, daytrading_service
+from scripts.tick_replay_benchmark import replay_batches, replay_ticks, synthetic_session
+
+pytestmark = pytest.mark.performance
+
+SYMBOLS = 50
+TICKS = 200_000
+
+
+@pytest.fixture(scope='module')
+def session():
+    return synthetic_session(SYMBOLS, TICKS)
+
+
+def test_tick_replay(bench, session):
+    """Um negócio por vez, na ordem do feed"""
+    total, elapsed = replay_ticks(TickAggregator(), session)
+    bench.record('daytrading.on_tick', [elapsed], items=total)
+
+
+def test_batch_replay(bench, session):
+    """Lotes de um minuto por ativo"""
+    total, elapsed = replay_batches(TickAggregator(), session, batch_seconds=60)
+    bench.record('daytrading.on_ticks', [elapsed], items=total)
+
+
+def test_flush(bench, session, monkeypatch):
+    """Publicação no cache com a gravação em intraday_bars substituída"""
+    persisted = []
+    monkeypatch.setattr(daytrading_module, 'persist_bars', persisted.extend)
+    monkeypatch.setattr(alerts_module, 'refresh_alert_index', lambda: False)
+    monkeypatch.setattr(daytrading_service, '_aggregator', TickAggregator())
+    replay_batches(daytrading_service.aggregator, session, batch_seconds=60)
+
+    bench.measure('daytrading.flush', daytrading_service.flush, iterations=1, warmup=0, items=SYMBOLS)
+    assert persisted
+
+
+def test_daytrading_api(bench, api_client, session, monkeypatch):
+    monkeypatch.setattr(daytrading_service, '_aggregator', TickAggregator())
+    replay_batches(daytrading_service.aggregator, session, batch_seconds=60)
+    symbol = next(iter(session))
+
+    params = {'timeframe': '1m', 'limit': 100}
+    assert api_client.get(f'/api/v1/daytrading/bars/{symbol}/', params).status_code == 200
+    bench.measure('api.daytrading.bars', lambda: api_client.get(f'/api/v1/daytrading/bars/{symbol}/', params),
+                  iterations=300)
+    bench.measure('api.daytrading.profile', lambda: api_client.get(f'/api/v1/daytrading/profile/{symbol}/'),
+                  iterations=300)
+    bench.measure('api.daytrading.screen',
+                  lambda: api_client.get('/api/v1/daytrading/', {'order': '-volume', 'limit': 20}), iterations=300)
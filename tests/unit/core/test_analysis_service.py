@@ -0,0 +1,113 @@
+"""
+Testes da matriz fundamentalista do HUB Financeiro
+Screening com valores ausentes, percentis por setor e snapshot sem pickle
+"""
+
+import numpy as np
+import pytest
+
+from core.services.fundamentalist_analyzer_service import (
+    FundamentalistAnalyzerService,
+    MetricMatrix,
+    parse_filters,
+)
+
+RECORDS = [
+    {'symbol': 'BBAS3', 'sector': 'Bancos', 'dy': 9.0, 'pvp': 0.8, 'roe': 20.0},
+    {'symbol': 'ITUB4', 'sector': 'Bancos', 'dy': 6.0, 'pvp': 1.9, 'roe': 22.0},
+    {'symbol': 'BBDC4', 'sector': 'Bancos', 'dy': None, 'pvp': 0.9, 'roe': 12.0},
+    {'symbol': 'TAEE11', 'sector': 'Energia', 'dy': 10.0, 'pvp': 1.7, 'roe': None},
+    {'symbol': 'EGIE3', 'sector': 'Energia', 'dy': 7.0, 'pvp': 2.5, 'roe': 25.0},
+]
+
+
+@pytest.fixture
+def matrix():
+    matrix = MetricMatrix(capacity=2)
+    matrix.bulk_upsert(RECORDS)
+    return matrix
+
+
+def _symbols(rows):
+    return [row['symbol'] for row in rows]
+
+
+def test_missing_values_never_pass_filters(matrix):
+    assert _symbols(matrix.screen(filters=[('dy', 'gte', 0)], order_by='dy')) == [
+        'TAEE11', 'BBAS3', 'EGIE3', 'ITUB4',
+    ]
+    assert 'BBDC4' not in _symbols(matrix.screen(filters=[('dy', 'lt', 100)]))
+    assert 'TAEE11' not in _symbols(matrix.screen(filters=[('roe', 'gt', -100)]))
+
+
+def test_missing_values_sort_last_in_both_directions(matrix):
+    assert _symbols(matrix.screen(order_by='roe'))[-1] == 'TAEE11'
+    assert _symbols(matrix.screen(order_by='roe', descending=False))[-1] == 'TAEE11'
+
+
+def test_combined_filters_sector_and_limit(matrix):
+    filters = parse_filters({'dy__gt': '5', 'pvp__lt': '2', 'ignored': 'x'})
+
+    assert _symbols(matrix.screen(filters=filters, order_by='dy')) == ['TAEE11', 'BBAS3', 'ITUB4']
+    assert _symbols(matrix.screen(filters=filters, sector='Bancos', order_by='roe')) == ['ITUB4', 'BBAS3']
+    assert _symbols(matrix.screen(filters=filters, order_by='dy', limit=1)) == ['TAEE11']
+    assert matrix.screen(sector='Varejo') == []
+
+
+def test_parse_filters_rejects_invalid_values():
+    with pytest.raises(ValueError):
+        parse_filters({'dy__gt': 'alto'})
+
+
+def test_percentiles_are_ranked_within_each_sector(matrix):
+    assert matrix.get('BBAS3')['dy_sector_pct'] == 1.0
+    assert matrix.get('ITUB4')['dy_sector_pct'] == 0.0
+    # Sem DY, o ativo fica fora do ranking do setor
+    assert matrix.get('BBDC4')['dy_sector_pct'] is None
+    assert matrix.get('BBDC4')['roe_sector_pct'] == 0.0
+    assert matrix.get('TAEE11')['dy_sector_pct'] == 1.0
+    assert matrix.get('EGIE3')['roe_sector_pct'] == 1.0
+
+
+def test_update_recomputes_only_the_affected_sector(matrix):
+    matrix.bulk_upsert([{'symbol': 'ITUB4', 'dy': 12.0}])
+
+    assert matrix.get('ITUB4')['dy_sector_pct'] == 1.0
+    assert matrix.get('BBAS3')['dy_sector_pct'] == 0.0
+    assert matrix.get('TAEE11')['dy_sector_pct'] == 1.0
+
+
+def test_sector_change_moves_asset_between_rankings(matrix):
+    matrix.upsert('EGIE3', {}, sector='Bancos')
+    matrix.refresh_percentiles()
+
+    assert matrix.get('TAEE11')['pvp_sector_pct'] == 1.0
+    assert matrix.get('EGIE3')['pvp_sector_pct'] == 1.0
+    assert matrix.get('ITUB4')['pvp_sector_pct'] == pytest.approx(2 / 3, abs=1e-4)
+
+
+def test_snapshot_round_trip_without_pickle(matrix, tmp_path):
+    path = tmp_path / 'matrix.npz'
+    matrix.save(str(path))
+
+    with np.load(path, allow_pickle=False) as data:
+        assert data['symbols'].dtype.kind == 'U'
+        assert data['sectors'].dtype.kind == 'U'
+
+    loaded = MetricMatrix.load(str(path))
+    assert loaded.get('BBAS3') == matrix.get('BBAS3')
+    assert _symbols(loaded.screen(filters=[('dy', 'gt', 6.5)], order_by='dy')) == ['TAEE11', 'BBAS3', 'EGIE3']
+
+
+def test_service_ignores_snapshot_that_requires_pickle(tmp_path):
+    path = tmp_path / 'matrix.npz'
+    # Formato anterior: texto em arrays de objetos
+    np.savez(path, values=np.zeros((1, 1)), percentiles=np.zeros((1, 1)), sector_codes=np.zeros(1),
+             symbols=np.array(['BBAS3'], dtype=object), sectors=np.array(['Bancos'], dtype=object),
+             metrics=np.array(['dy'], dtype=object))
+
+    service = FundamentalistAnalyzerService(path=str(path))
+    assert len(service.matrix()) == 0
+
+    service.update(RECORDS)
+    assert len(FundamentalistAnalyzerService(path=str(path)).matrix()) == len(RECORDS)
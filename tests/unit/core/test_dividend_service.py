@@ -0,0 +1,160 @@
+"""
+Testes da calculadora de dividendos do HUB Financeiro
+Calendário, projeção de pagamentos, renda por investidor, simulação de reinvestimento e avisos de proventos
+"""
+
+from datetime import date
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from django.core.cache import cache
+
+from core import signals
+from core.services import dividend_tracker_service as tracker_module
+from core.services.dividend_service import PROJECTION_CACHE_KEY, get_cached_projection
+from core.services.dividend_tracker_service import dividend_tracker
+from core.services.notification_service import build_dividend_notices
+from core.utils.dividend_calculator import DividendCalendar, project_events, project_income, simulate_drip
+
+EVENTS = [
+    {'symbol': 'TAEE11', 'ex_date': date(2026, 1, 10), 'pay_date': date(2026, 1, 20), 'amount': 1.0},
+    {'symbol': 'TAEE11', 'ex_date': date(2026, 4, 10), 'pay_date': date(2026, 4, 20), 'amount': 1.0},
+    {'symbol': 'BBAS3', 'ex_date': date(2026, 1, 25), 'pay_date': date(2026, 2, 5), 'amount': 0.5},
+    {'symbol': 'BBAS3', 'ex_date': date(2026, 2, 20), 'pay_date': date(2026, 3, 2), 'amount': 0.5},
+    {'symbol': 'EGIE3', 'ex_date': date(2026, 12, 20), 'pay_date': date(2027, 1, 1), 'amount': 3.0},
+]
+
+
+@pytest.fixture
+def calendar():
+    return DividendCalendar(EVENTS)
+
+
+def test_calendar_window_uses_pay_date(calendar):
+    events = calendar.events(date(2026, 2, 1), date(2026, 4, 1))
+
+    assert [(e['symbol'], e['pay_date']) for e in events] == [
+        ('BBAS3', date(2026, 2, 5)),
+        ('BBAS3', date(2026, 3, 2)),
+    ]
+    assert calendar.events(date(2026, 1, 1), date(2026, 5, 1), symbols=['TAEE11', 'XPTO3'])[-1]['amount'] == 1.0
+
+
+def test_project_income_matches_hand_computed_schedule(calendar):
+    # Investidor 0: 100 TAEE11 e 10 BBAS3; investidor 1: 200 BBAS3; investidor 2: ativo sem proventos
+    owners = np.array([0, 0, 1, 2])
+    symbols = ['TAEE11', 'BBAS3', 'BBAS3', 'XPTO3']
+    quantities = np.array([100, 10, 200, 50])
+
+    income = project_income(calendar, owners, symbols, quantities, date(2026, 1, 1), months=4, owner_count=3)
+
+    np.testing.assert_allclose(income, [
+        [100.0, 5.0, 5.0, 100.0],    # jan: TAEE11, fev e mar: BBAS3, abr: TAEE11
+        [0.0, 100.0, 100.0, 0.0],
+        [0.0, 0.0, 0.0, 0.0],
+    ])
+
+
+def test_project_income_without_positions(calendar):
+    assert project_income(calendar, np.array([]), [], np.array([]), date(2026, 1, 1), months=3).shape == (0, 3)
+
+
+def test_project_events_from_quarterly_history():
+    history = [
+        {'symbol': 'TAEE11', 'ex_date': date(2025, 1, 15), 'pay_date': date(2025, 1, 25), 'amount': 1.0},
+        {'symbol': 'TAEE11', 'ex_date': date(2025, 4, 15), 'pay_date': date(2025, 4, 25), 'amount': 1.0},
+        {'symbol': 'TAEE11', 'ex_date': date(2025, 7, 15), 'pay_date': date(2025, 7, 25), 'amount': 1.0},
+        {'symbol': 'TAEE11', 'ex_date': date(2025, 10, 15), 'pay_date': date(2025, 10, 25), 'amount': 1.2},
+    ]
+
+    projected = project_events(history, until=date(2026, 6, 1), today=date(2025, 11, 1))
+
+    # Intervalo mediano de 91 dias, média dos 4 últimos pagamentos e 10 dias até o pagamento
+    assert [(e['ex_date'], e['pay_date']) for e in projected] == [
+        (date(2026, 1, 14), date(2026, 1, 24)),
+        (date(2026, 4, 15), date(2026, 4, 25)),
+    ]
+    assert all(e['amount'] == pytest.approx(1.05) and e['projected'] for e in projected)
+
+
+def test_simulate_drip_matches_hand_computed_schedule():
+    result = simulate_drip(np.array([100.0]), np.array([[10.0, 20.0]]), np.array([[1.0, 2.0]]))
+
+    # Cada provento compra ações ao preço do período: 100 → 110 → 121
+    np.testing.assert_allclose(result['shares'], [[110.0, 121.0]])
+    np.testing.assert_allclose(result['income'], [[100.0, 220.0]])
+    np.testing.assert_allclose(result['value'], [[1100.0, 2420.0]])
+    np.testing.assert_allclose(result['total_income'], [320.0])
+
+
+def test_simulate_drip_with_tax():
+    result = simulate_drip(np.array([100.0]), np.array([[10.0, 20.0]]), np.array([[1.0, 2.0]]), tax_rate=0.15)
+
+    np.testing.assert_allclose(result['shares'], [[108.5, 117.7225]])
+    np.testing.assert_allclose(result['income'], [[85.0, 184.45]])
+
+
+def test_simulate_reinvestment_scenarios():
+    scenarios = dividend_tracker.simulate_reinvestment(
+        shares=100, price=10, dividend_per_share=0.5, periods=2,
+        price_growth_rates=[0.0, 0.21], periods_per_year=1,
+    )
+
+    assert scenarios[0] == {'price_growth_rate': 0.0, 'final_shares': 110.25,
+                            'final_value': 1102.5, 'total_income': 102.5}
+    # Com valorização o provento cresce junto com o preço e a quantidade comprada não muda
+    assert scenarios[1]['final_shares'] == 110.25
+    assert scenarios[1]['final_value'] == pytest.approx(110.25 * 10 * 1.21 ** 2, abs=0.01)
+
+
+def test_calendar_counts_event_in_fixture_and_history_once(monkeypatch):
+    fixture = [{'symbol': 'TAEE11', 'ex_date': '2026-01-10', 'pay_date': '2026-01-20', 'amount': 1.0}]
+    # O banco traz o mesmo provento, com o valor corrigido
+    history = [{'symbol': 'TAEE11', 'ex_date': date(2026, 1, 10), 'pay_date': date(2026, 1, 20), 'amount': 1.1}]
+    monkeypatch.setattr(tracker_module, 'load_fixture_schedule', lambda: fixture)
+    monkeypatch.setattr(tracker_module, 'load_dividend_history', lambda since: history)
+
+    calendar = tracker_module.DividendTrackerService().build_calendar(today=date(2026, 2, 1))
+
+    announced = calendar.events(date(2026, 1, 1), date(2026, 2, 1))
+    assert [(e['symbol'], e['amount']) for e in announced] == [('TAEE11', 1.1)]
+
+
+def test_portfolio_change_drops_cached_projection():
+    cache.set(PROJECTION_CACHE_KEY.format(user_id=1), {'total': 10.0})
+    cache.set(PROJECTION_CACHE_KEY.format(user_id=2), {'total': 20.0})
+
+    signals._on_investment_change(sender=None, instance=SimpleNamespace(user_id=1))
+
+    assert get_cached_projection(1) is None
+    assert get_cached_projection(2) == {'total': 20.0}
+
+
+def test_dividend_notices_are_grouped_by_user_and_symbol():
+    positions = {
+        # Duas posições do mesmo ativo (corretoras diferentes) viram um aviso só
+        1: [{'symbol': 'TAEE11', 'quantity': 100}, {'symbol': 'TAEE11', 'quantity': 50},
+            {'symbol': 'PETR4', 'quantity': 10}],
+        2: [{'symbol': 'BBAS3', 'quantity': 10}],
+    }
+    upcoming = {
+        'TAEE11': [
+            {'ex_date': date(2026, 1, 10), 'pay_date': date(2026, 1, 20), 'amount': 1.0},
+            {'ex_date': date(2026, 1, 12), 'pay_date': date(2026, 2, 20), 'amount': 0.5},
+        ],
+        'BBAS3': [{'ex_date': date(2026, 1, 11), 'pay_date': date(2026, 2, 5), 'amount': 0.5}],
+    }
+
+    notices = build_dividend_notices(positions, upcoming)
+
+    assert notices == [
+        {'user_id': 1, 'title': 'Proventos de TAEE11', 'message': (
+            '2 proventos, R$ 225.00 no total; '
+            'Data-com em 10/01: R$ 150.00 previstos para 20/01; '
+            'Data-com em 12/01: R$ 75.00 previstos para 20/02'
+        )},
+        {'user_id': 2, 'title': 'Proventos de BBAS3',
+         'message': 'Data-com em 11/01: R$ 5.00 previstos para 05/02'},
+    ]
@@ -0,0 +1,113 @@
+"""
+Testes do serviço de câmbio do HUB Financeiro
+Taxas cruzadas, consultas as-of, snapshot em float64 e valor de carteiras em várias moedas
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from core.services.forex_service import ForexRateHistory, ForexService, check_cross_rates
+
+JAN = datetime(2026, 1, 5, 12, 0, tzinfo=timezone.utc)
+FEB = datetime(2026, 2, 5, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def history():
+    history = ForexRateHistory(['BRL', 'EUR', 'JPY'], pivot='USD')
+    history.append({'BRL': 5.0, 'EUR': 0.9, 'JPY': 150.0}, at=JAN)
+    history.append({'BRL': 5.5}, at=FEB)
+    return history
+
+
+def test_pivot_is_added_and_cross_rates_are_derived(history):
+    assert history.currencies == ['USD', 'BRL', 'EUR', 'JPY']
+    assert history.rate('EUR', 'BRL', at=JAN) == pytest.approx(5.0 / 0.9)
+    assert history.rate('BRL', 'USD') == pytest.approx(1 / 5.5)
+    assert history.rate('BRL', 'BRL') == 1.0
+    assert history.rate('BRL', 'XYZ') is None
+
+
+def test_as_of_lookup_keeps_last_known_rate(history):
+    # EUR não foi cotado em fevereiro: vale a última observação
+    assert history.rate('USD', 'EUR', at=FEB) == pytest.approx(0.9)
+    assert history.rate('USD', 'BRL', at=datetime(2026, 1, 20, tzinfo=timezone.utc)) == pytest.approx(5.0)
+    assert history.rate('USD', 'BRL', at=datetime(2025, 12, 31, tzinfo=timezone.utc)) is None
+
+
+def test_append_out_of_order_is_rejected(history):
+    with pytest.raises(ValueError):
+        history.append({'BRL': 5.1}, at=JAN)
+
+
+def test_matrix_is_consistent(history):
+    matrix = history.matrix()
+
+    np.testing.assert_allclose(np.diag(matrix), 1.0)
+    np.testing.assert_allclose(matrix * matrix.T, 1.0)
+
+
+def test_convert_many_at_each_moment(history):
+    converted = history.convert_many([100, 100, 100, 100], ['USD', 'USD', 'EUR', 'XYZ'], 'BRL',
+                                     times=[JAN, FEB, FEB, FEB])
+
+    np.testing.assert_allclose(converted[:3], [500.0, 550.0, 100 * 5.5 / 0.9])
+    assert np.isnan(converted[3])
+
+
+def test_cross_rate_check_reports_divergences(history):
+    assert check_cross_rates(history, {('EUR', 'BRL'): 5.5 / 0.9}) == []
+    divergent = check_cross_rates(history, {('EUR', 'BRL'): 6.5})
+
+    assert divergent[0]['pair'] == 'EUR/BRL'
+
+
+def test_snapshot_keeps_float64_precision(history, tmp_path):
+    history.append({'JPY': 157.123456789}, at=datetime(2026, 3, 1, tzinfo=timezone.utc))
+    path = str(tmp_path / 'forex.npz')
+    history.save(path)
+
+    with np.load(path, allow_pickle=False) as data:
+        assert data['rates'].dtype == np.float64
+
+    loaded = ForexRateHistory.load(path)
+    assert loaded.rate('USD', 'JPY') == 157.123456789
+    assert loaded.rate('EUR', 'BRL', at=JAN) == history.rate('EUR', 'BRL', at=JAN)
+
+
+def test_service_widens_loaded_history_with_new_currencies(history, tmp_path, settings):
+    path = str(tmp_path / 'forex.npz')
+    history.save(path)
+    settings.FOREX_CURRENCIES = ['USD', 'BRL', 'EUR', 'JPY', 'MXN']
+
+    service = ForexService(path=path)
+    assert service.history().currencies[-1] == 'MXN'
+    assert service.convert(100, 'USD', 'MXN') is None
+
+    service.record({'MXN': 17.0}, at=datetime(2026, 3, 1, tzinfo=timezone.utc))
+    assert ForexService(path=path).convert(100, 'USD', 'MXN') == pytest.approx(1700.0)
+    assert ForexService(path=path).convert(100, 'USD', 'BRL') == pytest.approx(550.0)
+
+
+def test_portfolio_value_in_target_currency(history, tmp_path):
+    service = ForexService(path=str(tmp_path / 'forex.npz'))
+    service._history = history
+
+    positions = [
+        {'value': 1000.0, 'currency': 'BRL'},
+        {'value': 100.0, 'currency': 'USD'},
+        {'value': 90.0, 'currency': 'EUR'},
+        {'value': 10.0, 'currency': None},
+        {'value': 50.0, 'currency': 'XYZ'},
+    ]
+
+    # Sem cotação para XYZ: a posição fica de fora do total
+    assert service.portfolio_value(positions, 'BRL') == pytest.approx(1000 + 550 + 550 + 10)
+
+
+def test_portfolio_value_without_quotes_keeps_local_positions(tmp_path, settings):
+    service = ForexService(path=str(tmp_path / 'forex.npz'))
+
+    assert service.portfolio_value([{'value': 250.0, 'currency': 'BRL'}], 'BRL') == 250.0
@@ -0,0 +1,181 @@
+"""
+Testes do serviço de recomendações do HUB Financeiro
+Busca por produto interno, candidatos por perfil e cache de recomendações por usuário
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from core import signals
+from core.services import recommendation_service as recommendation_module
+from core.services.investor_profile_service import FEATURES
+from core.services.recommendation_service import (
+    CANDIDATES_CACHE_KEY,
+    STALE_CANDIDATES_CACHE_KEY,
+    USER_CACHE_KEY,
+    AssetFeatures,
+    NearestNeighbourIndex,
+    RecommendationService,
+)
+
+SYMBOLS = ['BBAS3', 'ITUB4', 'TAEE11', 'PETR4']
+SECTORS = ['Bancos', 'Bancos', 'Energia', 'Petróleo']
+RAW = np.array([
+    # retorno, volatilidade, dy, valor, qualidade, alavancagem
+    [0.10, 0.20, 9.0, 1.2, 20.0, 0.5],
+    [0.12, 0.22, 6.0, 0.5, 22.0, 0.6],
+    [0.08, 0.15, 10.0, 0.6, 18.0, 1.2],
+    [0.30, 0.45, 12.0, 1.0, 25.0, 0.8],
+])
+
+
+@pytest.fixture
+def features():
+    return AssetFeatures(SYMBOLS, RAW, SECTORS)
+
+
+@pytest.fixture
+def service(features, monkeypatch):
+    monkeypatch.setattr(recommendation_module, 'build_asset_features', lambda: features)
+    return RecommendationService()
+
+
+@pytest.fixture
+def enqueued(monkeypatch):
+    calls = []
+    monkeypatch.setattr(recommendation_module.refresh_recommendation_candidates, 'delay',
+                        lambda: calls.append(1))
+    return calls
+
+
+def test_features_are_standardized_with_sector_one_hot(features):
+    assert features.vectors.shape == (4, len(FEATURES) + 3)
+    np.testing.assert_allclose(features.vectors[:, :len(FEATURES)].mean(axis=0), 0.0, atol=1e-12)
+    assert features.vectors[2, len(FEATURES) + features.sector_names.index('Energia')] == 1.0
+
+
+def test_exact_search_orders_by_inner_product_and_applies_mask():
+    index = NearestNeighbourIndex(np.array([[1.0, 0.0], [0.0, 1.0], [0.7, 0.7]]))
+
+    rows, scores = index.search(np.array([1.0, 0.2]), 2)
+    assert rows.tolist() == [0, 2]
+    np.testing.assert_allclose(scores, [1.0, 0.84], rtol=1e-6)
+
+    rows, _ = index.search(np.array([1.0, 0.2]), 3, mask=np.array([False, True, True]))
+    assert rows.tolist() == [2, 1]
+
+
+def test_refresh_respects_profile_volatility_limit(service):
+    summary = service.refresh_candidates()
+
+    # Conservador limita a volatilidade a 25%: PETR4 fica de fora
+    assert summary['conservador'] == 3
+    assert 'PETR4' not in cache.get(CANDIDATES_CACHE_KEY.format(profile='conservador'))['symbols']
+    assert summary['arrojado'] == 4
+
+
+def test_recommend_skips_holdings_and_caches_per_profile(service, enqueued):
+    service.refresh_candidates()
+
+    items = service.recommend(1, 'arrojado', holdings={'PETR4': 100}, sector_exposure={})
+    assert 'PETR4' not in [item['symbol'] for item in items]
+    assert len(items) == 3
+
+    # Trocar de perfil não reaproveita a lista do perfil anterior
+    conservative = service.recommend(1, 'conservador', holdings={}, sector_exposure={})
+    assert 'PETR4' not in [item['symbol'] for item in conservative]
+    assert service.recommend(1, 'arrojado', holdings={}, sector_exposure={}) == items
+    assert enqueued == []
+
+
+def test_invalidation_drops_every_profile_of_the_user(service, enqueued):
+    service.refresh_candidates()
+    service.recommend(1, 'arrojado', holdings={'PETR4': 100}, sector_exposure={})
+    service.recommend(1, 'conservador', holdings={}, sector_exposure={})
+
+    signals._on_investment_change(sender=None, instance=SimpleNamespace(user_id=1))
+
+    items = service.recommend(1, 'arrojado', holdings={}, sector_exposure={})
+    assert 'PETR4' in [item['symbol'] for item in items]
+
+
+def test_candidate_miss_enqueues_refresh_and_serves_empty(service, enqueued, monkeypatch):
+    monkeypatch.setattr(service, 'refresh_candidates', lambda: pytest.fail('atualização síncrona'))
+
+    assert service.recommend(1, 'moderado', holdings={}, sector_exposure={}) == []
+    assert service.recommend(2, 'moderado', holdings={}, sector_exposure={}) == []
+    # Uma atualização por vez, mesmo com várias requisições
+    assert enqueued == [1]
+
+
+def test_candidate_miss_serves_stale_copy(service, enqueued):
+    service.refresh_candidates()
+    cache.delete(CANDIDATES_CACHE_KEY.format(profile='moderado'))
+    assert cache.get(STALE_CANDIDATES_CACHE_KEY.format(profile='moderado'))
+
+    items = service.recommend(1, 'moderado', holdings={}, sector_exposure={})
+
+    assert items and enqueued == [1]
+    # A lista baseada na cópia antiga não é guardada para o usuário
+    assert cache.get(USER_CACHE_KEY.format(user_id=1, profile='moderado')) is None
+
+
+@pytest.fixture
+def portfolio(monkeypatch):
+    """Carteira do usuário 1: BBAS3 (Bancos) e uma posição sem cadastro fundamentalista"""
+    loads = []
+
+    def load_positions(user_ids):
+        loads.append(list(user_ids))
+        return {1: [
+            {'symbol': 'BBAS3', 'quantity': 100, 'average_price': 25.0},
+            {'symbol': 'XPTO3', 'quantity': 10, 'average_price': 5.0},
+        ]}
+
+    monkeypatch.setattr('core.services.portfolio_service.load_positions', load_positions)
+    monkeypatch.setattr('core.services.portfolio_service.latest_prices', lambda symbols: {'BBAS3': 30.0})
+    sectors = dict(zip(SYMBOLS, SECTORS))
+    monkeypatch.setattr(recommendation_module.fundamentalist_analyzer, 'get_asset',
+                        lambda symbol: {'sector': sectors[symbol]} if symbol in sectors else None)
+    return loads
+
+
+def test_portfolio_context_weights_sectors_by_value(portfolio):
+    holdings, exposure = recommendation_module.load_portfolio_context(1)
+
+    assert holdings == {'BBAS3': 100.0, 'XPTO3': 10.0}
+    assert exposure == {'Bancos': 1.0}
+
+
+@pytest.fixture
+def api():
+    client = APIClient()
+    client.force_authenticate(user=get_user_model()(id=1, username='usuario_1'))
+    return client
+
+
+def test_recommendations_endpoint_serves_profile_candidates(service, portfolio, enqueued, api):
+    service.refresh_candidates()
+
+    response = api.get('/api/v1/recommendations/', {'limit': 2})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body['profile'] == 'moderado'
+    symbols = [item['symbol'] for item in body['results']]
+    # BBAS3 já está na carteira
+    assert 'BBAS3' not in symbols and body['count'] == 2
+
+    # A segunda requisição vem do cache do usuário, sem ler a carteira
+    assert api.get('/api/v1/recommendations/', {'limit': 2}).json() == body
+    assert portfolio == [[1]]
+
+
+@pytest.mark.parametrize('limit', ['0', 'dez'])
+def test_recommendations_endpoint_rejects_invalid_limit(api, limit):
+    assert api.get('/api/v1/recommendations/', {'limit': limit}).status_code == 400
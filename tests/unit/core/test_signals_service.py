@@ -0,0 +1,226 @@
+"""
+Testes do índice de alertas de preço do HUB Financeiro
+Cruzamentos de nível, percentuais, faixas, preço inicial e alterações publicadas pelo log
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import cache
+
+from core.services import market_alerts_service as alerts_module
+from core.services.market_alerts_service import (
+    ALERT_ABOVE,
+    ALERT_BELOW,
+    ALERT_PERCENT_DOWN,
+    ALERT_PERCENT_UP,
+    ALERT_RANGE_ENTER,
+    ALERT_RANGE_EXIT,
+    AlertIndex,
+    MarketAlert,
+)
+
+
+def _alert(alert_id, alert_type, value, **kwargs):
+    return MarketAlert(alert_id=alert_id, user_id=1, symbol=kwargs.pop('symbol', 'PETR4'),
+                       alert_type=alert_type, value=value, **kwargs)
+
+
+def _ids(triggered):
+    return sorted(alert.alert_id for alert in triggered)
+
+
+@pytest.fixture
+def index():
+    return AlertIndex()
+
+
+def test_above_and_below_trigger_only_when_crossed(index):
+    index.rebuild([_alert(1, ALERT_ABOVE, 30.0), _alert(2, ALERT_BELOW, 25.0)], prices={'PETR4': 28.0})
+
+    assert index.on_tick('PETR4', 29.5) == []
+    assert _ids(index.on_tick('PETR4', 30.0)) == [1]
+    assert index.on_tick('PETR4', 31.0) == []
+    assert _ids(index.on_tick('PETR4', 24.0)) == [2]
+    assert len(index) == 0
+
+
+def test_first_tick_after_rebuild_uses_seeded_price(index):
+    index.rebuild([_alert(1, ALERT_ABOVE, 30.0)], prices={'PETR4': 29.0})
+
+    assert _ids(index.on_tick('PETR4', 30.5)) == [1]
+
+
+def test_first_tick_without_seed_only_records_price(index):
+    index.rebuild([_alert(1, ALERT_ABOVE, 30.0)])
+
+    assert index.on_tick('PETR4', 30.5) == []
+    assert index.on_tick('PETR4', 29.0) == []
+    assert _ids(index.on_tick('PETR4', 31.0)) == [1]
+
+
+def test_rebuild_keeps_live_price_over_seed(index):
+    index.rebuild([_alert(1, ALERT_ABOVE, 30.0)], prices={'PETR4': 29.0})
+    index.on_tick('PETR4', 29.8)
+
+    # O fechamento anterior (25,0) não substitui o preço já recebido do feed
+    index.rebuild([_alert(1, ALERT_ABOVE, 30.0)], prices={'PETR4': 25.0})
+    assert _ids(index.on_tick('PETR4', 30.2)) == [1]
+
+
+def test_alert_added_for_symbol_already_ticking(index):
+    index.on_tick('VALE3', 60.0)
+    index.add(_alert(1, ALERT_BELOW, 59.0, symbol='VALE3'))
+
+    assert _ids(index.on_tick('VALE3', 58.5)) == [1]
+
+
+@pytest.mark.parametrize('alert_type, reference, value, ticks, expected', [
+    (ALERT_PERCENT_UP, 100.0, 5.0, [104.9, 105.1], [[], [1]]),
+    (ALERT_PERCENT_DOWN, 100.0, 10.0, [91.0, 89.9], [[], [1]]),
+])
+def test_percent_alerts(index, alert_type, reference, value, ticks, expected):
+    index.rebuild([_alert(1, alert_type, value, reference_price=reference)], prices={'PETR4': reference})
+
+    assert [_ids(index.on_tick('PETR4', price)) for price in ticks] == expected
+
+
+def test_percent_alert_without_reference_is_skipped(index):
+    index.rebuild([_alert(1, ALERT_PERCENT_UP, 5.0), _alert(2, ALERT_ABOVE, 10.0)])
+
+    assert 1 not in index
+    assert 2 in index
+
+
+@pytest.mark.parametrize('start, price, expected', [
+    (18.0, 21.0, [1]),      # entra por baixo
+    (26.0, 24.0, [1]),      # entra por cima
+    (18.0, 26.0, []),       # atravessa a faixa sem terminar dentro dela
+    (26.0, 18.0, []),
+])
+def test_range_enter(index, start, price, expected):
+    index.rebuild([_alert(1, ALERT_RANGE_ENTER, 20.0, high=25.0)], prices={'PETR4': start})
+
+    assert _ids(index.on_tick('PETR4', price)) == expected
+
+
+@pytest.mark.parametrize('price, expected', [(25.5, [1]), (19.5, [1]), (22.0, [])])
+def test_range_exit(index, price, expected):
+    index.rebuild([_alert(1, ALERT_RANGE_EXIT, 20.0, high=25.0)], prices={'PETR4': 22.0})
+
+    assert _ids(index.on_tick('PETR4', price)) == expected
+
+
+def test_invalid_range_is_skipped(index):
+    index.rebuild([_alert(1, ALERT_RANGE_ENTER, 25.0, high=20.0)])
+
+    assert len(index) == 0
+
+
+def test_repeat_alert_stays_indexed(index):
+    index.rebuild([_alert(1, ALERT_ABOVE, 30.0, repeat=True)], prices={'PETR4': 29.0})
+
+    assert _ids(index.on_tick('PETR4', 31.0)) == [1]
+    index.on_tick('PETR4', 29.0)
+    assert _ids(index.on_tick('PETR4', 30.5)) == [1]
+
+
+def test_multiple_levels_crossed_in_one_tick(index):
+    index.rebuild(
+        [_alert(1, ALERT_ABOVE, 30.0), _alert(2, ALERT_ABOVE, 31.0), _alert(3, ALERT_ABOVE, 35.0)],
+        prices={'PETR4': 29.0},
+    )
+
+    assert _ids(index.on_tick('PETR4', 32.0)) == [1, 2]
+    assert index.stats() == {'alerts': 1, 'symbols': 1, 'levels': 1}
+
+
+def test_remove_and_replace(index):
+    index.add(_alert(1, ALERT_ABOVE, 30.0))
+    index.add(_alert(1, ALERT_ABOVE, 40.0))
+    assert index.stats()['levels'] == 1
+
+    assert index.remove(1)
+    assert not index.remove(1)
+    assert index.stats()['levels'] == 0
+
+
+@pytest.fixture
+def process_index(monkeypatch):
+    """Índice do processo com o banco substituído por dicionários em memória"""
+    index = AlertIndex()
+    db = {1: _alert(1, ALERT_ABOVE, 30.0)}
+    loads = []
+
+    def load_active_alerts():
+        loads.append(1)
+        return list(db.values())
+
+    monkeypatch.setattr(alerts_module, 'alert_index', index)
+    monkeypatch.setattr(alerts_module, '_index_version', None)
+    monkeypatch.setattr(alerts_module, '_missing_version', None)
+    monkeypatch.setattr(alerts_module, 'load_active_alerts', load_active_alerts)
+    monkeypatch.setattr(alerts_module, 'load_alerts', lambda ids: {i: db[i] for i in ids if i in db})
+    monkeypatch.setattr(alerts_module, 'load_last_closes', lambda symbols: {'PETR4': 29.0})
+    return SimpleNamespace(index=index, db=db, loads=loads)
+
+
+def test_rebuild_seeds_last_closes(process_index):
+    assert alerts_module.rebuild_alert_index()['alerts'] == 1
+
+    assert _ids(process_index.index.on_tick('PETR4', 30.5)) == [1]
+
+
+def test_rebuild_keeps_last_price_of_symbols_without_alerts(index):
+    index.on_tick('VALE3', 60.0)
+    index.rebuild([_alert(1, ALERT_ABOVE, 30.0)], prices={'PETR4': 29.0})
+
+    index.add(_alert(2, ALERT_ABOVE, 61.0, symbol='VALE3'))
+    assert _ids(index.on_tick('VALE3', 61.5)) == [2]
+
+
+@pytest.mark.django_db
+def test_refresh_applies_published_changes_without_reloading(process_index, django_capture_on_commit_callbacks):
+    alerts_module.rebuild_alert_index()
+    assert not alerts_module.refresh_alert_index()
+
+    instance = SimpleNamespace(id=2)
+    process_index.db[2] = _alert(2, ALERT_BELOW, 20.0)
+    with django_capture_on_commit_callbacks(execute=True):
+        alerts_module.sync_alert(instance)
+
+    assert alerts_module.refresh_alert_index()
+    assert 2 in process_index.index
+    assert not alerts_module.refresh_alert_index()
+
+    del process_index.db[2]
+    with django_capture_on_commit_callbacks(execute=True):
+        alerts_module.drop_alert(instance)
+    assert alerts_module.refresh_alert_index()
+    assert 2 not in process_index.index
+    # Só a carga inicial leu todos os alertas
+    assert len(process_index.loads) == 1
+
+
+def test_refresh_rebuilds_when_the_log_has_a_gap(process_index):
+    alerts_module.rebuild_alert_index()
+    alerts_module._publish_change(1)
+    alerts_module._publish_change(1)
+    cache.delete(alerts_module.CHANGE_KEY.format(version=1))
+
+    # A entrada pode estar a caminho: o primeiro ciclo espera, o seguinte reconstrói
+    assert not alerts_module.refresh_alert_index()
+    assert len(process_index.loads) == 1
+    assert alerts_module.refresh_alert_index()
+    assert len(process_index.loads) == 2
+    assert not alerts_module.refresh_alert_index()
+
+
+def test_refresh_rebuilds_after_version_jump(process_index, monkeypatch):
+    alerts_module.rebuild_alert_index()
+    monkeypatch.setattr(alerts_module, 'MAX_REPLAY', 2)
+    for _ in range(3):
+        alerts_module._publish_change(1)
+
+    assert alerts_module.refresh_alert_index()
+    assert len(process_index.loads) == 2
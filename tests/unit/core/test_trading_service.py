@@ -0,0 +1,154 @@
+"""
+Testes do serviço de day trade do HUB Financeiro
+Barras em buffers circulares, gravação das barras fechadas e leitura das barras publicadas
+"""
+
+import numpy as np
+import pytest
+from django.core.cache import cache
+
+from core.services import daytrading_service as daytrading_module
+from core.services.daytrading_service import DayTradingService, TickAggregator
+
+START = 1_767_621_600          # 2026-01-05 14:00 UTC, início de minuto
+
+
+@pytest.fixture
+def aggregator():
+    aggregator = TickAggregator(tz='America/Sao_Paulo')
+    for second, price in ((0, 10.0), (20, 10.5), (59, 9.8), (60, 10.1), (130, 10.4)):
+        aggregator.on_tick('PETR4', START + second, price, 100)
+    return aggregator
+
+
+@pytest.fixture
+def service(aggregator, tmp_path, monkeypatch, settings):
+    settings.ANALYTICS_DATA_DIR = tmp_path
+    service = DayTradingService()
+    service._aggregator = aggregator
+    monkeypatch.setattr('core.services.market_alerts_service.refresh_alert_index', lambda: False)
+    return service
+
+
+def test_minute_bars_close_with_ohlcv(aggregator):
+    bars = aggregator.bars('PETR4', '1m', include_open=False)
+
+    np.testing.assert_array_equal(bars['start'], [START, START + 60])
+    np.testing.assert_allclose(
+        [bars['open'], bars['high'], bars['low'], bars['close']],
+        [[10.0, 10.1], [10.5, 10.1], [9.8, 10.1], [9.8, 10.1]],
+    )
+    np.testing.assert_allclose(bars['vwap'], [(10.0 + 10.5 + 9.8) / 3, 10.1])
+
+
+def test_batch_matches_tick_by_tick():
+    ts = START + np.array([0, 20, 59, 60, 130])
+    prices = np.array([10.0, 10.5, 9.8, 10.1, 10.4])
+    batch = TickAggregator()
+    single = TickAggregator()
+
+    batch.on_ticks('PETR4', ts, prices, np.full(5, 100.0))
+    for t, p in zip(ts, prices):
+        single.on_tick('PETR4', float(t), float(p), 100.0)
+
+    for timeframe in ('1s', '1m', '5m'):
+        expected = single.bars('PETR4', timeframe)
+        for name, values in batch.bars('PETR4', timeframe).items():
+            np.testing.assert_allclose(values, expected[name])
+    assert batch.drain_pending() == single.drain_pending()
+
+
+def test_flush_drains_bars_after_successful_write(service, monkeypatch):
+    written = []
+    monkeypatch.setattr(daytrading_module, 'persist_bars', written.extend)
+
+    assert service.flush()['bars_persisted'] == 2
+    assert [row[:2] for row in written] == [('PETR4', START), ('PETR4', START + 60)]
+    assert service.aggregator.drain_pending() == []
+
+
+def test_flush_requeues_bars_when_write_fails(service, monkeypatch):
+    def fail(rows):
+        raise RuntimeError('banco indisponível')
+
+    monkeypatch.setattr(daytrading_module, 'persist_bars', fail)
+    assert service.flush() == {'bars_persisted': 0, 'symbols_published': 1}
+
+    # Barras fechadas depois da falha ficam atrás das que voltaram para a fila
+    service.aggregator.on_tick('PETR4', START + 180, 10.2, 100)
+    written = []
+    monkeypatch.setattr(daytrading_module, 'persist_bars', written.extend)
+
+    assert service.flush()['bars_persisted'] == 3
+    assert [row[1] for row in written] == [START, START + 60, START + 120]
+
+
+@pytest.fixture
+def bars_table(db):
+    """intraday_bars com a chave única da migração 012 (o SQLite não particiona)"""
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'CREATE TABLE intraday_bars (id INTEGER PRIMARY KEY, symbol VARCHAR(20) NOT NULL, '
+            '"timestamp" TIMESTAMP NOT NULL, open NUMERIC NOT NULL, high NUMERIC NOT NULL, '
+            'low NUMERIC NOT NULL, close NUMERIC NOT NULL, volume BIGINT NOT NULL DEFAULT 0)'
+        )
+        cursor.execute('CREATE UNIQUE INDEX ux_intraday_bars_symbol_timestamp ON intraday_bars (symbol, "timestamp")')
+    yield connection
+    with connection.cursor() as cursor:
+        cursor.execute('DROP TABLE intraday_bars')
+
+
+def _stored_bars(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT symbol, close, volume FROM intraday_bars ORDER BY symbol, "timestamp"')
+        return [(symbol, float(close), volume) for symbol, close, volume in cursor.fetchall()]
+
+
+def test_persist_bars_overwrites_resent_bars(bars_table, monkeypatch):
+    monkeypatch.setattr(daytrading_module, 'PERSIST_PAGE_SIZE', 2)
+    daytrading_module.persist_bars([
+        ('PETR4', START, 10.0, 10.5, 9.8, 9.8, 300.0, 3030.0, 3),
+        ('PETR4', START + 60, 10.1, 10.1, 10.1, 10.1, 100.0, 1010.0, 1),
+        ('VALE3', START, 60.0, 60.0, 60.0, 60.0, 50.0, 3000.0, 1),
+    ])
+
+    # Reenvio após falha, com a barra do primeiro minuto corrigida
+    daytrading_module.persist_bars([('PETR4', START, 10.0, 10.5, 9.7, 9.9, 400.0, 4000.0, 4)])
+
+    assert _stored_bars(bars_table) == [('PETR4', 9.9, 400), ('PETR4', 10.1, 100), ('VALE3', 60.0, 50)]
+
+
+def test_consume_feeds_aggregator_and_flushes(tmp_path, monkeypatch, settings):
+    settings.ANALYTICS_DATA_DIR = tmp_path
+    written, ticks = [], []
+    monkeypatch.setattr(daytrading_module, 'persist_bars', written.extend)
+    monkeypatch.setattr('core.services.market_alerts_service.rebuild_alert_index', lambda: 0)
+    monkeypatch.setattr('core.services.market_alerts_service.refresh_alert_index', lambda: False)
+    monkeypatch.setattr('core.services.market_alerts_service.process_price_tick',
+                        lambda symbol, price: ticks.append((symbol, price)))
+    service = DayTradingService()
+
+    trades = [('PETR4', START + second, price, 100) for second, price in ((0, 10.0), (59, 9.8), (60, 10.1))]
+    stats = service.consume(iter(trades), flush_interval=3600)
+
+    assert stats == {'symbols_restored': 0, 'alerts': 0, 'trades': 3}
+    assert ticks == [('PETR4', 10.0), ('PETR4', 9.8), ('PETR4', 10.1)]
+    # O flush final grava a barra fechada e publica o ativo para os demais processos
+    assert [row[1] for row in written] == [START]
+    assert cache.get('daytrading:summary:PETR4')['last'] == 10.1
+
+
+@pytest.mark.parametrize('limit, expected', [(0, 1), (-5, 1), (2, 2), (500, 3)])
+def test_published_bars_limit_is_at_least_one(limit, expected):
+    service = DayTradingService()
+    service._aggregator = TickAggregator()
+    cache.set('daytrading:bars:VALE3', {'1m': {'close': [60.0, 60.5, 61.0]}})
+
+    assert len(service.live_bars('VALE3', '1m', limit=limit)['close']) == expected
+
+
+def test_live_bars_rejects_unknown_timeframe():
+    with pytest.raises(ValueError):
+        DayTradingService().live_bars('PETR4', '2h')
@@ -0,0 +1,466 @@
+"""
+Testes dos utilitários do HUB Financeiro
+Fan-out em lotes idempotentes, métricas multiprocesso, partições e blocos de backup
+"""
+
+import re
+import subprocess
+import sys
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from celery import chord, group
+from django.core.cache import cache
+
+from core.services import backup_service as backup_module
+from core.services.backup_service import BackupLocked, BackupService, BlockStore, BlockWriter
+from core.utils import fanout, metrics, partitions
+from core.utils.fanout import dispatch, get_progress, run_id_for
+
+BASE_DIR = Path(__file__).resolve().parents[3]
+PROCESSED = []
+
+
+def count_items(items):
+    """Handler de teste: registra o lote e devolve contadores"""
+    PROCESSED.append(list(items))
+    return {'items': len(items), 'total': sum(items)}
+
+
+@pytest.fixture
+def processed(eager_celery):
+    PROCESSED.clear()
+    yield PROCESSED
+    PROCESSED.clear()
+
+
+def test_chunks_cover_every_item_once(processed):
+    summary = dispatch('teste', range(25), count_items, chunk_size=10, run_id='r1')
+
+    assert summary == {'job': 'teste', 'run_id': 'r1', 'chunks': 3, 'items': 25}
+    assert [len(chunk) for chunk in processed] == [10, 10, 5]
+    assert sorted(item for chunk in processed for item in chunk) == list(range(25))
+    assert get_progress('teste', 'r1')['percent'] == 100.0
+
+
+def test_chord_sums_counters_of_every_chunk(processed):
+    header = group(fanout.run_chunk.s('teste', 'r1', n, f'{__name__}.count_items', chunk)
+                   for n, chunk in enumerate([[1, 2], [3], [4, 5, 6]]))
+
+    result = chord(header)(fanout.finalize_run.s('teste', 'r1')).get()
+
+    assert result['processed'] == 6
+    assert result['totals'] == {'items': 6, 'total': 21}
+
+
+def test_finalize_ignores_non_numeric_counters():
+    result = fanout.finalize_run.run([{'items': 10, 'note': 'x'}, None, {'items': 5}], 'teste', 'r1')
+
+    assert result['totals'] == {'items': 15}
+
+
+def test_redelivered_run_skips_completed_chunks(processed):
+    first = dispatch('teste', range(25), count_items, chunk_size=10)
+    # Simula o worker perdido antes de concluir o último lote
+    cache.delete(fanout._DONE_KEY.format(job='teste', run_id=first['run_id'], chunk=2))
+    cache.decr(fanout._PROGRESS_KEY.format(job='teste', run_id=first['run_id']), 5)
+    # O custo medido mudaria o tamanho do lote; a reexecução mantém a divisão original
+    cache.set(fanout._COST_KEY.format(job='teste'), 1.0)
+    processed.clear()
+
+    second = dispatch('teste', range(25), count_items)
+
+    assert second['run_id'] == first['run_id']
+    assert processed == [[20, 21, 22, 23, 24]]
+    assert get_progress('teste', first['run_id'])['processed'] == 25
+
+
+def test_run_id_depends_on_job_period_and_items():
+    run_id = run_id_for('teste', '2026-01-05', [1, 2, 3])
+
+    assert run_id == run_id_for('teste', '2026-01-05', [1, 2, 3])
+    assert run_id != run_id_for('teste', '2026-01-06', [1, 2, 3])
+    assert run_id != run_id_for('teste', '2026-01-05', [1, 2, 3, 4])
+    assert run_id != run_id_for('outro', '2026-01-05', [1, 2, 3])
+
+
+def fail_items(items):
+    """Handler de teste: sempre falha"""
+    raise ValueError('falha no lote')
+
+
+@pytest.fixture
+def retries(monkeypatch):
+    calls = []
+
+    def retry(**kwargs):
+        calls.append(kwargs)
+        return RuntimeError('retry')
+
+    monkeypatch.setattr(fanout.run_chunk, 'retry', retry)
+    return calls
+
+
+def test_locked_chunk_retries_beyond_lock_expiry(processed, retries):
+    cache.add(fanout._LOCK_KEY.format(job='teste', run_id='r1', chunk=0), 'outro-worker')
+
+    with pytest.raises(RuntimeError):
+        fanout.run_chunk.run('teste', 'r1', 0, f'{__name__}.count_items', [1])
+
+    assert processed == []
+    # As esperas são contadas à parte, sem limite do Celery
+    assert retries == [{'kwargs': {'lock_waits': 1}, 'countdown': fanout.LOCK_RETRY_SECONDS, 'max_retries': None}]
+    assert fanout.LOCK_RETRY_SECONDS * fanout.LOCK_RETRIES > fanout.CHUNK_LOCK_TTL
+
+    with pytest.raises(fanout.ChunkLocked):
+        fanout.run_chunk.run('teste', 'r1', 0, f'{__name__}.count_items', [1], lock_waits=fanout.LOCK_RETRIES)
+
+
+def test_lock_waits_do_not_consume_error_retries(retries):
+    with pytest.raises(RuntimeError):
+        fanout.run_chunk.run('teste', 'r1', 0, f'{__name__}.fail_items', [1], lock_waits=4)
+
+    assert retries[0]['max_retries'] == fanout.run_chunk.max_retries + 4
+    # O lote com erro libera a trava para a próxima tentativa
+    assert cache.get(fanout._LOCK_KEY.format(job='teste', run_id='r1', chunk=0)) is None
+
+
+def test_chunk_size_follows_measured_cost():
+    assert fanout.chunk_size_for('teste') == fanout.DEFAULT_CHUNK_SIZE
+
+    fanout.record_item_cost('teste', seconds=3.0, items=100)
+    assert fanout.chunk_size_for('teste') == 1000
+    # Média móvel: 0,03 + 0,3 × (0,3 − 0,03) = 0,111 s por item
+    fanout.record_item_cost('teste', seconds=30.0, items=100)
+    assert fanout.chunk_size_for('teste') == 270
+
+
+def test_multiprocess_dir_is_created_and_cleaned(tmp_path, monkeypatch):
+    path = tmp_path / 'metrics'
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(path))
+    assert metrics.reset_multiprocess_dir() == str(path)
+
+    (path / 'histogram_123.db').write_bytes(b'antigo')
+    (path / 'leia-me.txt').write_text('mantido')
+    metrics.reset_multiprocess_dir()
+
+    assert sorted(p.name for p in path.iterdir()) == ['leia-me.txt']
+
+
+def test_multiprocess_helpers_are_noops_without_dir(monkeypatch):
+    monkeypatch.delenv('PROMETHEUS_MULTIPROC_DIR', raising=False)
+
+    assert metrics.reset_multiprocess_dir() is None
+    metrics.mark_process_dead(123)
+    assert metrics.metrics_registry() is metrics.REGISTRY
+
+
+def test_importing_metrics_does_not_load_prometheus():
+    code = ('import sys; import core.utils.metrics, core.utils.cache; '
+            'sys.exit("prometheus_client" in sys.modules)')
+    assert subprocess.run([sys.executable, '-c', code], cwd=BASE_DIR).returncode == 0
+
+
+def test_core_ready_only_wires_receivers():
+    code = (
+        "import sys, django; from django.conf import settings; "
+        "settings.configure(INSTALLED_APPS=['django.contrib.auth', 'django.contrib.contenttypes', 'core']); "
+        "django.setup(); "
+        "loaded = {'numpy', 'core.utils.security', 'core.services.market_alerts_service', "
+        "'core.services.recommendation_service'} & set(sys.modules); "
+        "sys.exit(sorted(loaded) or None)"
+    )
+    completed = subprocess.run([sys.executable, '-c', code], cwd=BASE_DIR, capture_output=True, text=True)
+    assert completed.returncode == 0, completed.stderr
+
+
+def test_metrics_are_registered_on_first_use():
+    metrics.record_request('api-root', 'GET', 200, 0.01)
+
+    assert metrics.REGISTRY.get_sample_value(
+        'hub_http_request_latency_seconds_count', {'view': 'api-root', 'method': 'GET', 'status': '200'},
+    ) >= 1
+    assert metrics.REQUEST_LATENCY is metrics._metric('REQUEST_LATENCY')
+
+
+def test_partition_names_and_month_arithmetic():
+    assert partitions.partition_name('transactions', date(2026, 3, 1)) == 'transactions_p202603'
+    assert partitions.add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert partitions.add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert partitions.month_start(date(2026, 2, 28)) == date(2026, 2, 1)
+
+
+def test_retention_cutoff_honours_overrides(settings):
+    assert partitions.retention_cutoff('intraday_bars', today=date(2026, 5, 17)) == date(2026, 2, 1)
+
+    settings.TIME_SERIES_RETENTION_MONTHS = {'intraday_bars': 1}
+    assert partitions.retention_cutoff('intraday_bars', today=date(2026, 5, 17)) == date(2026, 4, 1)
+
+
+class _Statements(list):
+    default_has_rows = False
+
+
+@pytest.fixture
+def executed(monkeypatch):
+    """SQL emitido pela manutenção, sem executar (o banco de testes não é PostgreSQL)"""
+    from django.db import connection
+
+    statements = _Statements()
+
+    def record(execute, sql, params, many, context):
+        # Os testes rodam dentro de uma transação: cada atomic() vira um savepoint
+        statements.append(re.sub(r' "s\w+"$', '', sql))
+        if sql.startswith('SELECT EXISTS'):
+            # Resposta simulada: a DEFAULT tem linhas no intervalo?
+            return execute('SELECT %s', [statements.default_has_rows], many, context)
+
+    monkeypatch.setattr(partitions, 'list_partitions', lambda table: [
+        (f'{table}_default', None),
+        (f'{table}_p202601', date(2026, 1, 1)),
+        (f'{table}_p202602', date(2026, 2, 1)),
+        (f'{table}_p202603', date(2026, 3, 1)),
+    ])
+    with connection.execute_wrapper(record):
+        yield statements
+
+
+@pytest.mark.django_db
+def test_expire_drops_partitions_before_cutoff(executed):
+    assert partitions.expire_partitions('intraday_bars', today=date(2026, 5, 17)) == ['intraday_bars_p202601']
+    assert executed == ['SAVEPOINT', 'DROP TABLE "intraday_bars_p202601"', 'RELEASE SAVEPOINT']
+
+
+@pytest.mark.django_db
+def test_expire_detaches_each_partition_atomically(executed, settings):
+    settings.TIME_SERIES_RETENTION_MONTHS = {'transactions': 1}
+
+    assert partitions.expire_partitions('transactions', today=date(2026, 4, 10)) == [
+        'transactions_p202601', 'transactions_p202602',
+    ]
+    # DETACH e SET SCHEMA de cada partição no mesmo bloco atômico
+    assert executed == [
+        'SAVEPOINT',
+        'ALTER TABLE "transactions" DETACH PARTITION "transactions_p202601"',
+        'ALTER TABLE "transactions_p202601" SET SCHEMA "archive"',
+        'RELEASE SAVEPOINT',
+        'SAVEPOINT',
+        'ALTER TABLE "transactions" DETACH PARTITION "transactions_p202602"',
+        'ALTER TABLE "transactions_p202602" SET SCHEMA "archive"',
+        'RELEASE SAVEPOINT',
+    ]
+
+
+@pytest.mark.django_db
+def test_create_partition_moves_rows_out_of_default(executed):
+    executed.default_has_rows = True
+
+    assert partitions.ensure_partitions('transactions', months_ahead=1, today=date(2026, 3, 10)) == [
+        'transactions_p202604',
+    ]
+    # Linhas futuras já gravadas na DEFAULT vão para a nova partição na mesma transação
+    assert executed == [
+        'SAVEPOINT',
+        'SELECT EXISTS (SELECT 1 FROM "transactions_default" WHERE "date" >= %s AND "date" < %s)',
+        'CREATE TABLE "transactions_p202604" (LIKE "transactions" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+        'WITH moved AS (DELETE FROM "transactions_default" WHERE "date" >= %s AND "date" < %s RETURNING *) '
+        'INSERT INTO "transactions_p202604" SELECT * FROM moved',
+        'ALTER TABLE "transactions" ATTACH PARTITION "transactions_p202604" FOR VALUES FROM (%s) TO (%s)',
+        'RELEASE SAVEPOINT',
+    ]
+
+
+@pytest.mark.django_db
+def test_create_partition_without_rows_in_default(executed):
+    assert partitions.ensure_partitions('transactions', months_ahead=1, today=date(2026, 3, 10)) == [
+        'transactions_p202604',
+    ]
+    assert executed[2] == (
+        'CREATE TABLE IF NOT EXISTS "transactions_p202604" PARTITION OF "transactions" '
+        'FOR VALUES FROM (%s) TO (%s)'
+    )
+    assert len(executed) == 4
+
+
+def test_cleanup_steps_fail_independently(monkeypatch):
+    from core.services import maintenance_service
+
+    def fail(table):
+        raise RuntimeError('linhas na DEFAULT')
+
+    expired = []
+    monkeypatch.setattr(maintenance_service, 'ensure_partitions', fail)
+    monkeypatch.setattr(maintenance_service, 'rollup', lambda table: 1)
+    monkeypatch.setattr(maintenance_service, 'expire_partitions', lambda table: expired.append(table) or [])
+
+    summary = maintenance_service.cleanup_old_data.run()
+
+    assert summary['intraday_bars'] == {
+        'created': [], 'rolled_up_days': 1, 'expired': [], 'errors': {'created': 'linhas na DEFAULT'},
+    }
+    assert expired == list(partitions.PARTITIONED_TABLES)
+
+
+def test_cleanup_keeps_partitions_when_rollup_fails(monkeypatch):
+    from core.services import maintenance_service
+
+    def fail(table):
+        raise RuntimeError('rollup')
+
+    expired = []
+    monkeypatch.setattr(maintenance_service, 'ensure_partitions', lambda table: [])
+    monkeypatch.setattr(maintenance_service, 'rollup', fail)
+    monkeypatch.setattr(maintenance_service, 'expire_partitions', lambda table: expired.append(table) or [])
+
+    maintenance_service.cleanup_old_data.run()
+
+    # Tabelas com rollup não expiram dias ainda não agregados
+    assert expired == ['transactions', 'news_articles']
+
+
+@pytest.mark.django_db
+def test_rollup_uses_b3_local_days(monkeypatch):
+    from django.db import connection
+
+    from core.services import maintenance_service
+
+    calls = []
+
+    def record(execute, sql, params, many, context):
+        calls.append(params)
+
+    monkeypatch.setattr(maintenance_service, '_rollup_start', lambda source, column, target: date(2026, 1, 5))
+    with connection.execute_wrapper(record):
+        assert maintenance_service.rollup('intraday_bars', until=date(2026, 1, 6)) == 1
+
+    # Meia-noite de São Paulo (UTC−3), não de UTC
+    assert calls[0]['tz'] == 'America/Sao_Paulo'
+    assert calls[0]['start'].isoformat() == '2026-01-05T00:00:00-03:00'
+    assert calls[0]['end'].isoformat() == '2026-01-06T00:00:00-03:00'
+
+
+def _copy_rows(count, inserted=None):
+    """Saída de COPY ordenada pela chave, opcionalmente com uma linha nova no meio"""
+    rows = [f'{i}\tPETR4\t{i * 0.37:.2f}\t2026-01-{i % 28 + 1:02d}\n'.encode() for i in range(count)]
+    if inserted is not None:
+        rows.insert(inserted, b'50000\tVALE3\t61.20\t2026-01-15\n')
+    return b''.join(rows)
+
+
+def _chunk(store, data, piece=4096):
+    writer = BlockWriter(store, min_size=1024, max_size=64 * 1024, average_size=4096)
+    for start in range(0, len(data), piece):
+        writer.write(data[start:start + piece])
+    writer.close()
+    return writer
+
+
+def test_inserted_row_changes_only_its_block(tmp_path):
+    store = BlockStore(tmp_path)
+    before = _chunk(store, _copy_rows(20000))
+    after = _chunk(store, _copy_rows(20000, inserted=10000))
+
+    assert len(before.digests) > 50
+    assert after.rows == before.rows + 1
+    assert len(set(after.digests) - set(before.digests)) <= 2
+    assert b''.join(store.get(d) for d in after.digests) == _copy_rows(20000, inserted=10000)
+
+
+def test_block_boundaries_do_not_depend_on_write_sizes(tmp_path):
+    store = BlockStore(tmp_path)
+    data = _copy_rows(5000)
+
+    assert _chunk(store, data, piece=100).digests == _chunk(store, data, piece=65536).digests
+
+
+@pytest.fixture
+def backup(tmp_path):
+    return BackupService(root=tmp_path)
+
+
+def test_prune_waits_for_running_backup(backup):
+    with backup.lock():
+        # Reentrante no mesmo processo: o job diário cria e expira sob a mesma trava
+        assert backup.prune(retention_days=1) == {'snapshots_removed': 0, 'blocks_removed': 0}
+        with pytest.raises(BackupLocked):
+            BackupService(root=backup._root).prune(retention_days=1)
+
+    assert BackupService(root=backup._root).prune(retention_days=1)['blocks_removed'] == 0
+
+
+def test_prune_keeps_blocks_of_retained_snapshots(backup):
+    old, kept = backup.store.put(b'antigo\n')[0], backup.store.put(b'mantido\n')[0]
+    backup.store.save_manifest({'id': '20200101T000000Z', 'schema': [], 'tables': {'t': {'chunks': [old]}}})
+    backup.store.save_manifest({'id': '20990101T000000Z', 'schema': [], 'tables': {'t': {'chunks': [kept]}}})
+
+    assert backup.prune(retention_days=30) == {'snapshots_removed': 1, 'blocks_removed': 1}
+    assert list(backup.store.blocks()) == [kept]
+
+
+def test_restore_refuses_tables_with_data(backup, monkeypatch):
+    backup.store.save_manifest({'id': 's1', 'schema': [], 'sequences': {},
+                                'tables': {'quotes': {'chunks': [], 'rows': 0, 'bytes': 0},
+                                           'archive.quotes_p202001': {'chunks': [], 'rows': 0, 'bytes': 0}}})
+    monkeypatch.setattr(backup, '_tables_with_data', lambda tables: [t for t in tables if t == 'quotes'])
+    monkeypatch.setattr(backup, '_restore_table', lambda item: pytest.fail('restauração sobre dados'))
+
+    with pytest.raises(ValueError, match='quotes'):
+        backup.restore_snapshot('s1')
+
+
+def test_archive_tables_are_schema_qualified():
+    assert backup_module._table_key('public', 'quotes') == 'quotes'
+    assert backup_module._table_key('archive', 'transactions_p202001') == 'archive.transactions_p202001'
+    assert backup_module._quote('archive.transactions_p202001') == '"archive"."transactions_p202001"'
+
+
+@pytest.fixture
+def snapshot_db(backup, monkeypatch):
+    """Catálogo do banco simulado: arquivo, tamanho e sonda de linhas de cada tabela"""
+    db = SimpleNamespace(
+        storage={'quotes': {'relfilenode': 10, 'size': 8192}, 'trades': {'relfilenode': 11, 'size': 8192}},
+        probes={'quotes': {'rows': 5, 'max_xmin': 700}, 'trades': {'rows': 3, 'max_xmin': 900}},
+        copies=[],
+    )
+
+    @contextmanager
+    def snapshot_transaction(alias):
+        yield '00000003-0000001B-1'
+
+    def backup_table(table, fingerprint, snapshot_id):
+        db.copies.append((table, snapshot_id))
+        return {'chunks': [], 'rows': db.probes[table]['rows'], 'bytes': 0, 'stored_bytes': 0,
+                'fingerprint': {**fingerprint, **db.probes[table]}, 'reused': False}
+
+    monkeypatch.setattr(backup_module, 'snapshot_transaction', snapshot_transaction)
+    monkeypatch.setattr(backup_module, 'list_tables', lambda alias: sorted(db.storage))
+    monkeypatch.setattr(backup_module, 'table_fingerprints', lambda alias: {t: dict(v) for t, v in db.storage.items()})
+    monkeypatch.setattr(backup_module, 'table_probe', lambda cursor, table: dict(db.probes[table]))
+    monkeypatch.setattr(backup_module, '_sequence_values', lambda alias: {})
+    monkeypatch.setattr(backup, '_backup_table', backup_table)
+    return db
+
+
+@pytest.mark.django_db
+def test_parallel_copies_share_the_exported_snapshot(backup, snapshot_db):
+    backup.create_snapshot(jobs=2, include_schema=False)
+
+    assert sorted(snapshot_db.copies) == [('quotes', '00000003-0000001B-1'), ('trades', '00000003-0000001B-1')]
+
+
+@pytest.mark.django_db
+def test_reuse_requires_same_storage_and_rows(backup, snapshot_db):
+    # Um UPDATE no mesmo espaço da página mantém arquivo e tamanho, mas gera xmin novo
+    snapshot_db.probes['trades']['max_xmin'] = 950
+    backup.store.save_manifest({'id': '20000101T000000Z', 'tables': {
+        'quotes': {'chunks': [], 'rows': 5, 'fingerprint': {'relfilenode': 10, 'size': 8192, 'rows': 5, 'max_xmin': 700}},
+        'trades': {'chunks': [], 'rows': 3, 'fingerprint': {'relfilenode': 11, 'size': 8192, 'rows': 3, 'max_xmin': 900}},
+    }})
+
+    stats = backup.create_snapshot(include_schema=False)
+
+    assert snapshot_db.copies == [('trades', None)]
+    assert stats['tables'] == 2 and stats['tables_copied'] == 1
@@ -0,0 +1,206 @@
+"""
+Testes da autenticação mobile do HUB Financeiro
+Revogação de tokens, rotação do refresh token e invalidação dos snapshots em cache
+"""
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from core.utils import security
+from core.utils.security import (
+    auth_cache,
+    decode_refresh_token,
+    get_user_snapshot,
+    issue_tokens,
+    revoke_user_tokens,
+    rotate_refresh_token,
+)
+
+pytestmark = pytest.mark.django_db
+
+PASSWORD = 'senha-forte-123'
+
+
+@pytest.fixture
+def user():
+    return get_user_model().objects.create_user('investidor', email='investidor@hub.com', password=PASSWORD)
+
+
+@pytest.fixture
+def api():
+    return APIClient()
+
+
+def _login(api):
+    response = api.post('/api/v1/mobile/auth/login/', {'username': 'investidor', 'password': PASSWORD},
+                        format='json')
+    assert response.status_code == 200
+    return response.json()
+
+
+def _me(api, access):
+    return api.get('/api/v1/mobile/auth/me/', HTTP_AUTHORIZATION=f'Bearer {access}').status_code
+
+
+def _forget_cache():
+    """Simula a perda do cache (reinício do Redis, outro processo)"""
+    cache.clear()
+    auth_cache.clear_local()
+
+
+def test_login_and_authenticated_request(api, user):
+    tokens = _login(api)
+
+    assert tokens['user']['username'] == 'investidor'
+    assert _me(api, tokens['access']) == 200
+
+
+def test_logout_revokes_current_access_token(api, user):
+    tokens = _login(api)
+
+    response = api.post('/api/v1/mobile/auth/logout/', {'refresh': tokens['refresh']},
+                        HTTP_AUTHORIZATION=f"Bearer {tokens['access']}", format='json')
+
+    assert response.status_code == 204
+    assert _me(api, tokens['access']) == 401
+    # Rota sem autenticadores: o DRF responde 403 a AuthenticationFailed
+    assert api.post('/api/v1/mobile/auth/refresh/', {'refresh': tokens['refresh']},
+                    format='json').status_code == 403
+
+
+def test_logout_from_all_devices(api, user):
+    first, second = _login(api), _login(api)
+
+    api.post('/api/v1/mobile/auth/logout/', {'all_devices': True},
+             HTTP_AUTHORIZATION=f"Bearer {first['access']}", format='json')
+
+    assert _me(api, second['access']) == 401
+    assert _me(api, _login(api)['access']) == 200
+
+
+def test_logout_from_all_devices_survives_cache_loss(api, user):
+    tokens = _login(api)
+    api.post('/api/v1/mobile/auth/logout/', {'all_devices': True},
+             HTTP_AUTHORIZATION=f"Bearer {tokens['access']}", format='json')
+
+    # Chave despejada ou FLUSHALL: a geração volta do banco
+    _forget_cache()
+
+    assert _me(api, tokens['access']) == 401
+    with pytest.raises(AuthenticationFailed):
+        rotate_refresh_token(decode_refresh_token(tokens['refresh']))
+
+
+def test_password_change_revokes_tokens_even_without_cache(api, user, django_capture_on_commit_callbacks):
+    old = _login(api)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api.post('/api/v1/mobile/auth/password/',
+                            {'current_password': PASSWORD, 'new_password': 'outra-senha-456'},
+                            HTTP_AUTHORIZATION=f"Bearer {old['access']}", format='json')
+    assert response.status_code == 200
+    new = response.json()
+
+    _forget_cache()
+
+    # Sem geração em cache, a credencial do token não confere com a senha gravada
+    assert _me(api, old['access']) == 401
+    assert _me(api, new['access']) == 200
+    with pytest.raises(AuthenticationFailed):
+        rotate_refresh_token(decode_refresh_token(old['refresh']))
+
+
+def test_password_changed_outside_the_api(api, user, django_capture_on_commit_callbacks):
+    tokens = _login(api)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user.set_password('trocada-no-admin-789')
+        user.save()
+
+    assert _me(api, tokens['access']) == 401
+
+
+def test_rotation_keeps_lifetime_and_rejects_reuse(user):
+    tokens = issue_tokens(user)
+    refresh = decode_refresh_token(tokens['refresh'])
+    lifetime = refresh['exp'] - refresh['iat']
+
+    rotated = rotate_refresh_token(decode_refresh_token(tokens['refresh']))
+
+    new_refresh = decode_refresh_token(rotated['refresh'])
+    assert new_refresh['exp'] - new_refresh['iat'] == lifetime
+    assert new_refresh['jti'] != refresh['jti']
+    with pytest.raises(AuthenticationFailed):
+        rotate_refresh_token(decode_refresh_token(tokens['refresh']))
+
+
+def test_concurrent_rotation_only_one_wins(user, monkeypatch):
+    raw = issue_tokens(user)['refresh']
+    # As duas requisições passam pela validação antes de qualquer uma revogar o token
+    monkeypatch.setattr(security, 'is_revoked', lambda token: False)
+
+    rotate_refresh_token(decode_refresh_token(raw))
+    with pytest.raises(AuthenticationFailed):
+        rotate_refresh_token(decode_refresh_token(raw))
+
+
+def test_revoked_generation_rejects_older_refresh_tokens(user):
+    tokens = issue_tokens(user)
+
+    revoke_user_tokens(user.pk)
+
+    with pytest.raises(AuthenticationFailed):
+        rotate_refresh_token(decode_refresh_token(tokens['refresh']))
+    rotate_refresh_token(decode_refresh_token(issue_tokens(user)['refresh']))
+
+
+def test_snapshot_is_invalidated_only_after_commit(user, django_capture_on_commit_callbacks):
+    assert get_user_snapshot(user.pk)['is_staff'] is False
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        user.is_staff = True
+        user.save()
+        # Antes do commit, o cache ainda guarda a linha anterior
+        assert get_user_snapshot(user.pk)['is_staff'] is False
+
+    for callback in callbacks:
+        callback()
+    assert get_user_snapshot(user.pk)['is_staff'] is True
+
+
+def test_deactivated_user_is_rejected(api, user, django_capture_on_commit_callbacks):
+    tokens = _login(api)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user.is_active = False
+        user.save()
+
+    assert _me(api, tokens['access']) == 401
+
+
+def test_jwt_user_is_a_model_instance_built_without_queries(user, django_assert_num_queries):
+    access = decode_refresh_token(issue_tokens(user)['refresh']).access_token
+    get_user_snapshot(user.pk)
+
+    with django_assert_num_queries(0):
+        request_user = security.CachedJWTAuthentication().get_user(access)
+        assert request_user.has_perm('authtoken.add_token') is False
+
+    # Usável em consultas e chaves estrangeiras como o usuário carregado do banco
+    token = Token.objects.create(user=request_user)
+    assert Token.objects.get(user=request_user) == token
+    assert isinstance(request_user, get_user_model()) and request_user == user
+
+
+def test_jwt_user_save_writes_only_loaded_fields(user):
+    request_user = security.user_from_snapshot(get_user_snapshot(user.pk))
+
+    request_user.first_name = 'Ana'
+    request_user.save()
+
+    user.refresh_from_db()
+    assert user.first_name == 'Ana' and user.check_password(PASSWORD)
@@ -0,0 +1,187 @@
+"""
+Testes da API Web do HUB Financeiro
+Validação de parâmetros das rotas, raiz da API, endpoint de métricas e profiling
+"""
+
+from datetime import datetime, timezone as dt_timezone
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from rest_framework.test import APIClient
+
+from core.services.forex_service import ForexRateHistory, ForexService
+from core.services.fundamentalist_analyzer_service import FundamentalistAnalyzerService
+from core.utils.security import issue_tokens
+from core.views import metrics_view
+from platforms.web.api import analysis as analysis_api
+from platforms.web.api import forex as forex_api
+from platforms.web.middleware import ProfilingMiddleware
+
+
+@pytest.fixture
+def client():
+    """Cliente autenticado sem banco: o usuário não é persistido"""
+    client = APIClient()
+    client.force_authenticate(user=get_user_model()(id=1, username='usuario_1'))
+    return client
+
+
+@pytest.fixture
+def analyzer(tmp_path, monkeypatch):
+    service = FundamentalistAnalyzerService(path=str(tmp_path / 'matrix.npz'))
+    service.update([
+        {'symbol': 'BBAS3', 'sector': 'Bancos', 'dy': 9.0, 'roe': 20.0},
+        {'symbol': 'ITUB4', 'sector': 'Bancos', 'dy': 6.0, 'roe': 22.0},
+    ])
+    monkeypatch.setattr(analysis_api, 'fundamentalist_analyzer', service)
+    return service
+
+
+def test_api_root_lists_every_area(client):
+    response = client.get('/api/v1/')
+
+    assert response.status_code == 200
+    assert response.json()['analysis'] == 'http://testserver/api/v1/analysis/'
+
+
+@pytest.mark.parametrize('limit', ['0', '-5', 'dez'])
+def test_screener_rejects_invalid_limit(client, analyzer, limit):
+    response = client.get('/api/v1/analysis/screener/', {'limit': limit})
+
+    assert response.status_code == 400
+
+
+def test_screener_applies_filters_and_limit(client, analyzer):
+    response = client.get('/api/v1/analysis/screener/', {'dy__gt': 5, 'order': '-roe', 'limit': 1})
+
+    assert response.status_code == 200
+    assert [row['symbol'] for row in response.json()['results']] == ['ITUB4']
+
+
+@pytest.mark.parametrize('changes', [
+    {'periods': 0},
+    {'periods': -4},
+    {'periods_per_year': 0},
+    {'price': 0},
+    {'periods': 'muitos'},
+])
+def test_drip_rejects_invalid_parameters(client, changes):
+    payload = {'shares': 100, 'price': 10, 'dividend_per_share': 0.5, 'periods': 2, 'periods_per_year': 1}
+
+    response = client.post('/api/v1/dividends/drip/', {**payload, **changes}, format='json')
+
+    assert response.status_code == 400
+
+
+def test_drip_simulation(client):
+    payload = {'shares': 100, 'price': 10, 'dividend_per_share': 0.5, 'periods': 2, 'periods_per_year': 1}
+
+    response = client.post('/api/v1/dividends/drip/', payload, format='json')
+
+    assert response.status_code == 200
+    assert response.json()['scenarios'][0]['total_income'] == 102.5
+
+
+@pytest.fixture
+def forex(tmp_path, monkeypatch):
+    history = ForexRateHistory(['BRL'], pivot='USD')
+    history.append({'BRL': 5.0}, at=datetime(2026, 1, 5, 12, 0, tzinfo=dt_timezone.utc))
+    history.append({'BRL': 6.0}, at=datetime(2026, 1, 5, 14, 0, tzinfo=dt_timezone.utc))
+    service = ForexService(path=str(tmp_path / 'forex.npz'))
+    service._history = history
+    monkeypatch.setattr(forex_api, 'forex_service', service)
+    return service
+
+
+@pytest.mark.parametrize('at, rate', [
+    # Sem fuso: horário de Brasília (UTC-3), 10:30 local = 13:30 UTC
+    ('2026-01-05T10:30:00', 5.0),
+    ('2026-01-05T11:30:00', 6.0),
+    ('2026-01-05T13:30:00+00:00', 5.0),
+])
+def test_forex_naive_moment_uses_current_timezone(client, forex, at, rate):
+    response = client.get('/api/v1/forex/convert/', {'amount': 10, 'from': 'USD', 'to': 'BRL', 'at': at})
+
+    assert response.status_code == 200
+    assert response.json()['rate'] == rate
+
+
+@pytest.mark.parametrize('token, header, status', [
+    ('', '', 403),
+    ('', 'Bearer ', 403),
+    ('segredo', 'Bearer outro', 403),
+    ('segredo', 'Bearer segredo', 200),
+])
+def test_metrics_require_configured_token(settings, rf, token, header, status):
+    settings.METRICS_AUTH_TOKEN = token
+
+    response = metrics_view(rf.get('/metrics', HTTP_AUTHORIZATION=header))
+
+    assert response.status_code == status
+
+
+@pytest.fixture
+def profiling(settings):
+    settings.PROFILING_ENABLED = True
+    return ProfilingMiddleware(lambda request: HttpResponse('resposta'))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('is_staff, profiled', [(True, True), (False, False)])
+def test_profiling_authenticates_api_clients(profiling, rf, is_staff, profiled):
+    user = get_user_model().objects.create_user('analista', password='senha-forte-123', is_staff=is_staff)
+    access = issue_tokens(user)['access']
+
+    response = profiling(rf.get('/api/v1/', HTTP_AUTHORIZATION=f'Bearer {access}', HTTP_X_PROFILE='cprofile'))
+
+    assert (response.content != b'resposta') == profiled
+
+
+def test_profiling_ignores_anonymous_and_invalid_tokens(profiling, rf):
+    assert profiling(rf.get('/api/v1/', HTTP_X_PROFILE='cprofile')).content == b'resposta'
+    invalid = rf.get('/api/v1/', HTTP_AUTHORIZATION='Bearer invalido', HTTP_X_PROFILE='cprofile')
+    assert profiling(invalid).content == b'resposta'
+
+
+@pytest.fixture
+def production_authenticators(settings):
+    """Lista de autenticadores de core/config.py, com a SessionAuthentication"""
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_AUTHENTICATION_CLASSES': [
+            'core.utils.security.CachedJWTAuthentication',
+            'rest_framework.authentication.TokenAuthentication',
+            'rest_framework.authentication.SessionAuthentication',
+        ],
+    }
+
+
+@pytest.mark.django_db
+def test_profiling_with_production_authenticators(profiling, rf, production_authenticators):
+    assert profiling(rf.get('/api/v1/', HTTP_X_PROFILE='cprofile')).content == b'resposta'
+
+    staff = get_user_model().objects.create_user('analista', password='senha-forte-123', is_staff=True)
+    session = rf.get('/api/v1/', HTTP_X_PROFILE='cprofile')
+    session.user = staff
+    assert profiling(session).content != b'resposta'
+
+    access = issue_tokens(staff)['access']
+    api = rf.get('/api/v1/', HTTP_AUTHORIZATION=f'Bearer {access}', HTTP_X_PROFILE='cprofile')
+    assert profiling(api).content != b'resposta'
+
+
+def test_profiling_never_breaks_the_request(profiling, rf, monkeypatch):
+    def broken(self, request):
+        raise RuntimeError('cache indisponível')
+
+    monkeypatch.setattr('core.utils.security.CachedJWTAuthentication.authenticate', broken)
+
+    request = rf.get('/api/v1/', HTTP_AUTHORIZATION='Bearer qualquer', HTTP_X_PROFILE='cprofile')
+    assert profiling(request).content == b'resposta'
+
+
+@pytest.mark.parametrize('url', ['/api/v1/daytrading/', '/api/v1/daytrading/bars/PETR4/'])
+@pytest.mark.parametrize('limit', ['0', '-1'])
+def test_daytrading_rejects_non_positive_limit(client, url, limit):
+    assert client.get(url, {'limit': limit}).status_code == 400
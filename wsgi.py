@@ -23,6 +23,9 @@ if os.environ.get('DJANGO_ENV') == 'production':
 # Obter aplicação WSGI
 application = get_wsgi_application()
 
+# App Celery atual do processo: as tarefas enfileiradas pelas views (@shared_task) usam este app
+from hub_financeiro import celery_app  # noqa: E402,F401
+
 # Middleware personalizado para produção
 class SecurityHeadersMiddleware:
     """Middleware para adicionar headers de segurança"""